@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: json_decode.py
+Description: Benchmark of the decoding of Cognitive Face API responses.
+
+Compare the former two-step decoding (bytes into a string, then the string
+into objects with the standard `json` module) with the single-pass decoding of
+`cognitive_face.util.handle_response`, on a `large_person_group_person.list`
+page of 1000 persons and on a detect response of 64 faces with landmarks and
+attributes.
+
+Usage: python benchmarks/json_decode.py [number of rounds]
+"""
+import json
+import os
+import random
+import sys
+import timeit
+import tracemalloc
+import uuid
+
+# Import the package of this checkout, run from anywhere.
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cognitive_face import util
+
+LANDMARKS = (
+    'pupilLeft', 'pupilRight', 'noseTip', 'mouthLeft', 'mouthRight',
+    'eyebrowLeftOuter', 'eyebrowLeftInner', 'eyeLeftOuter', 'eyeLeftTop',
+    'eyeLeftBottom', 'eyeLeftInner', 'eyebrowRightInner', 'eyebrowRightOuter',
+    'eyeRightInner', 'eyeRightTop', 'eyeRightBottom', 'eyeRightOuter',
+    'noseRootLeft', 'noseRootRight', 'noseLeftAlarTop', 'noseRightAlarTop',
+    'noseLeftAlarOutTip', 'noseRightAlarOutTip', 'upperLipTop',
+    'upperLipBottom', 'underLipTop', 'underLipBottom')
+EMOTIONS = ('anger', 'contempt', 'disgust', 'fear', 'happiness', 'neutral',
+            'sadness', 'surprise')
+
+
+def person_list(count=1000):
+    """Return a `large_person_group_person.list` page of `count` persons."""
+    return [{
+        'personId': str(uuid.uuid4()),
+        'name': 'Person {}'.format(idx),
+        'userData': 'Enrolled from the front desk camera #{}'.format(idx),
+        'persistedFaceIds': [str(uuid.uuid4()) for _ in range(4)],
+    } for idx in range(count)]
+
+
+def detect_result(count=64):
+    """Return a detect response of `count` faces with every landmark and
+    attribute."""
+    return [{
+        'faceId': str(uuid.uuid4()),
+        'faceRectangle': {
+            'top': random.randint(0, 2000),
+            'left': random.randint(0, 2000),
+            'width': random.randint(36, 400),
+            'height': random.randint(36, 400),
+        },
+        'faceLandmarks': {
+            name: {
+                'x': round(random.uniform(0, 2000), 1),
+                'y': round(random.uniform(0, 2000), 1),
+            }
+            for name in LANDMARKS
+        },
+        'faceAttributes': {
+            'age': round(random.uniform(5, 80), 1),
+            'gender': random.choice(('male', 'female')),
+            'smile': round(random.random(), 3),
+            'headPose': {
+                'pitch': 0.0,
+                'roll': round(random.uniform(-20, 20), 1),
+                'yaw': round(random.uniform(-40, 40), 1),
+            },
+            'emotion': {name: round(random.random(), 3)
+                        for name in EMOTIONS},
+            'glasses': 'NoGlasses',
+        },
+    } for _ in range(count)]
+
+
+def two_pass(content):
+    """The former decoding: bytes into a string, then into objects."""
+    text = content.decode('utf-8')
+    if text:
+        return json.loads(text)
+    return {}
+
+
+def single_pass(content):
+    """The decoding of `handle_response`."""
+    return util.handle_response(200, content)
+
+
+def peak_memory(func, content):
+    """Return the peak of memory allocated by one call of `func`."""
+    tracemalloc.start()
+    func(content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main(rounds=200):
+    """Print the time per call and the peak allocation of both decodings."""
+    print('JSON backend: {}'.format(util.json_loads.__module__))
+    payloads = (('person list (1000)', person_list()),
+                ('detect (64 faces)', detect_result()))
+    for name, payload in payloads:
+        content = json.dumps(payload).encode('utf-8')
+        assert single_pass(content) == two_pass(content)
+        print('\n{}: {} KiB'.format(name, len(content) // 1024))
+        for label, func in (('two-pass', two_pass),
+                            ('single-pass', single_pass)):
+            seconds = min(
+                timeit.repeat(
+                    lambda: func(content), number=rounds, repeat=3)) / rounds
+            print('  {:<12} {:8.3f} ms/call {:8d} KiB peak'.format(
+                label, seconds * 1000, peak_memory(func, content) // 1024))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: upload_copies.py
+Description: Benchmark of the memory allocated to upload an image.
+
+Upload a large image, given in each supported form, to a local server which
+discards it, and report the peak of memory allocated by the upload and the
+number of copies of the image it amounts to. The first line is the former
+`.read()` of an `io.BytesIO` into a new `bytes` object.
+
+Usage: python benchmarks/upload_copies.py [image size in MiB]
+"""
+import io
+import multiprocessing
+import os
+import sys
+import tempfile
+import tracemalloc
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+except ImportError:  # Python 2.
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+
+# Import the package of this checkout, run from anywhere.
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cognitive_face as CF
+
+
+class DiscardHandler(BaseHTTPRequestHandler):
+    """Read and discard the body, answer an empty detect result."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """Handle an upload."""
+        left = int(self.headers['Content-Length'])
+        while left:
+            left -= len(self.rfile.read(min(left, 1 << 16)))
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'[]')
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+def serve(server):
+    """Serve in a separate process, out of the traced allocations."""
+    server.serve_forever()
+
+
+def measure(client, image, convert=None):
+    """Return the peak of memory allocated to upload `image`, passed through
+    `convert` first if given."""
+    convert = convert or (lambda image: image)
+    client.face.detect(convert(image))  # Warm up the connection.
+    if isinstance(image, io.BytesIO):
+        image.seek(0)
+    tracemalloc.start()
+    client.face.detect(convert(image))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main(size_mib=32):
+    """Print the peak allocation and the number of copies per upload."""
+    size = size_mib * 1024 * 1024
+    server = HTTPServer(('127.0.0.1', 0), DiscardHandler)
+    process = multiprocessing.Process(target=serve, args=(server, ))
+    process.daemon = True
+    process.start()
+    client = CF.FaceClient('key', 'http://127.0.0.1:{}/face/v1.0/'.format(
+        server.server_port))
+
+    content = os.urandom(size)
+    path = os.path.join(tempfile.mkdtemp(), 'image.jpg')
+    with open(path, 'wb') as image:
+        image.write(content)
+
+    def frame():
+        """Return an `io.BytesIO` filled as a capture pipeline does."""
+        image = io.BytesIO()
+        image.write(content)
+        image.seek(0)
+        return image
+
+    cases = (
+        ('BytesIO.read() (former)', frame(), lambda image: image.read()),
+        ('bytes', content, None),
+        ('bytearray', bytearray(content), None),
+        ('memoryview', memoryview(content), None),
+        ('io.BytesIO', frame(), None),
+        ('file path, streamed', path, None),
+    )
+    print('Image of {} MiB'.format(size_mib))
+    for name, image, convert in cases:
+        peak = measure(client, image, convert)
+        print('  {:<26} {:10d} KiB peak {:6.2f} copies'.format(
+            name, peak // 1024, float(peak) / size))
+    CF.MemoryMap.set(0)
+    peak = measure(client, path)
+    CF.MemoryMap.set(None)
+    print('  {:<26} {:10d} KiB peak {:6.2f} copies'.format(
+        'file path, memory-mapped', peak // 1024, float(peak) / size))
+
+    os.remove(path)
+    process.terminate()
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
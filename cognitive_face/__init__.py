@@ -15,6 +15,40 @@ from . import large_person_group_person_face
 from . import person
 from . import person_group
 from . import util
+from . import client
+from . import deadline
+from . import fetch
+from . import validate
+from .batch import IdentifyBatcher
+from .breaker import CircuitBreakers
+from .breaker import CircuitOpenError
+from .cache import DetectionCache
+from .client import FaceClient
+from .deadline import Deadline
+from .deadline import DeadlineExceeded
+from .dedup import DedupReport
+from .dedup import Deduplicator
+from .fetch import FetchError
+from .fetch import URLFetcher
+from .hedge import HedgingPolicy
+from .keypool import KeyPool
+from .pipeline import Pipeline
+from .preprocess import Faces
+from .preprocess import Transform
+from .transport import RequestsTransport
+from .transport import Transport
+from .transport import Urllib3Transport
 from .util import CognitiveFaceException
 from .util import Key
 from .util import BaseUrl
+from .util import ConnectionPool
+from .util import RateLimit
+from .util import Retry
+from .util import MemoryMap
+from .util import Downscale
+from .util import Cache
+from .util import Validation
+from .util import Orientation
+from .util import Fetch
+from .validate import InvalidImageError
+from .validate import Validator
@@ -0,0 +1,31 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: __init__.py
+Description: Asyncio interface of the Python SDK of the Cognitive Face API.
+
+Every endpoint of the sync interface is available here as a coroutine function
+with the same arguments, sharing `Key`, `BaseUrl`, `parse_image` and the
+`CognitiveFaceException` mapping with it, e.g.
+
+    faces = await cognitive_face.aio.face.detect(image)
+"""
+
+from . import util
+from . import client
+from ..util import CognitiveFaceException
+from .batch import IdentifyBatcher
+from .client import FaceClient
+from .transport import AiohttpTransport
+from .util import ConnectionPool
+
+face = client.default().face
+face_list = client.default().face_list
+large_face_list = client.default().large_face_list
+large_face_list_face = client.default().large_face_list_face
+large_person_group = client.default().large_person_group
+large_person_group_person = client.default().large_person_group_person
+large_person_group_person_face = \
+    client.default().large_person_group_person_face
+person = client.default().person
+person_group = client.default().person_group
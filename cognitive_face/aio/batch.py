@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: batch.py
+Description: Micro-batching of the identify calls for the asyncio interface
+    of the Python SDK of the Cognitive Face API.
+"""
+import asyncio
+
+import cognitive_face as CF
+from ..batch import DEFAULT_WINDOW
+from ..batch import Batch
+from ..batch import batch_key
+from ..batch import rejected
+from ..batch import resolve
+from ..deadline import current as current_deadline
+from ..deadline import scope
+
+
+class IdentifyBatcher(object):
+    """Coalescing of single-face identify calls into shared identify
+    requests, see `cognitive_face.IdentifyBatcher`.
+
+    E.g. `await batcher.submit(face_id, large_person_group_id=group_id)`.
+
+    Attributes:
+        window: Seconds a call waits for others to share its request.
+        identify: The identify coroutine function, `aio.face.identify` by
+            default or the one of an asyncio `FaceClient`.
+    """
+
+    def __init__(self, window=DEFAULT_WINDOW, identify=None):
+        self.window = window
+        self.identify = identify or CF.aio.face.identify
+        self._batches = {}
+        self._timers = {}
+        self._tasks = set()
+        self._stats = {'calls': 0, 'requests': 0}
+
+    def submit(self, face_id, *args, **kwargs):
+        """Queue the identification of `face_id`, see
+        `cognitive_face.IdentifyBatcher.submit`.
+
+        Returns:
+            An `asyncio.Future` of the identified candidate person(s) of the
+            face, `None` if the service skipped it.
+        """
+        loop = asyncio.get_event_loop()
+        key = batch_key(*args, **kwargs)
+        future = loop.create_future()
+        self._stats['calls'] += 1
+        batch = self._batches.get(key)
+        if batch is None:
+            batch = self._batches[key] = Batch(loop.time() + self.window)
+            self._timers[key] = loop.call_later(self.window, self._dispatch,
+                                                key)
+        # The timer only carries the context of the first call.
+        batch.add(face_id, future, current_deadline())
+        if len(batch.waiters) >= CF.face.MAX_IDENTIFY_FACES:
+            self._dispatch(key)
+        return future
+
+    async def close(self):
+        """Send the pending calls and wait for every request to complete."""
+        for key in list(self._batches):
+            self._dispatch(key)
+        if self._tasks:
+            await asyncio.wait(list(self._tasks))
+
+    def stats(self):
+        """Return the number of calls and of identify requests sent."""
+        return dict(self._stats)
+
+    def _dispatch(self, key):
+        batch = self._batches.pop(key, None)
+        if batch is None:
+            return
+        self._timers.pop(key).cancel()
+        self._stats['requests'] += 1
+        task = asyncio.ensure_future(self._send(key, batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, key, batch):
+        for face_id in list(batch.waiters):
+            batch.waiters[face_id] = [
+                future for future in batch.waiters[face_id]
+                if not future.cancelled()
+            ]
+            if not batch.waiters[face_id]:
+                del batch.waiters[face_id]
+        if not batch.waiters:
+            return
+        with scope(batch.deadline()):
+            outcome = await self._identify(list(batch.waiters), key)
+            if not rejected(batch.waiters, outcome):
+                resolve(batch.waiters, outcome)
+                return
+            self._stats['requests'] += len(batch.waiters)
+            outcomes = await asyncio.gather(*[
+                self._identify([face_id], key) for face_id in batch.waiters
+            ])
+        for (face_id, futures), outcome in zip(batch.waiters.items(),
+                                               outcomes):
+            resolve({face_id: futures}, outcome)
+
+    async def _identify(self, face_ids, key):
+        """Return the result of an identify request, or the exception it
+        raised."""
+        try:
+            return await self.identify(face_ids, *key)
+        except Exception as exception:  # pylint: disable=broad-except
+            return exception
@@ -0,0 +1,213 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: client.py
+Description: Asyncio client of the Cognitive Face API.
+"""
+import asyncio
+import functools
+import time
+
+from .. import client as sync_client
+from .. import util as sync_util
+from ..cache import digest
+from ..deadline import DeadlineExceeded
+from ..deadline import current as current_deadline
+from ..deadline import fits
+from ..singleflight import flight_key
+from . import util
+from .singleflight import SingleFlight
+from .transport import AiohttpTransport
+
+
+class FaceClient(object):
+    """Asyncio client of the Cognitive Face API.
+
+    It shares the configuration of a sync `cognitive_face.FaceClient` (key,
+    base URL, rate limiter, retry policy, key pool, circuit breakers and
+    hedging policy) and sends its requests through a non-blocking transport.
+    Every section module is exposed as a namespace of coroutine functions
+    bound to the client, e.g. `await client.face.detect(image)`.
+
+    Attributes:
+        client: The sync `FaceClient` holding the configuration.
+        transport: The `AiohttpTransport` sending the requests.
+        flights: `SingleFlight` sharing one call between identical concurrent
+            `GET` calls, unless `coalesce` is disabled on `client`.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self,
+                 key=None,
+                 base_url=None,
+                 limiter=None,
+                 retry=None,
+                 key_pool=None,
+                 client=None,
+                 transport=None):
+        self.client = client or sync_client.FaceClient(
+            key,
+            base_url,
+            limiter=limiter,
+            retry=retry,
+            key_pool=key_pool)
+        self.transport = transport or AiohttpTransport()
+        self.flights = SingleFlight()
+        for section in sync_client.SECTIONS:
+            name = section.__name__.rsplit('.', 1)[-1]
+            setattr(self, name, sync_util.Namespace(section, self.bind))
+        # Composite calls, built on the coroutine functions of the client.
+        self.face.detect_many = functools.partial(util.detect_many,
+                                                  self.face.detect)
+        self.face.identify_all = functools.partial(util.identify_all,
+                                                   self.face.identify)
+
+    def bind(self, func):
+        """Return the coroutine function counterpart of `func` sending its
+        requests through this client."""
+        return util.awaitable(func, self.request)
+
+    async def request(self,
+                      method,
+                      url,
+                      data=None,
+                      json=None,
+                      headers=None,
+                      params=None):
+        """Coroutine counterpart of `cognitive_face.FaceClient.request`."""
+        if self.client.fetcher is not None and data is None and \
+                (json or {}).get('url'):
+            # Download the image off the event loop.
+            loop = asyncio.get_event_loop()
+            headers, data, json = await loop.run_in_executor(
+                None, sync_util.fetch_image, self.client, json['url'],
+                current_deadline())
+        cache = self.client.cache
+        if cache is not None and self.client.route(url) == 'detect':
+            # Hash the image and read or write the on-disk tier of the cache
+            # off the event loop.
+            loop = asyncio.get_event_loop()
+            key = await loop.run_in_executor(None, digest, data, json, params)
+            result = await loop.run_in_executor(None, cache.get, key)
+            if result is None:
+                detected_at = time.time()
+                result = await self.perform(method, url, data, json, headers,
+                                            params)
+                await loop.run_in_executor(None, cache.put, key, result,
+                                           detected_at)
+            return result
+        if self.client.flights is None or method.upper() != 'GET':
+            return await self.perform(method, url, data, json, headers, params)
+        return await self.flights.do(
+            flight_key(method, url, params),
+            lambda: self.perform(method, url, data, json, headers, params),
+            current_deadline())
+
+    async def perform(self,
+                      method,
+                      url,
+                      data=None,
+                      json=None,
+                      headers=None,
+                      params=None):
+        """Coroutine counterpart of `cognitive_face.FaceClient.perform`."""
+        config = self.client
+        route = config.route(url)
+        body = data if data is not None else sync_client.encode_json(json)
+        transform = getattr(data, 'transform', None)
+        params = sync_client.map_target_face(params, transform)
+        attempts = config.retry.start(method, url)
+        deadline = current_deadline()
+        loop = asyncio.get_event_loop()
+
+        while True:
+            if deadline is not None:
+                deadline.check()
+            member = config.pick(route, params)
+            base_url = started = response = None
+            try:
+                key, base_url = config.locate(route, member, params)
+                target, headers = config.prepare(url, headers, key, base_url,
+                                                 params)
+                delay = config.reserve(member)
+                if not fits(deadline, delay):
+                    raise DeadlineExceeded()
+                if delay:
+                    await asyncio.sleep(delay)
+                started = loop.time()
+                sending = self.send(
+                    method,
+                    target,
+                    route,
+                    member,
+                    headers=headers,
+                    body=body,
+                    timeout=config.timeouts(deadline))
+                if deadline is not None:
+                    sending = asyncio.wait_for(sending, deadline.remaining())
+                response = await sending
+            except self.transport.errors:
+                if deadline is not None and deadline.expired():
+                    raise DeadlineExceeded()
+                delay = attempts.backoff(error=True)
+                if delay is None or not fits(deadline, delay):
+                    raise
+            finally:
+                # Whatever ended the call, even a cancellation.
+                config.settle(member, base_url, response, None
+                              if started is None else loop.time() - started)
+            if response is not None:
+                retry_after = response.headers.get('Retry-After')
+                delay = attempts.backoff(response.status, retry_after)
+                if delay is None or not fits(deadline, delay):
+                    return config.finish(
+                        route,
+                        sync_util.handle_response(response.status,
+                                                  response.body), transform)
+            await asyncio.sleep(delay)
+
+    async def send(self, method, url, route, member=None, **kwargs):
+        """Send a request through the `transport`, hedged when the `hedging`
+        policy of the configuration applies to it."""
+        # pylint: disable=too-many-arguments
+        hedging = self.client.hedging
+        if hedging is None or not hedging.applies(method, route):
+            return await self.transport.send(method, url, **kwargs)
+
+        loop = asyncio.get_event_loop()
+        started = loop.time()
+        first = asyncio.ensure_future(
+            self.transport.send(method, url, **kwargs))
+        done, _ = await asyncio.wait([first],
+                                     timeout=hedging.delay_for(route))
+        if done or not self.client.admit(member):
+            response = await first
+            hedging.observe(route, loop.time() - started, False, False)
+            return response
+
+        second = asyncio.ensure_future(
+            self.transport.send(method, url, **kwargs))
+        pending = {first, second}
+        while True:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED)
+            winner = done.pop()
+            if winner.exception() is None or not pending:
+                break
+        for loser in pending:
+            loser.cancel()
+        hedging.observe(route, loop.time() - started, True, winner is second)
+        return winner.result()
+
+    async def close(self):
+        """Close the session of the running event loop."""
+        await self.transport.close()
+
+
+_DEFAULT = FaceClient(client=sync_client.default())
+
+
+def default():
+    """Return the client used by the module-level coroutine functions, sharing
+    the configuration of the default sync client."""
+    return _DEFAULT
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: singleflight.py
+Description: Coalescing of identical in-flight requests of the asyncio
+    interface of the Python SDK of the Cognitive Face API.
+"""
+import asyncio
+import copy
+import weakref
+
+from ..deadline import DeadlineExceeded
+from ..singleflight import LEADER_ERRORS
+
+
+class SingleFlight(object):
+    """Coroutine counterpart of `cognitive_face.singleflight.SingleFlight`,
+    coalescing the identical concurrent calls of each event loop."""
+
+    def __init__(self):
+        self._flights = weakref.WeakKeyDictionary()
+        self._stats = {'calls': 0, 'shared': 0}
+
+    async def do(self, key, call, deadline=None):
+        """Await `call()` once for the concurrent callers of `key`, see
+        `cognitive_face.singleflight.SingleFlight.do`."""
+        flights = self._flights.setdefault(asyncio.get_event_loop(), {})
+        self._stats['calls'] += 1
+        while True:
+            flight = flights.get(key)
+            # A flight done but not yet removed by its leader is over.
+            if flight is None or flight.done():
+                flight = flights[key] = asyncio.ensure_future(call())
+                try:
+                    return await asyncio.shield(flight)
+                finally:
+                    if flights.get(key) is flight:
+                        del flights[key]
+
+            try:
+                result = await _wait(flight, deadline)
+            except LEADER_ERRORS as error:
+                if flight.done() and not flight.cancelled() and \
+                        flight.exception() is error:
+                    continue
+                raise
+            except BaseException:
+                if flight.done():
+                    self._stats['shared'] += 1
+                raise
+            self._stats['shared'] += 1
+            return copy.deepcopy(result)
+
+    def stats(self):
+        """Return the number of calls and of calls served by another one."""
+        return dict(self._stats)
+
+
+async def _wait(flight, deadline):
+    """Wait for the outcome of `flight` until `deadline`, if any."""
+    waiting = asyncio.shield(flight)
+    if deadline is None:
+        return await waiting
+    try:
+        return await asyncio.wait_for(waiting, deadline.remaining())
+    except asyncio.TimeoutError:
+        if flight.done():
+            raise
+        raise DeadlineExceeded()
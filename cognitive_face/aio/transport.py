@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: transport.py
+Description: Non-blocking HTTP transport of the asyncio interface of the
+    Python SDK of the Cognitive Face API.
+"""
+import asyncio
+import weakref
+
+try:
+    import aiohttp
+except ImportError:
+    raise ImportError(
+        '`cognitive_face.aio` requires aiohttp, install it with '
+        '`pip install cognitive_face[aio]`.')
+
+from ..transport import Response
+from ..upload import BufferBody
+from ..upload import FileBody
+from . import util
+
+
+class AiohttpTransport(object):
+    """Coroutine counterpart of `cognitive_face.transport.Transport` on top of
+    one aiohttp session per event loop.
+
+    Attributes:
+        limit: Maximum number of simultaneous connections of an event loop.
+        limit_per_host: Maximum number of simultaneous connections to an
+            endpoint, zero means no limit.
+        errors: The exception classes raised when a request fails without a
+            response.
+    """
+
+    errors = (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+
+    def __init__(self, limit=util.DEFAULT_LIMIT, limit_per_host=0):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self._sessions = weakref.WeakKeyDictionary()
+
+    def session(self):
+        """Get the aiohttp session of the running event loop."""
+        loop = asyncio.get_event_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit, limit_per_host=self.limit_per_host)
+            session = aiohttp.ClientSession(connector=connector)
+            self._sessions[loop] = session
+        return session
+
+    async def send(self, method, url, headers=None, body=None, timeout=None):
+        """Send a request and return its `Response`, see
+        `cognitive_face.transport.Transport.send`."""
+        # pylint: disable=too-many-arguments
+        if isinstance(body, BufferBody):
+            body = body.buffer
+        elif isinstance(body, FileBody):
+            body = _chunks(body)
+        if timeout is not None:
+            connect, read = timeout
+            timeout = aiohttp.ClientTimeout(
+                total=None, sock_connect=connect, sock_read=read)
+        async with self.session().request(
+                method,
+                url,
+                headers=headers,
+                data=body,
+                timeout=timeout,
+                allow_redirects=False) as response:
+            return Response(response.status, response.headers, await
+                            response.read())
+
+    async def close(self):
+        """Close the session of the running event loop."""
+        session = self._sessions.pop(asyncio.get_event_loop(), None)
+        if session is not None:
+            await session.close()
+
+
+async def _chunks(body):
+    """Yield the chunks of a streamed body, read in the default executor so
+    that the file reads do not block the event loop."""
+    loop = asyncio.get_event_loop()
+    chunks = iter(body)
+    try:
+        while True:
+            chunk = await loop.run_in_executor(None, next, chunks, None)
+            if chunk is None:
+                return
+            yield chunk
+    finally:
+        # Close the file of the body even when the upload is abandoned.
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            await loop.run_in_executor(None, close)
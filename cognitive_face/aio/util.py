@@ -0,0 +1,220 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: util.py
+Description: Shared utilities for the asyncio interface of the Python SDK of
+    the Cognitive Face API.
+"""
+import asyncio
+import collections
+import functools
+import inspect
+
+import cognitive_face as CF
+from .. import util
+from ..deadline import bounded
+from ..deadline import scope
+from ..upload import BufferBody
+
+# Maximum number of simultaneous connections of an event loop.
+DEFAULT_LIMIT = 100
+
+
+class ConnectionPool(object):
+    """Manage the aiohttp sessions of the default asyncio `FaceClient`."""
+
+    @classmethod
+    def set(cls, limit=DEFAULT_LIMIT, limit_per_host=0):
+        """Set the connection limits of the sessions created from now on.
+        Zero means no limit."""
+        transport = CF.aio.client.default().transport
+        transport.limit = limit
+        transport.limit_per_host = limit_per_host
+
+    @classmethod
+    def get(cls):
+        """Get the session of the running event loop."""
+        return CF.aio.client.default().transport.session()
+
+    @classmethod
+    async def close(cls):
+        """Close the session of the running event loop."""
+        await CF.aio.client.default().close()
+
+
+def awaitable(func, requester):
+    """Return the coroutine function counterpart of the endpoint `func`, whose
+    requests are sent through the coroutine function `requester`. An
+    endpoint taking an image reads, preprocesses and validates it in the
+    default executor, off the event loop."""
+    bound = util.bind(func, requester)
+    blocking = 'image' in inspect.signature(func).parameters
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        """Await the endpoint sent through the non-blocking `requester`."""
+        if not blocking:
+            return await bound(*args, **kwargs)
+        # The executor returns the request coroutine, awaited on the loop.
+        sending = await asyncio.get_event_loop().run_in_executor(
+            None, functools.partial(bound, *args, **kwargs))
+        return await sending
+
+    wrapper.requester = requester
+    return wrapper
+
+
+async def _wait_for_training(get_status, target_id, label, deadline):
+    """Wait for the finish of a training without blocking the event loop."""
+    with scope(deadline):
+        idx = 1
+        while True:
+            res = await get_status(target_id)
+            if res['status'] in ('succeeded', 'failed'):
+                break
+            print('The training of {} {} is onging: #{}'.format(
+                label, target_id, idx))
+            await asyncio.sleep(bounded(2**idx))
+            idx += 1
+
+
+async def wait_for_person_group_training(person_group_id, deadline=None):
+    """Wait for the finish of person group training, see
+    `cognitive_face.util.wait_for_person_group_training`."""
+    from . import person_group
+    await _wait_for_training(person_group.get_status, person_group_id,
+                             'Person Group', deadline)
+
+
+async def wait_for_large_face_list_training(large_face_list_id, deadline=None):
+    """Wait for the finish of large face list training, see
+    `cognitive_face.util.wait_for_large_face_list_training`."""
+    from . import large_face_list
+    await _wait_for_training(large_face_list.get_status, large_face_list_id,
+                             'Large Face List', deadline)
+
+
+async def wait_for_large_person_group_training(large_person_group_id,
+                                               deadline=None):
+    """Wait for the finish of large person group training, see
+    `cognitive_face.util.wait_for_large_person_group_training`."""
+    from . import large_person_group
+    await _wait_for_training(large_person_group.get_status,
+                             large_person_group_id, 'Large Person Group',
+                             deadline)
+
+
+async def add_unique_faces(add, images, *args, **kwargs):
+    """Add the faces of `images` through the coroutine function `add`,
+    skipping the near-duplicate photos, see
+    `cognitive_face.util.add_unique_faces`. The images are hashed without
+    blocking the event loop."""
+    deduplicator = kwargs.pop('deduplicator', None) or util.Deduplicator()
+    report = await asyncio.get_event_loop().run_in_executor(
+        None, deduplicator.partition, list(images))
+    results = [await add(image, *args, **kwargs) for image in report.kept]
+    return results, report
+
+
+async def run_concurrently(call, items, concurrency=util.DEFAULT_CONCURRENCY,
+                           ordered=False):
+    """Await `call(item)` for every item of `items`, see
+    `cognitive_face.util.run_concurrently`, yielding the (item, result) pairs
+    from an async generator."""
+    # (item, task) pairs in submission order.
+    pending = collections.deque()
+    items = iter(items)
+
+    async def attempt(item):
+        """Await `call`, returning any error."""
+        try:
+            return await call(item)
+        except Exception as exception:  # pylint: disable=broad-except
+            return exception
+
+    try:
+        while True:
+            for item in items:
+                pending.append((item, asyncio.ensure_future(attempt(item))))
+                if len(pending) >= concurrency:
+                    break
+            if not pending:
+                return
+            if ordered:
+                item, task = pending.popleft()
+                yield item, await task
+                continue
+            done, _ = await asyncio.wait(
+                [task for _, task in pending],
+                return_when=asyncio.FIRST_COMPLETED)
+            for entry in [entry for entry in pending if entry[1] in done]:
+                pending.remove(entry)
+                yield entry[0], entry[1].result()
+    finally:
+        # The caller may stop early, the calls in flight are cancelled.
+        for _, task in pending:
+            task.cancel()
+
+
+def detect_many(detect,
+                images,
+                concurrency=util.DEFAULT_CONCURRENCY,
+                ordered=False,
+                **kwargs):
+    """Detect the faces in every image of `images` through the coroutine
+    function `detect`, see `cognitive_face.face.detect_many`."""
+    return run_concurrently(lambda image: detect(image, **kwargs), images,
+                            concurrency, ordered)
+
+
+async def identify_all(identify,
+                       face_ids,
+                       person_group_id=None,
+                       large_person_group_id=None,
+                       max_candidates_return=1,
+                       threshold=None,
+                       concurrency=util.DEFAULT_CONCURRENCY):
+    """Identify any number of faces through the coroutine function
+    `identify`, see `cognitive_face.face.identify_all`."""
+    # pylint: disable=too-many-arguments
+    outcomes = run_concurrently(
+        lambda chunk: identify(chunk, person_group_id, large_person_group_id,
+                               max_candidates_return, threshold),
+        util.chunks(face_ids, CF.face.MAX_IDENTIFY_FACES), concurrency,
+        ordered=True)
+    return util.merge_identified([outcome async for outcome in outcomes])
+
+
+async def add_group_photo(image,
+                          group_id,
+                          faces,
+                          user_data=None,
+                          add=None,
+                          max_workers=8):
+    """Enroll several people from a single group photo, see
+    `cognitive_face.util.add_group_photo`. The image is read and preprocessed
+    without blocking the event loop."""
+    # pylint: disable=too-many-arguments
+    add = add or CF.aio.large_person_group_person_face.add
+    assignments = util.assignments_of(faces)
+    loop = asyncio.get_event_loop()
+    _, data, json = await loop.run_in_executor(None, util.parse_image, image,
+                                               util.current_client(add))
+    if data is None:
+        shared = json['url']
+    else:
+        shared = BufferBody(await loop.run_in_executor(None, util.load, data),
+                            getattr(data, 'transform', None))
+    semaphore = asyncio.Semaphore(max_workers)
+
+    async def enroll(face, person_id):
+        """Add one face of the shared image."""
+        async with semaphore:
+            try:
+                return await add(shared, group_id, person_id, user_data,
+                                 util.target_face(face))
+            except util.CognitiveFaceException as exception:
+                return exception
+
+    return await asyncio.gather(
+        *[enroll(face, person_id) for face, person_id in assignments])
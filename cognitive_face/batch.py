@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: batch.py
+Description: Micro-batching of the identify calls for the Python SDK of the
+    Cognitive Face API.
+"""
+import collections
+import copy
+import sys
+import threading
+import time
+
+import concurrent.futures
+
+from . import face
+from .deadline import current as current_deadline
+from .deadline import scope
+from .util import DEFAULT_CONCURRENCY
+
+# `time.monotonic` is not available in Python 2.
+_clock = getattr(time, 'monotonic', time.time)
+
+# Seconds a call waits for others to share its identify request.
+DEFAULT_WINDOW = 0.01
+
+
+class Batch(object):
+    """The calls collected for one identify request."""
+
+    def __init__(self, due):
+        self.due = due
+        # face_id -> futures of the calls asking for it
+        self.waiters = collections.OrderedDict()
+        self.deadlines = []
+
+    def add(self, face_id, future, deadline=None):
+        self.waiters.setdefault(face_id, []).append(future)
+        self.deadlines.append(deadline)
+
+    def deadline(self):
+        """Return the latest `Deadline` of the calls, `None` if one of them
+        has none, so that the shared request cuts none of them short."""
+        if not self.deadlines or None in self.deadlines:
+            return None
+        return max(self.deadlines, key=lambda deadline: deadline.expires_at)
+
+
+def batch_key(person_group_id=None,
+              large_person_group_id=None,
+              max_candidates_return=1,
+              threshold=None):
+    """Return the key of the calls which can share an identify request: the
+    target group and the identify parameters."""
+    return (person_group_id, large_person_group_id, max_candidates_return,
+            threshold)
+
+
+def rejected(waiters, outcome):
+    """Whether the service rejected the identify request of several faces,
+    possibly for a single bad `face_id`, so that each face must be sent alone
+    to get its own outcome. Throttling is left to the retries."""
+    status_code = getattr(outcome, 'status_code', None)
+    return len(waiters) > 1 and isinstance(outcome, Exception) and \
+        status_code is not None and 400 <= status_code < 500 and \
+        status_code != 429
+
+
+def resolve(waiters, outcome):
+    """Hand each of `waiters`, a mapping of the `face_id`s to the futures
+    of the calls asking for them, the entry of its face in `outcome`, the
+    result of the identify request, or the exception it raised."""
+    identified = {}
+    if not isinstance(outcome, Exception):
+        identified = dict((entry.get('faceId'), entry) for entry in outcome)
+    for face_id, futures in waiters.items():
+        for future in futures:
+            if future.done():  # Cancelled by its caller meanwhile.
+                continue
+            if isinstance(outcome, Exception):
+                future.set_exception(outcome)
+            else:
+                future.set_result(copy.deepcopy(identified.get(face_id)))
+
+
+class IdentifyBatcher(object):
+    """Thread-safe coalescing of single-face identify calls into shared
+    identify requests.
+
+    The calls for the same group and parameters arriving within `window`
+    seconds of the first one are sent as one request, as soon as it holds
+    the 10 `face_ids` accepted by the service or once the window ends. Each
+    caller gets a `Future` of the entry of its own face, so a busy service
+    makes up to 10 times fewer requests for at most `window` seconds of added
+    latency. A shared request rejected by the service, e.g. for one expired
+    `face_id`, is sent again face by face so that each caller gets its own
+    outcome. The request runs within the latest `Deadline` of its callers.
+
+    E.g. `batcher.submit(face_id, large_person_group_id=group_id).result()`.
+
+    Attributes:
+        window: Seconds a call waits for others to share its request.
+        identify: The identify endpoint, `face.identify` by default or the one
+            of a `FaceClient`.
+    """
+
+    def __init__(self,
+                 window=DEFAULT_WINDOW,
+                 identify=None,
+                 max_workers=DEFAULT_CONCURRENCY):
+        self.window = window
+        self.identify = identify or face.identify
+        self._lock = threading.Condition()
+        self._batches = {}
+        self._closed = False
+        self._stats = {'calls': 0, 'requests': 0}
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers)
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def submit(self, face_id, *args, **kwargs):
+        """Queue the identification of `face_id`.
+
+        Args:
+            face_id: A query `face_id`, created by `face.detect`.
+            *args: `person_group_id`, `large_person_group_id`,
+                `max_candidates_return` and `threshold`, see `face.identify`.
+            **kwargs: The same, by name.
+
+        Returns:
+            A `concurrent.futures.Future` of the identified candidate
+            person(s) of the face, `None` if the service skipped it.
+        """
+        key = batch_key(*args, **kwargs)
+        future = concurrent.futures.Future()
+        # Lost on the threads sending the requests otherwise.
+        deadline = current_deadline()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('The IdentifyBatcher is closed.')
+            self._stats['calls'] += 1
+            batch = self._batches.get(key)
+            if batch is None:
+                batch = self._batches[key] = Batch(_clock() + self.window)
+                self._lock.notify()
+            batch.add(face_id, future, deadline)
+            if len(batch.waiters) >= face.MAX_IDENTIFY_FACES:
+                self._dispatch(key)
+        return future
+
+    def close(self):
+        """Send the pending calls and wait for every request to complete."""
+        with self._lock:
+            self._closed = True
+            self._lock.notify()
+        self._thread.join()
+        self._executor.shutdown()
+
+    def stats(self):
+        """Return the number of calls and of identify requests sent."""
+        with self._lock:
+            return dict(self._stats)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _run(self):
+        """Send the batches whose window has ended, until closed."""
+        with self._lock:
+            while True:
+                now = _clock()
+                for key in [
+                        key for key, batch in self._batches.items()
+                        if self._closed or batch.due <= now
+                ]:
+                    self._dispatch(key)
+                if self._closed:
+                    return
+                timeout = None
+                if self._batches:
+                    timeout = min(
+                        batch.due for batch in self._batches.values()) - now
+                self._lock.wait(timeout)
+
+    def _dispatch(self, key):
+        """Send the batch of `key`, must be called with the lock held."""
+        batch = self._batches.pop(key)
+        self._stats['requests'] += 1
+        self._executor.submit(self._send, key, batch)
+
+    def _send(self, key, batch):
+        for face_id in list(batch.waiters):
+            batch.waiters[face_id] = [
+                future for future in batch.waiters[face_id]
+                if future.set_running_or_notify_cancel()
+            ]
+            if not batch.waiters[face_id]:
+                del batch.waiters[face_id]
+        if not batch.waiters:
+            return
+        with scope(batch.deadline()):
+            outcome = self._identify(list(batch.waiters), key)
+            if not rejected(batch.waiters, outcome):
+                resolve(batch.waiters, outcome)
+                return
+            with self._lock:
+                self._stats['requests'] += len(batch.waiters)
+            for face_id, futures in batch.waiters.items():
+                resolve({face_id: futures}, self._identify([face_id], key))
+
+    def _identify(self, face_ids, key):
+        """Return the result of an identify request, or the exception it
+        raised."""
+        try:
+            return self.identify(face_ids, *key)
+        except Exception:  # pylint: disable=broad-except
+            return sys.exc_info()[1]
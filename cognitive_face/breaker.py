@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: breaker.py
+Description: Per-endpoint circuit breakers for the Python SDK of the Cognitive
+    Face API.
+"""
+import threading
+import time
+
+from .util import CognitiveFaceException
+
+# `time.monotonic` is not available in Python 2.
+_clock = getattr(time, 'monotonic', time.time)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(CognitiveFaceException):
+    """Raised without any network I/O while the circuit breaker of the
+    endpoint of a call is open.
+
+    Attributes:
+        endpoint: Base URL of the endpoint.
+    """
+
+    def __init__(self, endpoint):
+        super(CircuitOpenError, self).__init__(
+            None, 'CircuitOpen',
+            'The circuit breaker of {} is open.'.format(endpoint))
+        self.endpoint = endpoint
+
+
+class CircuitBreaker(object):
+    """Thread-safe circuit breaker of one endpoint.
+
+    The breaker opens after `failure_threshold` consecutive failures, where a
+    call slower than `latency_threshold` counts as a failure too. While open,
+    calls fail fast. After `reset_timeout` seconds it turns half-open and lets
+    `half_open_calls` probes through: a successful probe closes it, a failed
+    one opens it again.
+
+    Attributes:
+        endpoint: Base URL of the endpoint.
+        state: `CLOSED`, `OPEN` or `HALF_OPEN`.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self,
+                 endpoint,
+                 failure_threshold=5,
+                 latency_threshold=None,
+                 reset_timeout=30.0,
+                 half_open_calls=1,
+                 on_state_change=None):
+        self.endpoint = endpoint
+        self.failure_threshold = failure_threshold
+        self.latency_threshold = latency_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_calls = half_open_calls
+        self.on_state_change = on_state_change
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Whether a call may be sent to the endpoint now."""
+        with self._lock:
+            previous = self.state
+            if self.state == OPEN and \
+                    _clock() - self._opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                self._probes = 0
+            if self.state == HALF_OPEN:
+                allowed = self._probes < self.half_open_calls
+                self._probes += allowed
+            else:
+                allowed = self.state == CLOSED
+            state = self.state
+        self._notify(previous, state)
+        return allowed
+
+    def cancel(self):
+        """Give back the probe let through by `allow` for a call which was
+        finally not sent, so that the breaker does not stay half-open."""
+        with self._lock:
+            if self.state == HALF_OPEN and self._probes:
+                self._probes -= 1
+
+    def record(self, failed, latency=None):
+        """Account for the outcome of a call sent to the endpoint.
+
+        Args:
+            failed: Whether the call failed on the endpoint side.
+            latency: Seconds the call took.
+        """
+        if self.latency_threshold is not None and latency is not None and \
+                latency > self.latency_threshold:
+            failed = True
+        with self._lock:
+            previous = self.state
+            if not failed:
+                self._failures = 0
+                if self.state == HALF_OPEN:
+                    self.state = CLOSED
+            else:
+                self._failures += 1
+                if self.state == HALF_OPEN or \
+                        self._failures >= self.failure_threshold:
+                    self.state = OPEN
+                    self._opened_at = _clock()
+            state = self.state
+        self._notify(previous, state)
+
+    def _notify(self, previous, state):
+        if previous != state and self.on_state_change is not None:
+            self.on_state_change(self.endpoint, previous, state)
+
+
+class CircuitBreakers(object):
+    """Lazily created `CircuitBreaker`s, one per endpoint, sharing the same
+    settings (see `CircuitBreaker` for the keyword arguments)."""
+
+    def __init__(self, **settings):
+        self.settings = settings
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def get(self, endpoint):
+        """Get the breaker of `endpoint`."""
+        with self._lock:
+            breaker = self._breakers.get(endpoint)
+            if breaker is None:
+                breaker = self._breakers[endpoint] = CircuitBreaker(
+                    endpoint, **self.settings)
+            return breaker
+
+    def states(self):
+        """Return a dict mapping each endpoint to the state of its breaker."""
+        with self._lock:
+            return {
+                endpoint: breaker.state
+                for endpoint, breaker in self._breakers.items()
+            }
@@ -0,0 +1,292 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: cache.py
+Description: Content-addressed cache of the detection results for the Python
+    SDK of the Cognitive Face API.
+"""
+import collections
+import copy
+import hashlib
+import json as jsonlib
+import os
+import tempfile
+import threading
+import time
+
+from .keypool import FACE_ID_LIFETIME
+from .preprocess import Faces
+from .preprocess import Transform
+
+# Detect parameters the result depends on.
+KEY_PARAMS = ('returnFaceId', 'returnFaceLandmarks', 'returnFaceAttributes')
+
+# Maximum number of results kept in memory.
+DEFAULT_MAX_ENTRIES = 1024
+
+# Maximum number of results kept on disk.
+DEFAULT_MAX_DISK_ENTRIES = 16 * DEFAULT_MAX_ENTRIES
+
+# Results holding `faceId`s stop being served this long before the `faceId`s
+# expire, leaving the caller time to use them.
+FACE_ID_MARGIN = 60 * 60
+
+# Wall clock, the expiry times outlive the process in the on-disk tier.
+_clock = time.time
+
+
+def digest(data=None, json=None, params=None):
+    """Return the key of a detect call, a SHA-256 hex digest of its
+    parameters and of the bytes or the URL of its image."""
+    sha = hashlib.sha256()
+    for name in KEY_PARAMS:
+        sha.update(u'{}={}&'.format(name, (params or {}).get(name) or
+                                    '').encode('utf-8'))
+    if data is None:
+        sha.update(u'url:{}'.format((json or {}).get('url')).encode('utf-8'))
+    elif isinstance(data, (bytes, bytearray, memoryview)):
+        sha.update(b'bytes:')
+        sha.update(data)
+    else:  # A streamed body.
+        sha.update(b'bytes:')
+        for chunk in data:
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+class DetectionCache(object):
+    """Thread-safe two-tier cache of `face.detect` results, addressed by the
+    content of the image.
+
+    Results are kept in memory up to `max_entries`, the least recently used
+    being dropped first, and in `directory` if given, so that they survive
+    the process. The on-disk tier is swept down to `max_disk_entries` when it
+    outgrows them, the least recently used files being removed first. A
+    result holding `faceId`s expires `FACE_ID_MARGIN` before them, that is
+    23 hours after the detection.
+
+    Attributes:
+        max_entries: Maximum number of results kept in memory.
+        directory: Optional directory of the on-disk tier.
+        max_disk_entries: Maximum number of results kept on disk, `None` for
+            no limit.
+    """
+
+    def __init__(self,
+                 max_entries=DEFAULT_MAX_ENTRIES,
+                 directory=None,
+                 max_disk_entries=DEFAULT_MAX_DISK_ENTRIES):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.max_disk_entries = max_disk_entries
+        if directory is not None and not os.path.isdir(directory):
+            os.makedirs(directory)
+        self._lock = threading.Lock()
+        self._sweep_lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+        # Files on disk, counted on the first store.
+        self._disk_entries = None
+        self._stats = {
+            'hits': 0,
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'expired': 0,
+            'swept': 0,
+        }
+
+    def get(self, key):
+        """Return a copy of the result cached under `key`, `None` if none."""
+        now = _clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if _fresh(entry, now):
+                    self._entries[key] = self._entries.pop(key)
+                    self._count('memory_hits')
+                    return copy.deepcopy(entry[1])
+                del self._entries[key]
+                self._stats['expired'] += 1
+        entry = self._load(key, now)
+        with self._lock:
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            self._remember(key, entry)
+            self._count('disk_hits')
+        return copy.deepcopy(entry[1])
+
+    def put(self, key, result, detected_at=None):
+        """Cache `result` under `key`.
+
+        Args:
+            key: Key of the call, see `digest`.
+            result: Decoded result of the call.
+            detected_at: Optional timestamp from which its `faceId`s live,
+                now by default.
+        """
+        expires = None
+        if any(face.get('faceId') for face in result):
+            expires = ((detected_at or _clock()) + FACE_ID_LIFETIME -
+                       FACE_ID_MARGIN)
+        entry = (expires, copy.deepcopy(result))
+        with self._lock:
+            self._remember(key, entry)
+        if self.directory is not None:
+            self._store(key, entry)
+            self._sweep()
+
+    def clear(self):
+        """Drop every cached result, on disk too."""
+        with self._lock:
+            self._entries.clear()
+            self._disk_entries = None
+        if self.directory is not None:
+            for name in os.listdir(self.directory):
+                if name.endswith('.json'):
+                    _remove(os.path.join(self.directory, name))
+
+    def stats(self):
+        """Return the number of hits (from memory and from disk), misses,
+        expired results and results swept from disk."""
+        with self._lock:
+            return dict(self._stats)
+
+    def _count(self, tier):
+        """Count a hit, must be called with the lock held."""
+        self._stats['hits'] += 1
+        self._stats[tier] += 1
+
+    def _remember(self, key, entry):
+        """Keep `entry` in memory, must be called with the lock held."""
+        if not self.max_entries:
+            return
+        self._entries.pop(key, None)
+        self._entries[key] = entry
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.json')
+
+    def _load(self, key, now):
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as entry_file:
+                entry = jsonlib.loads(entry_file.read().decode('utf-8'))
+        except (IOError, OSError, ValueError):
+            return None
+        entry = (entry.get('expires'),
+                 _restore(entry.get('result'), entry.get('transform')))
+        if _fresh(entry, now):
+            _touch(path, now)
+            return entry
+        _remove(path)
+        with self._lock:
+            self._stats['expired'] += 1
+        return None
+
+    def _store(self, key, entry):
+        # Write aside then rename, so that readers never see a partial file.
+        handle, temp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'wb') as entry_file:
+                entry_file.write(
+                    jsonlib.dumps({
+                        'expires': entry[0],
+                        'result': entry[1],
+                        'transform': _dump(getattr(entry[1], 'transform',
+                                                   None)),
+                    }).encode('utf-8'))
+            _touch(temp, _clock())
+            getattr(os, 'replace', os.rename)(temp, self._path(key))
+        except (IOError, OSError):
+            _remove(temp)
+            return
+        with self._lock:
+            if self._disk_entries is not None:
+                self._disk_entries += 1
+
+    def _sweep(self):
+        """Remove the least recently used files once the on-disk tier holds
+        more than `max_disk_entries`, down to 90% of them."""
+        if self.max_disk_entries is None:
+            return
+        with self._lock:
+            count = self._disk_entries
+        if count is not None and count <= self.max_disk_entries:
+            return
+        # A single thread sweeps, the others carry on.
+        if not self._sweep_lock.acquire(False):
+            return
+        try:
+            paths = [
+                os.path.join(self.directory, name)
+                for name in os.listdir(self.directory)
+                if name.endswith('.json')
+            ]
+            excess = len(paths) - self.max_disk_entries
+            if excess > 0:
+                excess += self.max_disk_entries // 10
+                paths.sort(key=_mtime)
+                for path in paths[:excess]:
+                    _remove(path)
+                del paths[:excess]
+                with self._lock:
+                    self._stats['swept'] += excess
+            with self._lock:
+                self._disk_entries = len(paths)
+        finally:
+            self._sweep_lock.release()
+
+
+def _fresh(entry, now):
+    return entry[0] is None or entry[0] > now
+
+
+def _dump(transform):
+    """Return the `Transform` of a result as JSON, `None` if none."""
+    if transform is None:
+        return None
+    return {
+        'scale_x': transform.scale_x,
+        'scale_y': transform.scale_y,
+        'orientation': transform.orientation,
+        'size': transform.size,
+    }
+
+
+def _restore(result, transform):
+    """Return `result` loaded from disk, as `Faces` if it has a
+    `Transform`."""
+    if transform is None:
+        return result
+    size = transform.get('size')
+    return Faces(result,
+                 Transform(transform['scale_x'], transform['scale_y'],
+                           transform['orientation'],
+                           tuple(size) if size else None))
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0
+
+
+def _touch(path, now):
+    """Mark the file at `path` as used `now`, for the sweeps."""
+    try:
+        os.utime(path, (now, now))
+    except OSError:
+        pass
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,422 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: client.py
+Description: Client of the Cognitive Face API holding its own configuration.
+"""
+import json as jsonlib
+import time
+
+from . import face
+from . import face_list
+from . import large_face_list
+from . import large_face_list_face
+from . import large_person_group
+from . import large_person_group_person
+from . import large_person_group_person_face
+from . import person
+from . import person_group
+from . import util
+from .breaker import CircuitOpenError
+from .cache import digest
+from .deadline import DeadlineExceeded
+from .deadline import current as current_deadline
+from .deadline import fits
+from .keypool import stateless
+from .preprocess import require
+from .retry import RetryPolicy
+from .singleflight import SingleFlight
+from .singleflight import flight_key
+from .transport import RequestsTransport
+
+try:
+    from urllib.parse import urlencode
+except ImportError:  # Python 2.
+    from urllib import urlencode
+
+# `time.monotonic` is not available in Python 2.
+_clock = getattr(time, 'monotonic', time.time)
+
+# Seconds to connect and to wait for each read of a response.
+DEFAULT_TIMEOUT = (10.0, 60.0)
+
+# Section modules exposed as namespaces of a client.
+SECTIONS = (face, face_list, large_face_list, large_face_list_face,
+            large_person_group, large_person_group_person,
+            large_person_group_person_face, person, person_group)
+
+
+class FaceClient(object):
+    """Client of the Cognitive Face API.
+
+    A client holds its own subscription key, base URL, transport, rate limiter
+    and retry policy, so several subscriptions or regions can be
+    served side by side from any thread. Every section module is exposed as a
+    namespace bound to the client, e.g. `client.face.detect(image)` or
+    `client.large_person_group.train(large_person_group_id)`. The module-level
+    functions use the client returned by `default`.
+
+    Attributes:
+        key: Subscription Key.
+        base_url: Base URL of the regional endpoint.
+        transport: `Transport` sending the requests, a `RequestsTransport` by
+            default.
+        limiter: Optional `RateLimiter` pacing the requests.
+        retry: `RetryPolicy` of the throttled and failed requests.
+        key_pool: Optional `KeyPool` spreading the calls over several
+            subscription keys and endpoints, overriding `key`, `base_url` and
+            `limiter`.
+        breakers: Optional `CircuitBreakers` failing fast the calls to
+            degraded endpoints.
+        failover: Optional (key, base_url) of a secondary endpoint taking
+            over the stateless calls (`face.detect` without `faceId`s) while
+            the breaker of their endpoint is open. A `None` key means the key
+            of the failing endpoint.
+        timeout: Seconds, or a (connect, read) tuple of seconds, before a
+            stuck call is abandoned. Calls made within a `Deadline` block get
+            at most the remaining budget.
+        hedging: Optional `HedgingPolicy` duplicating the slow idempotent
+            read-style calls.
+        flights: `SingleFlight` sharing one round trip between identical
+            concurrent `GET` calls, `None` when `coalesce` is disabled.
+        cache: Optional `DetectionCache` of the `face.detect` results.
+        fetcher: Optional `URLFetcher` downloading the URL images, which are
+            then uploaded instead of being fetched by the service.
+        mmap_threshold: Optional size in bytes from which the image files are
+            memory-mapped instead of streamed.
+        downscaler: Optional `Downscaler` of the large uploaded images.
+        orient: Whether to turn the uploaded images upright according to
+            their EXIF orientation. Requires Pillow.
+        validator: Optional `Validator` checking the uploaded images before
+            any network I/O.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self,
+                 key=None,
+                 base_url=None,
+                 transport=None,
+                 limiter=None,
+                 retry=None,
+                 key_pool=None,
+                 breakers=None,
+                 failover=None,
+                 timeout=DEFAULT_TIMEOUT,
+                 hedging=None,
+                 coalesce=True,
+                 cache=None,
+                 fetcher=None,
+                 mmap_threshold=None,
+                 downscaler=None,
+                 orient=False,
+                 validator=None):
+        self.key = key
+        self.base_url = base_url
+        self.transport = transport or RequestsTransport()
+        self.limiter = limiter
+        self.retry = retry or RetryPolicy()
+        self.key_pool = key_pool
+        self.breakers = breakers
+        self.failover = failover
+        self.timeout = timeout
+        self.hedging = hedging
+        self.flights = SingleFlight() if coalesce else None
+        self.cache = cache
+        self.fetcher = fetcher
+        self.mmap_threshold = mmap_threshold
+        self.downscaler = downscaler
+        if orient:
+            require()
+        self.orient = orient
+        self.validator = validator
+        for section in SECTIONS:
+            name = section.__name__.rsplit('.', 1)[-1]
+            setattr(self, name, util.Namespace(section, self.bind))
+
+    @property
+    def base_url(self):
+        """Base URL of the regional endpoint, always ending with a slash."""
+        return self._base_url
+
+    @base_url.setter
+    def base_url(self, base_url):
+        base_url = base_url or util.DEFAULT_BASE_URL
+        if not base_url.endswith('/'):
+            base_url += '/'
+        self._base_url = base_url
+
+    def bind(self, func):
+        """Return a wrapper of `func` sending its requests through this client,
+        e.g. `client.bind(util.wait_for_large_person_group_training)`."""
+        return util.bind(func, self.request)
+
+    def route(self, url):
+        """Return the path of `url` relative to the base URL, e.g. 'detect'."""
+        if url.startswith(self.base_url):
+            url = url[len(self.base_url):]
+        return url.split('?', 1)[0].strip('/')
+
+    def prepare(self, url, headers=None, key=None, base_url=None,
+                params=None):
+        """Complete the URL and the headers of a request.
+
+        Args:
+            url: A full URL or a short name relative to the `base_url`.
+            headers: Optional HTTP headers.
+            key: Optional Subscription Key overriding the `key` of the client.
+            base_url: Optional Base URL overriding the `base_url` of the
+                client.
+            params: Optional query parameters, the `None` ones are skipped.
+
+        Returns:
+            a two-item tuple consist of the full URL and the HTTP headers with
+            default Content-Type and Subscription Key.
+        """
+        # pylint: disable=too-many-arguments
+        key = key or self.key
+        base_url = base_url or self.base_url
+
+        # Make it possible to call only with short name (without BaseUrl).
+        if not url.startswith('https://'):
+            url = base_url + url
+        query = urlencode([(name, value)
+                           for name, value in (params or {}).items()
+                           if value is not None])
+        if query:
+            url += ('&' if '?' in url else '?') + query
+
+        # Setup the headers with default Content-Type and Subscription Key.
+        headers = headers or {}
+        if 'Content-Type' not in headers:
+            headers['Content-Type'] = 'application/json'
+        headers['Ocp-Apim-Subscription-Key'] = key
+
+        return url, headers
+
+    def pick(self, route, params=None):
+        """Pick the `KeyPool` member of a call, `None` without a key pool."""
+        if self.key_pool is None:
+            return None
+        return self.key_pool.pick(route, params)
+
+    def locate(self, route, member=None, params=None):
+        """Return the Subscription Key and Base URL to send a call to.
+
+        When the circuit breaker of the endpoint is open, stateless calls are
+        sent to the `failover` endpoint if any, other calls fail fast.
+
+        Raises:
+            CircuitOpenError: No endpoint is available for the call.
+        """
+        key, base_url = (member.key, member.base_url) if member else \
+            (self.key, self.base_url)
+        if self.breakers is None or self.breakers.get(base_url).allow():
+            return key, base_url
+        if self.failover is not None and stateless(route, params):
+            failover_key, failover_url = self.failover
+            if self.breakers.get(failover_url).allow():
+                return failover_key or key, failover_url
+        raise CircuitOpenError(base_url)
+
+    def trip(self, base_url, failed, latency):
+        """Account for the outcome of a call in the breaker of its endpoint.
+
+        Args:
+            base_url: Base URL the call was sent to.
+            failed: Whether the call failed on the endpoint side.
+            latency: Seconds the call took.
+        """
+        if self.breakers is not None:
+            self.breakers.get(base_url).record(failed, latency)
+
+    def settle(self, member, base_url=None, response=None, latency=None):
+        """Account for the outcome of a call in the breaker of its endpoint
+        and in its `KeyPool` member, however the call ended.
+
+        Args:
+            member: The `KeyPool` member of the call, if any.
+            base_url: Base URL the call was located on, `None` when it could
+                not be located.
+            response: The `Response` of the call, `None` when it failed
+                without a response or was not sent.
+            latency: Seconds the call took, `None` when it was not sent, in
+                which case the breaker probe it took, if any, is given back.
+        """
+        if latency is None:
+            if base_url is not None and self.breakers is not None:
+                self.breakers.get(base_url).cancel()
+            self.release(member)
+        elif response is None:
+            self.trip(base_url, True, latency)
+            self.release(member, error=True)
+        else:
+            self.trip(base_url, response.status >= 500, latency)
+            self.release(member, response.status,
+                         response.headers.get('Retry-After'))
+
+    def reserve(self, member=None):
+        """Reserve a request and return the seconds to wait before it."""
+        if member is not None:
+            return member.reserve()
+        if self.limiter is not None:
+            return self.limiter.reserve(self.key)
+        return 0.0
+
+    def admit(self, member=None):
+        """Reserve an extra request, such as a hedge, only if it may be sent
+        right now, return whether it was reserved."""
+        if member is not None:
+            return member.try_reserve()
+        if self.limiter is not None:
+            return self.limiter.try_acquire(self.key)
+        return True
+
+    def send(self, method, url, route, member=None, **kwargs):
+        """Send a request through the `transport`, hedged when the `hedging`
+        policy applies to it."""
+        # pylint: disable=too-many-arguments
+        if self.hedging is None or not self.hedging.applies(method, route):
+            return self.transport.send(method, url, **kwargs)
+        return self.hedging.send(
+            lambda: self.transport.send(method, url, **kwargs), route,
+            lambda: self.admit(member))
+
+    def release(self, member, status_code=None, retry_after=None,
+                error=False):
+        """Account for the outcome of a call sent to `member`, if any, see
+        `KeyPool.release`."""
+        if member is not None:
+            self.key_pool.release(member, status_code, retry_after, error)
+
+    def timeouts(self, deadline=None):
+        """Return the (connect, read) timeouts of a call, capped to the
+        remaining budget of `deadline`."""
+        timeout = self.timeout if isinstance(self.timeout, tuple) else \
+            (self.timeout, self.timeout)
+        return timeout if deadline is None else deadline.cap(timeout)
+
+    def finish(self, route, result, transform=None):
+        """Return the decoded `result` of a call, mapping the faces detected
+        on a preprocessed image back onto the original one, as `Faces`."""
+        if route == 'detect' and isinstance(result, list) and \
+                transform is not None:
+            result = transform.restore(result)
+        return result
+
+    def request(self,
+                method,
+                url,
+                data=None,
+                json=None,
+                headers=None,
+                params=None):
+        """Send a request through the `transport` and handle the result, see
+        `util.request`. Identical concurrent `GET` calls share one call, and
+        `face.detect` results are served from the `cache` if any. URL
+        images are downloaded and uploaded by the `fetcher` if any."""
+        if self.fetcher is not None and data is None and \
+                (json or {}).get('url'):
+            headers, data, json = util.fetch_image(self, json['url'])
+        if self.cache is not None and self.route(url) == 'detect':
+            key = digest(data, json, params)
+            result = self.cache.get(key)
+            if result is None:
+                detected_at = time.time()
+                result = self.perform(method, url, data, json, headers,
+                                      params)
+                self.cache.put(key, result, detected_at)
+            return result
+        if self.flights is None or method.upper() != 'GET':
+            return self.perform(method, url, data, json, headers, params)
+        return self.flights.do(
+            flight_key(method, url, params),
+            lambda: self.perform(method, url, data, json, headers, params),
+            current_deadline())
+
+    def perform(self,
+                method,
+                url,
+                data=None,
+                json=None,
+                headers=None,
+                params=None):
+        """Send a request with retries, failover and rate limiting."""
+        route = self.route(url)
+        body = data if data is not None else encode_json(json)
+        transform = getattr(data, 'transform', None)
+        params = map_target_face(params, transform)
+        attempts = self.retry.start(method, url)
+        deadline = current_deadline()
+
+        while True:
+            if deadline is not None:
+                deadline.check()
+            member = self.pick(route, params)
+            base_url = started = response = None
+            try:
+                key, base_url = self.locate(route, member, params)
+                target, headers = self.prepare(url, headers, key, base_url,
+                                               params)
+                delay = self.reserve(member)
+                if not fits(deadline, delay):
+                    raise DeadlineExceeded()
+                if delay:
+                    time.sleep(delay)
+                started = _clock()
+                response = self.send(
+                    method,
+                    target,
+                    route,
+                    member,
+                    headers=headers,
+                    body=body,
+                    timeout=self.timeouts(deadline))
+            except self.transport.errors:
+                if deadline is not None and deadline.expired():
+                    raise DeadlineExceeded()
+                delay = attempts.backoff(error=True)
+                if delay is None or not fits(deadline, delay):
+                    raise
+            finally:
+                # Whatever ended the call, even an unexpected exception.
+                self.settle(member, base_url, response, None
+                            if started is None else _clock() - started)
+            if response is not None:
+                retry_after = response.headers.get('Retry-After')
+                delay = attempts.backoff(response.status, retry_after)
+                if delay is None or not fits(deadline, delay):
+                    return self.finish(
+                        route,
+                        util.handle_response(response.status, response.body),
+                        transform)
+            time.sleep(delay)
+
+    def close(self):
+        """Close the pooled connections of the client."""
+        self.transport.close()
+
+
+def map_target_face(params, transform=None):
+    """Return the query `params` of a call uploading an image preprocessed by
+    `transform`, with its `targetFace` mapped onto the uploaded image."""
+    if transform is None or not (params or {}).get('targetFace'):
+        return params
+    params = dict(params)
+    params['targetFace'] = transform.target_face(params['targetFace'])
+    return params
+
+
+def encode_json(json):
+    """Encode a JSON body to bytes, `None` for no body."""
+    if json is None:
+        return None
+    return jsonlib.dumps(json, allow_nan=False).encode('utf-8')
+
+
+_DEFAULT = FaceClient()
+
+
+def default():
+    """Return the client used by the module-level functions and configured by
+    `Key`, `BaseUrl`, `ConnectionPool`, `RateLimit` and `Retry`."""
+    return _DEFAULT
@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: deadline.py
+Description: Deadlines bounding composite operations of the Python SDK of the
+    Cognitive Face API.
+"""
+import threading
+import time
+
+from .util import CognitiveFaceException
+
+try:
+    import contextvars
+except ImportError:  # Python 2 and Python 3 before 3.7.
+    contextvars = None
+
+# `time.monotonic` is not available in Python 2.
+_clock = getattr(time, 'monotonic', time.time)
+
+if contextvars is not None:
+    # A context variable follows the coroutines of `cognitive_face.aio` too.
+    _CURRENT = contextvars.ContextVar('cognitive_face_deadline', default=None)
+else:
+    _LOCAL = threading.local()
+
+
+class DeadlineExceeded(CognitiveFaceException):
+    """Raised when a call or a composite operation runs out of time."""
+
+    def __init__(self):
+        super(DeadlineExceeded, self).__init__(None, 'DeadlineExceeded',
+                                               'The deadline has passed.')
+
+
+class Deadline(object):
+    """A point in time by which an operation must be done.
+
+    Used as a context manager, the deadline flows through every call made in
+    the block, including the inner calls of composite operations such as
+    `util.wait_for_large_person_group_training`: each call is given only the
+    remaining budget as timeout and no call is started past the deadline.
+    Nested deadlines never extend the enclosing one.
+
+        with Deadline(30):
+            util.wait_for_large_person_group_training(large_person_group_id)
+
+    Attributes:
+        expires_at: Clock time of the deadline.
+    """
+
+    def __init__(self, timeout):
+        self.expires_at = _clock() + timeout
+        self._tokens = []
+
+    @classmethod
+    def of(cls, deadline):
+        """Return `deadline` as a `Deadline`, given a `Deadline`, a number of
+        seconds or `None` (meaning no deadline, returned as is)."""
+        if deadline is None or isinstance(deadline, cls):
+            return deadline
+        return cls(deadline)
+
+    def remaining(self):
+        """Return the seconds left before the deadline."""
+        return max(0.0, self.expires_at - _clock())
+
+    def expired(self):
+        """Whether the deadline has passed."""
+        return _clock() >= self.expires_at
+
+    def check(self):
+        """Raise `DeadlineExceeded` if the deadline has passed."""
+        if self.expired():
+            raise DeadlineExceeded()
+
+    def cap(self, timeout):
+        """Cap a timeout, in seconds or a (connect, read) tuple, to the
+        remaining budget."""
+        remaining = self.remaining()
+        if timeout is None:
+            return remaining
+        if isinstance(timeout, tuple):
+            return tuple(
+                remaining if value is None else min(value, remaining)
+                for value in timeout)
+        return min(timeout, remaining)
+
+    def __enter__(self):
+        outer = current()
+        effective = self if outer is None or \
+            self.expires_at < outer.expires_at else outer
+        if contextvars is not None:
+            self._tokens.append(_CURRENT.set(effective))
+        else:
+            self._tokens.append(outer)
+            _LOCAL.deadline = effective
+        return self
+
+    def __exit__(self, *exc_info):
+        token = self._tokens.pop()
+        if contextvars is not None:
+            _CURRENT.reset(token)
+        else:
+            _LOCAL.deadline = token
+
+
+def current():
+    """Return the deadline of the running block, `None` if there is none."""
+    if contextvars is not None:
+        return _CURRENT.get()
+    return getattr(_LOCAL, 'deadline', None)
+
+
+def scope(deadline):
+    """Return a context manager applying `deadline` (a `Deadline`, seconds or
+    `None`) to the calls made in its block. Several threads or tasks can apply
+    the same deadline at once."""
+    deadline = Deadline.of(deadline)
+    if deadline is None:
+        return _NoDeadline()
+    # A block of its own, as a `Deadline` entered by several threads at once
+    # would restore the enclosing deadline of another one.
+    block = Deadline(0)
+    block.expires_at = deadline.expires_at
+    return block
+
+
+def fits(deadline, delay):
+    """Whether a pause of `delay` seconds ends before `deadline`, if any."""
+    return deadline is None or delay < deadline.remaining()
+
+
+def bounded(seconds):
+    """Cap a pause of `seconds` to the remaining budget of the current
+    deadline.
+
+    Raises:
+        DeadlineExceeded: The current deadline has passed.
+    """
+    deadline = current()
+    if deadline is None:
+        return seconds
+    deadline.check()
+    return min(seconds, deadline.remaining())
+
+
+class _NoDeadline(object):
+    """Context manager of a block without a deadline of its own."""
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc_info):
+        pass
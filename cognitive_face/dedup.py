@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: dedup.py
+Description: Perceptual-hash de-duplication of the images to enroll for the
+    Python SDK of the Cognitive Face API.
+"""
+import concurrent.futures
+import io
+import os
+
+from .upload import BUFFER_TYPES
+from .upload import view
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# Side of the grid of the difference hash, giving a hash of HASH_SIZE ** 2
+# bits.
+HASH_SIZE = 8
+
+# Maximum Hamming distance between the hashes of near-duplicate images.
+DEFAULT_THRESHOLD = 6
+
+
+def dhash(path=None, content=None):
+    """Return the difference hash of an image and its number of pixels.
+
+    The image is shrunk to a (HASH_SIZE + 1) x HASH_SIZE grayscale grid and
+    each bit tells whether a pixel is brighter than its right neighbour, so
+    re-encoded, resized or slightly retouched copies get close hashes.
+
+    Args:
+        path: The file path of the image.
+        content: The bytes of the image, when not given by `path`.
+
+    Returns:
+        a two-item tuple consist of the hash as an integer and the number of
+        pixels of the image.
+    """
+    picture = Image.open(path if path is not None else io.BytesIO(content))
+    try:
+        width, height = picture.size
+        # Let the JPEG decoder skip the unneeded resolution.
+        picture.draft('L', (HASH_SIZE * 4, HASH_SIZE * 4))
+        small = picture.convert('L').resize((HASH_SIZE + 1, HASH_SIZE),
+                                            Image.LANCZOS)
+    finally:
+        picture.close()
+    pixels = list(small.getdata())
+    bits = 0
+    for row in range(HASH_SIZE):
+        for col in range(HASH_SIZE):
+            left = pixels[row * (HASH_SIZE + 1) + col]
+            bits = bits << 1 | (left > pixels[row * (HASH_SIZE + 1) + col + 1])
+    return bits, width * height
+
+
+def hamming(first, second):
+    """Return the number of bits differing between two hashes."""
+    return bin(first ^ second).count('1')
+
+
+class DedupReport(object):
+    """Outcome of a de-duplication pass.
+
+    Attributes:
+        kept: Images to upload, in their original order.
+        skipped: Near duplicates left out, as dicts of the `image`, the kept
+            image it duplicates (`duplicate_of`) and their hash `distance`.
+        unhashed: Images kept without being compared, such as URLs or
+            unreadable images.
+        clusters: Lists of the indexes of the images of each cluster of near
+            duplicates, the kept ones first.
+    """
+
+    def __init__(self):
+        self.kept = []
+        self.skipped = []
+        self.unhashed = []
+        self.clusters = []
+
+    def __repr__(self):
+        return '<DedupReport kept={} skipped={} unhashed={}>'.format(
+            len(self.kept), len(self.skipped), len(self.unhashed))
+
+
+class Deduplicator(object):
+    """Cluster near-duplicate images by the Hamming distance of their
+    perceptual hashes, computed in a pool of processes, and keep the `keep`
+    largest images of each cluster. Requires Pillow.
+
+    Attributes:
+        threshold: Maximum Hamming distance between near duplicates.
+        keep: Number of images kept per cluster.
+        max_workers: Number of hashing processes, the number of processors by
+            default.
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, keep=1, max_workers=None):
+        if Image is None:
+            raise ImportError(
+                'De-duplicating images requires Pillow, install it with '
+                '`pip install cognitive_face[image]`.')
+        self.threshold = threshold
+        self.keep = keep
+        self.max_workers = max_workers
+
+    def hashes(self, images):
+        """Return the `dhash` of each image, `None` for the images which
+        cannot be hashed locally."""
+        sources = [_source(image) for image in images]
+        hashed = [idx for idx, source in enumerate(sources) if source]
+        results = [None] * len(images)
+        if not hashed:
+            return results
+        with concurrent.futures.ProcessPoolExecutor(
+                self.max_workers) as executor:
+            futures = [(idx, executor.submit(dhash, **sources[idx]))
+                       for idx in hashed]
+            for idx, future in futures:
+                try:
+                    results[idx] = future.result()
+                except Exception:  # pylint: disable=broad-except
+                    # Leave unreadable images to the service to reject.
+                    pass
+        return results
+
+    def partition(self, images):
+        """Split `images` into the ones to upload and the near duplicates.
+
+        Returns:
+            A `DedupReport`.
+        """
+        images = list(images)
+        hashes = self.hashes(images)
+        report = DedupReport()
+        clusters = []
+        for idx, image_hash in enumerate(hashes):
+            if image_hash is None:
+                report.unhashed.append(images[idx])
+                continue
+            for cluster in clusters:
+                if hamming(hashes[cluster[0]][0],
+                           image_hash[0]) <= self.threshold:
+                    cluster.append(idx)
+                    break
+            else:
+                clusters.append([idx])
+
+        kept = set(idx for idx, image_hash in enumerate(hashes)
+                   if image_hash is None)
+        for cluster in clusters:
+            # The largest images first, the earliest among equals.
+            cluster.sort(key=lambda idx: (-hashes[idx][1], idx))
+            kept.update(cluster[:self.keep])
+            for idx in cluster[self.keep:]:
+                report.skipped.append({
+                    'image': images[idx],
+                    'duplicate_of': images[cluster[0]],
+                    'distance': hamming(hashes[cluster[0]][0],
+                                        hashes[idx][0]),
+                })
+            report.clusters.append(cluster)
+        report.kept = [images[idx] for idx in sorted(kept)]
+        return report
+
+
+def _source(image):
+    """Return the `dhash` arguments reading `image` in another process, its
+    path or its bytes, `None` for a URL or a stream which cannot be rewound.
+    """
+    if isinstance(image, BUFFER_TYPES):
+        content = view(image)
+        if not isinstance(content, bytes):
+            content = content.tobytes()
+        return {'content': content}
+    if hasattr(image, 'read'):
+        try:
+            position = image.tell()
+            content = image.read()
+            image.seek(position)
+        except (AttributeError, IOError, OSError):
+            return None
+        return {'content': content}
+    if os.path.isfile(image):
+        return {'path': image}
+    return None
@@ -6,6 +6,9 @@ Description: Face section of the Cognitive Face API.
 """
 from . import util
 
+# Maximum number of `face_ids` of an identify call.
+MAX_IDENTIFY_FACES = 10
+
 
 def detect(image, face_id=True, landmarks=False, attributes=''):
     """Detect human faces in an image and returns face locations, and
@@ -41,6 +44,36 @@ def detect(image, face_id=True, landmarks=False, attributes=''):
         'POST', url, headers=headers, params=params, json=json, data=data)
 
 
+def detect_many(images,
+                concurrency=util.DEFAULT_CONCURRENCY,
+                ordered=False,
+                face_id=True,
+                landmarks=False,
+                attributes=''):
+    """Detect human faces in every image of a collection of any size, with a
+    bounded number of `detect` calls in flight.
+
+    Args:
+        images: An iterable of URLs, file paths, file-like objects or
+            in-memory buffers, consumed lazily.
+        concurrency: [Optional] Maximum number of calls in flight.
+        ordered: [Optional] Yield the results in the order of `images`
+            rather than as they complete. The default value is false.
+        face_id: [Optional] See `detect`.
+        landmarks: [Optional] See `detect`.
+        attributes: [Optional] See `detect`.
+
+    Returns:
+        An iterator of (image, result) pairs, the result being the array of
+        face entries returned by `detect` for the image, or the exception it
+        raised, so that a bad image does not stop the others.
+    """
+    # pylint: disable=too-many-arguments
+    return util.run_concurrently(
+        lambda image: detect(image, face_id, landmarks, attributes), images,
+        concurrency, ordered)
+
+
 def find_similars(face_id,
                   face_list_id=None,
                   large_face_list_id=None,
@@ -145,6 +178,39 @@ def identify(face_ids,
     return util.request('POST', url, json=json)
 
 
+def identify_all(face_ids,
+                 person_group_id=None,
+                 large_person_group_id=None,
+                 max_candidates_return=1,
+                 threshold=None,
+                 concurrency=util.DEFAULT_CONCURRENCY):
+    """Identify any number of unknown faces from a person group or a large
+    person group, splitting them into concurrent `identify` calls of at most
+    10 `face_ids`.
+
+    Args:
+        face_ids: An array of query `face_id`s, created by the `face.detect`,
+            of any length.
+        person_group_id: See `identify`.
+        large_person_group_id: See `identify`.
+        max_candidates_return: See `identify`.
+        threshold: See `identify`.
+        concurrency: Optional parameter. Maximum number of `identify` calls in
+            flight, paced by the rate limiter if any.
+
+    Returns:
+        The identified candidate person(s) for each query face, in the order
+        of `face_ids`. The entry of a face whose call failed is the exception
+        it raised, the other calls are not affected.
+    """
+    # pylint: disable=too-many-arguments
+    outcomes = util.run_concurrently(
+        lambda chunk: identify(chunk, person_group_id, large_person_group_id,
+                               max_candidates_return, threshold),
+        util.chunks(face_ids, MAX_IDENTIFY_FACES), concurrency, ordered=True)
+    return util.merge_identified(outcomes)
+
+
 def verify(face_id,
            another_face_id=None,
            person_group_id=None,
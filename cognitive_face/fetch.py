@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: fetch.py
+Description: Client-side download of the URL images for the Python SDK of the
+    Cognitive Face API.
+"""
+import collections
+import threading
+
+import requests
+
+from .deadline import DeadlineExceeded
+from .deadline import current as current_deadline
+from .session import DEFAULT_IDLE_TIMEOUT
+from .session import DEFAULT_POOL_SIZE
+from .session import SessionPool
+from .singleflight import SingleFlight
+from .util import CognitiveFaceException
+from .validate import MAX_BYTES
+
+# Maximum number of bytes of images kept in the cache.
+DEFAULT_MAX_CACHE_BYTES = 64 * 1024 * 1024
+
+# Seconds to connect to an origin and to wait for each read of an image.
+DEFAULT_TIMEOUT = (5.0, 30.0)
+
+# Size of the chunks an image is downloaded in.
+_CHUNK_SIZE = 64 * 1024
+
+
+class FetchError(CognitiveFaceException):
+    """Raised when the image at a URL cannot be downloaded, with the error
+    code the service would return: `InvalidURL` when the origin fails or
+    answers with an error, `InvalidImageSize` for an image over the size
+    limit.
+
+    Attributes:
+        url: URL of the image.
+    """
+
+    def __init__(self, url, code, msg):
+        super(FetchError, self).__init__(None, code, msg)
+        self.url = url
+
+
+class URLFetcher(object):
+    """Thread-safe downloader of the URL images, with a bounded cache.
+
+    The images are downloaded through pooled keep-alive sessions and cached,
+    up to `max_cache_bytes`, the least recently used being dropped first. A
+    cached image is revalidated against its origin with its `ETag` or
+    `Last-Modified` validator, so an unchanged image costs a bodyless 304
+    response. Concurrent fetches of the same URL share one download.
+
+    Attributes:
+        max_cache_bytes: Maximum number of bytes of images kept in the cache,
+            0 disables the cache.
+        max_size: Maximum size of an image in bytes, the limit of the service
+            by default.
+        timeout: (connect, read) timeouts in seconds, capped to the current
+            `Deadline` if any.
+        pool: The `SessionPool` sending the requests.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self,
+                 max_cache_bytes=DEFAULT_MAX_CACHE_BYTES,
+                 max_size=MAX_BYTES,
+                 timeout=DEFAULT_TIMEOUT,
+                 pool_size=DEFAULT_POOL_SIZE,
+                 idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        self.max_cache_bytes = max_cache_bytes
+        self.max_size = max_size
+        self.timeout = timeout
+        self.pool = SessionPool(pool_size, idle_timeout)
+        self.flights = SingleFlight()
+        self._lock = threading.Lock()
+        # url -> (etag, last modified, content)
+        self._entries = collections.OrderedDict()
+        self._size = 0
+        self._stats = {'fetches': 0, 'downloads': 0, 'revalidated': 0}
+
+    def fetch(self, url):
+        """Return the content of the image at `url`.
+
+        Raises:
+            FetchError: The image cannot be downloaded.
+            DeadlineExceeded: The current deadline has passed.
+        """
+        with self._lock:
+            self._stats['fetches'] += 1
+        return self.flights.do(('GET', url), lambda: self._fetch(url),
+                               current_deadline())
+
+    def clear(self):
+        """Drop every cached image."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self):
+        """Return the number of fetches, of full downloads and of cached
+        images revalidated without a download, and the size of the cache."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update(entries=len(self._entries), size=self._size)
+            return stats
+
+    def _fetch(self, url):
+        with self._lock:
+            entry = self._entries.get(url)
+        headers = {}
+        if entry is not None:
+            if entry[0]:
+                headers['If-None-Match'] = entry[0]
+            if entry[1]:
+                headers['If-Modified-Since'] = entry[1]
+        deadline = current_deadline()
+        timeout = self.timeout if deadline is None else \
+            deadline.cap(self.timeout)
+        try:
+            response = self.pool.request(
+                'GET', url, headers=headers, timeout=timeout, stream=True)
+        except (requests.RequestException, ValueError) as exc:
+            raise _failed(url, exc, deadline)
+        try:
+            if response.status_code == 304 and entry is not None:
+                with self._lock:
+                    self._stats['revalidated'] += 1
+                    if url in self._entries:
+                        self._entries[url] = self._entries.pop(url)
+                return entry[2]
+            if response.status_code != 200:
+                raise FetchError(
+                    url, 'InvalidURL', 'Failed to download {}: {} {}'.format(
+                        url, response.status_code, response.reason))
+            content = self._read(url, response, deadline)
+        finally:
+            response.close()
+        with self._lock:
+            self._stats['downloads'] += 1
+        self._remember(url, response.headers.get('ETag'),
+                       response.headers.get('Last-Modified'), content)
+        return content
+
+    def _read(self, url, response, deadline):
+        """Read the body of `response`, up to `max_size` bytes, within
+        `deadline` if any."""
+        length = response.headers.get('Content-Length')
+        if length and length.isdigit() and int(length) > self.max_size:
+            raise _too_large(url, self.max_size)
+        chunks = []
+        size = 0
+        try:
+            for chunk in response.iter_content(_CHUNK_SIZE):
+                size += len(chunk)
+                if size > self.max_size:
+                    raise _too_large(url, self.max_size)
+                chunks.append(chunk)
+        except requests.RequestException as exc:
+            raise _failed(url, exc, deadline)
+        return b''.join(chunks)
+
+    def _remember(self, url, etag, last_modified, content):
+        """Cache `content` if it can be revalidated and fits."""
+        with self._lock:
+            previous = self._entries.pop(url, None)
+            if previous is not None:
+                self._size -= len(previous[2])
+            if not (etag or last_modified) or \
+                    len(content) > self.max_cache_bytes:
+                return
+            self._entries[url] = (etag, last_modified, content)
+            self._size += len(content)
+            while self._size > self.max_cache_bytes:
+                self._size -= len(self._entries.popitem(last=False)[1][2])
+
+
+def _failed(url, exc, deadline):
+    """Return the error of a failed download: `DeadlineExceeded` when it was
+    cut short by the `deadline` of the caller, which its followers do not
+    share, a `FetchError` otherwise."""
+    if deadline is not None and deadline.expired():
+        return DeadlineExceeded()
+    return FetchError(url, 'InvalidURL',
+                      'Failed to download {}: {}'.format(url, exc))
+
+
+def _too_large(url, max_size):
+    return FetchError(
+        url, 'InvalidImageSize',
+        'The image at {} is larger than {} bytes.'.format(url, max_size))
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: hedge.py
+Description: Hedged requests for latency-critical calls of the Python SDK of
+    the Cognitive Face API.
+"""
+import collections
+import concurrent.futures
+import threading
+import time
+
+# `time.monotonic` is not available in Python 2.
+_clock = getattr(time, 'monotonic', time.time)
+
+# Read-only `POST` endpoints worth hedging, on top of every `GET`.
+HEDGE_ROUTES = ('findsimilars', 'identify', 'verify')
+
+
+class HedgingPolicy(object):
+    """Opt-in hedging of idempotent read-style calls.
+
+    When a call has not finished after the `percentile` of the latencies
+    observed for its route (or after `delay` seconds until `min_samples`
+    latencies are known), a duplicate is sent and the first response wins.
+    The loser is cancelled, or its response discarded when it cannot be
+    interrupted. A duplicate is only sent when the rate limiter has a token
+    to spare.
+
+    Attributes:
+        percentile: Percentile of the observed latencies to hedge after.
+        delay: Seconds to hedge after until enough latencies are observed.
+        min_samples: Latencies to observe for a route before using them.
+        window: Number of latest latencies kept per route.
+        routes: Routes hedged on top of every `GET`.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self,
+                 percentile=95,
+                 delay=1.0,
+                 min_samples=20,
+                 window=1000,
+                 routes=HEDGE_ROUTES,
+                 max_workers=32):
+        self.percentile = percentile
+        self.delay = delay
+        self.min_samples = min_samples
+        self.window = window
+        self.routes = routes
+        self.max_workers = max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+        self._latencies = {}
+        self._stats = {'calls': 0, 'hedged': 0, 'hedge_wins': 0}
+
+    def applies(self, method, route):
+        """Whether calls of `method` on `route` are hedged."""
+        return method.upper() == 'GET' or route in self.routes
+
+    def delay_for(self, route):
+        """Return the seconds to wait before hedging a call on `route`."""
+        with self._lock:
+            latencies = sorted(self._latencies.get(route, ()))
+        if len(latencies) < self.min_samples:
+            return self.delay
+        return latencies[int(self.percentile / 100.0 * (len(latencies) - 1))]
+
+    def observe(self, route, latency, hedged, hedge_won):
+        """Account for a finished call.
+
+        Args:
+            route: Route of the call.
+            latency: Seconds until the winning response.
+            hedged: Whether a duplicate was sent.
+            hedge_won: Whether the duplicate won.
+        """
+        with self._lock:
+            latencies = self._latencies.get(route)
+            if latencies is None:
+                latencies = self._latencies[route] = collections.deque(
+                    maxlen=self.window)
+            latencies.append(latency)
+            self._stats['calls'] += 1
+            self._stats['hedged'] += hedged
+            self._stats['hedge_wins'] += hedge_won
+
+    def stats(self):
+        """Return the hedging overhead as a dict of `calls`, `hedged` (the
+        extra requests sent) and `hedge_wins` (the extra requests which
+        answered first)."""
+        with self._lock:
+            return dict(self._stats)
+
+    def send(self, call, route, admit):
+        """Run `call`, hedged with a duplicate when it is slow.
+
+        Args:
+            call: Function sending the request and returning the response.
+            route: Route of the call.
+            admit: Function telling whether a duplicate may be sent now.
+
+        Returns:
+            The first response, or raises the error of the last failed call.
+        """
+        started = _clock()
+        executor = self._get_executor()
+        first = executor.submit(call)
+        done, _ = concurrent.futures.wait([first],
+                                          timeout=self.delay_for(route))
+        if done or not admit():
+            response = first.result()
+            self.observe(route, _clock() - started, False, False)
+            return response
+
+        second = executor.submit(call)
+        pending = [first, second]
+        while True:
+            done, _ = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            winner = done.pop()
+            pending.remove(winner)
+            if winner.exception() is None or not pending:
+                break
+        for loser in pending:
+            loser.cancel()
+        self.observe(route, _clock() - started, True, winner is second)
+        return winner.result()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    self.max_workers)
+            return self._executor
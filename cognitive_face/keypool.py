@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: keypool.py
+Description: Load-balanced pool of subscription keys and endpoints for the
+    Python SDK of the Cognitive Face API.
+"""
+import threading
+import time
+
+from .ratelimit import TokenBucket
+from .retry import parse_retry_after
+
+# `time.monotonic` is not available in Python 2.
+_clock = getattr(time, 'monotonic', time.time)
+
+# Calls which do not depend on any data held by the service, unless they issue
+# `faceId`s, see `stateless`.
+STATELESS_ROUTES = ('detect', )
+# Seconds a `faceId` stays valid on the service.
+FACE_ID_LIFETIME = 24 * 60 * 60
+
+
+def stateless(route, params=None):
+    """Return whether a call neither depends on nor leaves behind any data held
+    by the service, i.e. a `face.detect` with `returnFaceId=false`. The
+    `faceId`s only work on the resource which issued them, so a detection
+    returning them stays with the calls which will use them."""
+    if route not in STATELESS_ROUTES:
+        return False
+    return str((params or {}).get('returnFaceId', 'true')).lower() == 'false'
+
+
+class Member(object):
+    """A subscription key and its endpoint in a `KeyPool`.
+
+    Attributes:
+        key: Subscription Key.
+        base_url: Base URL of the regional endpoint.
+        bucket: Optional `TokenBucket` pacing the requests of the member.
+        in_flight: Number of requests being sent.
+        failures: Number of consecutive failed requests.
+        available_at: Clock time before which the member is not picked for
+            stateless calls, after throttling or repeated failures.
+        calls: Number of requests sent.
+        errors: Number of failed requests.
+    """
+
+    def __init__(self, key, base_url, rate=None, burst=None):
+        self.key = key
+        self.base_url = base_url if base_url.endswith('/') else base_url + '/'
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.in_flight = 0
+        self.failures = 0
+        self.available_at = 0.0
+        self.calls = 0
+        self.errors = 0
+
+    def __repr__(self):
+        return '<Member {}>'.format(self.base_url)
+
+    def reserve(self):
+        """Reserve a request and return the seconds to wait before it."""
+        return self.bucket.reserve() if self.bucket else 0.0
+
+    def try_reserve(self):
+        """Reserve a request only if it may be sent right now."""
+        return self.bucket.try_reserve() if self.bucket else True
+
+
+class KeyPool(object):
+    """Thread-safe pool of (subscription key, base URL) members spreading the
+    load of a `FaceClient`.
+
+    - Stateless calls (`face.detect` with `face_id=False`) go to the healthy
+      member whose rate limiter frees up first, then with the fewest requests
+      in flight.
+    - Every other call is pinned to the `home` member: the calls tied to the
+      persisted data of a region, the detections returning `faceId`s and the
+      calls using them, as a `faceId` is only valid on the resource which
+      detected it.
+
+    Attributes:
+        members: The `Member`s of the pool.
+        home: The `Member` holding the persisted data.
+        max_failures: Consecutive failures before a member is put aside.
+        cooldown: Seconds a failing member is put aside for.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self,
+                 members,
+                 rate=None,
+                 burst=None,
+                 home=0,
+                 max_failures=3,
+                 cooldown=30.0):
+        self.members = [
+            Member(key, base_url, rate, burst) for key, base_url in members
+        ]
+        if not self.members:
+            raise ValueError('A key pool needs at least one member.')
+        self.home = self.members[home]
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+
+    def pick(self, route, params=None):
+        """Pick the member to send a call to and count it in flight.
+
+        Args:
+            route: Path of the call relative to the base URL, e.g. 'detect'.
+            params: Query parameters of the call.
+        """
+        with self._lock:
+            member = self._pick(route, params)
+            member.in_flight += 1
+            member.calls += 1
+        return member
+
+    def release(self, member, status_code=None, retry_after=None,
+                error=False):
+        """Account for the outcome of a call sent to `member`.
+
+        Args:
+            member: The `Member` returned by `pick`.
+            status_code: HTTP status code of the response, `None` when the
+                call failed without a response or was not sent at all.
+            retry_after: Raw `Retry-After` header of the response.
+            error: Whether the call failed without a response.
+        """
+        now = _clock()
+        with self._lock:
+            member.in_flight -= 1
+            if error or (status_code or 0) >= 500:
+                member.errors += 1
+                member.failures += 1
+                if member.failures >= self.max_failures:
+                    member.available_at = now + self.cooldown
+            elif status_code == 429:
+                member.errors += 1
+                member.available_at = now + (parse_retry_after(retry_after)
+                                             or 1.0)
+            elif status_code is not None:
+                member.failures = 0
+
+    def stats(self):
+        """Return a list of dicts of the `base_url`, `calls`, `errors`,
+        `in_flight` and `available` state of each member."""
+        now = _clock()
+        with self._lock:
+            return [{
+                'base_url': member.base_url,
+                'calls': member.calls,
+                'errors': member.errors,
+                'in_flight': member.in_flight,
+                'available': member.available_at <= now,
+            } for member in self.members]
+
+    def _pick(self, route, params):
+        """Pick a member, must be called with the lock held."""
+        if stateless(route, params):
+            return self._least_loaded()
+        return self.home
+
+    def _least_loaded(self):
+        now = _clock()
+        available = [
+            member for member in self.members if member.available_at <= now
+        ]
+        if not available:
+            return min(self.members, key=lambda member: member.available_at)
+        return min(
+            available,
+            key=lambda member: (member.bucket.available_in()
+                                if member.bucket else 0.0, member.in_flight))
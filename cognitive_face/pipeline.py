@@ -0,0 +1,268 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: pipeline.py
+Description: Two-stage upload pipeline of the Python SDK of the Cognitive Face
+    API: image preparation in a pool of processes, network calls in a pool of
+    threads.
+"""
+import concurrent.futures
+import os
+import sys
+import threading
+
+try:
+    import queue
+except ImportError:  # Python 2.
+    import Queue as queue
+
+from . import preprocess
+from .upload import BUFFER_TYPES
+from .upload import BufferBody
+from .upload import FileBody
+from .upload import load
+from .upload import view
+
+try:
+    from multiprocessing import resource_tracker
+    from multiprocessing import shared_memory
+except ImportError:  # Before Python 3.8.
+    shared_memory = None
+
+# Default number of prepared images waiting for the network stage.
+DEFAULT_QUEUE_SIZE = 16
+
+# Default number of network threads.
+DEFAULT_THREADS = 8
+
+# Marks the end of a queue.
+_DONE = object()
+
+
+def prepare(image, downscaler=None, orient=False):
+    """Prepare the upload buffer of `image` in a worker process.
+
+    Args:
+        image: A file path or the bytes of an image.
+        downscaler: Optional `Downscaler` of the large images.
+        orient: Whether to turn the image upright.
+
+    Returns:
+        a three-item tuple consist of the name of the shared memory block
+        holding the buffer (or the buffer itself without shared memory), its
+        size and the `Transform` of the image if any.
+    """
+    data = image if isinstance(image, bytes) else FileBody(path=image)
+    if downscaler is not None or orient:
+        data = preprocess.prepare(data, downscaler, orient)
+    transform = getattr(data, 'transform', None)
+    content = load(data)
+    if shared_memory is None:
+        return bytes(content), len(content), transform
+    block = shared_memory.SharedMemory(create=True, size=max(len(content), 1))
+    block.buf[:len(content)] = content
+    if os.name == 'posix':
+        # The receiving process unlinks the block once uploaded.
+        resource_tracker.unregister(getattr(block, '_name', block.name),
+                                    'shared_memory')
+    block.close()
+    return block.name, len(content), transform
+
+
+class Pipeline(object):
+    """Upload pipeline keeping the CPU-bound and the network-bound work apart.
+
+    The images are decoded, turned upright and downscaled in a
+    `ProcessPoolExecutor`, out of the reach of the GIL, and the prepared
+    buffers handed to the network threads through shared memory rather than
+    pickled. Bounded queues between the stages hold at most `queue_size`
+    prepared images, so a slow network stage throttles the preparation and a
+    slow consumer throttles the network stage.
+
+    Attributes:
+        processes: Number of preparation processes, the number of processors
+            by default.
+        threads: Number of network threads.
+        queue_size: Maximum number of images waiting between two stages.
+        downscaler: Optional `Downscaler`, that of the `FaceClient` of
+            `send` by default.
+        orient: Whether to turn the images upright, as set on the
+            `FaceClient` of `send` by default.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self,
+                 processes=None,
+                 threads=DEFAULT_THREADS,
+                 queue_size=DEFAULT_QUEUE_SIZE,
+                 downscaler=None,
+                 orient=None):
+        self.processes = processes
+        self.threads = threads
+        self.queue_size = queue_size
+        self.downscaler = downscaler
+        self.orient = orient
+
+    def run(self, send, images):
+        """Send every image of `images` through `send` and yield the outcomes
+        as they complete.
+
+        E.g. `pipeline.run(CF.face.detect, paths)` or `pipeline.run(lambda
+        image: CF.person.add_face(image, person_group_id, person_id),
+        paths)`.
+
+        Args:
+            send: Function taking the image to upload, as accepted by
+                `parse_image`.
+            images: File paths, buffers, file-like objects or URLs.
+
+        Yields:
+            (image, result) pairs in completion order, the result being the
+            exception raised for the image, if any. The calls are made within
+            the current `Deadline`, if any.
+        """
+        import cognitive_face as CF
+        client = CF.util.current_client(send)
+        settings = (self.downscaler or client.downscaler,
+                    client.orient if self.orient is None else self.orient)
+        deadline = CF.deadline.current()
+        prepared = queue.Queue(self.queue_size)
+        results = queue.Queue(self.queue_size)
+        stop = threading.Event()
+        executor = concurrent.futures.ProcessPoolExecutor(self.processes)
+        threads = [
+            threading.Thread(
+                target=self._feed,
+                args=(executor, images, settings, prepared, stop))
+        ] + [
+            threading.Thread(
+                target=self._send, args=(send, deadline, prepared, results))
+            for _ in range(self.threads)
+        ]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        try:
+            running = self.threads
+            while running:
+                outcome = results.get()
+                if outcome is _DONE:
+                    running -= 1
+                else:
+                    yield outcome
+        finally:
+            # Drain the stages when the consumer gives up early.
+            stop.set()
+            while any(thread.is_alive() for thread in threads):
+                _drain(prepared, _discard)
+                _drain(results)
+                # The drain may have taken the end markers of the feeder.
+                for _ in range(self.threads):
+                    try:
+                        prepared.put_nowait(_DONE)
+                    except queue.Full:
+                        break
+                for thread in threads:
+                    thread.join(0.01)
+            _drain(prepared, _discard)
+            executor.shutdown()
+
+    def _feed(self, executor, images, settings, prepared, stop):
+        """Submit the images to the process pool, in order, waiting for room
+        in the queue of the network stage. `settings` are the downscaler and
+        the orientation flag of the preparation."""
+        # pylint: disable=too-many-arguments
+        try:
+            for image in images:
+                if stop.is_set():
+                    break
+                source = _source(image)
+                future = None
+                if source is not None:
+                    future = executor.submit(prepare, source, *settings)
+                prepared.put((image, future))
+        finally:
+            for _ in range(self.threads):
+                prepared.put(_DONE)
+
+    def _send(self, send, deadline, prepared, results):
+        """Send the prepared images until the end of the queue, within the
+        `deadline` of the caller."""
+        import cognitive_face as CF
+        while True:
+            item = prepared.get()
+            if item is _DONE:
+                results.put(_DONE)
+                return
+            image, future = item
+            try:
+                with CF.deadline.scope(deadline):
+                    if future is None:
+                        result = send(image)
+                    else:
+                        result = _upload(send, *future.result())
+            except Exception:  # pylint: disable=broad-except
+                result = sys.exc_info()[1]
+            results.put((image, result))
+
+
+def _source(image):
+    """Return what a preparation process needs to read `image`: its path or
+    its bytes, `None` for a URL sent as is."""
+    if isinstance(image, BUFFER_TYPES):
+        content = view(image)
+        return content if isinstance(content, bytes) else content.tobytes()
+    if hasattr(image, 'read'):
+        return image.read()
+    if os.path.isfile(image):
+        return image
+    return None
+
+
+def _upload(send, name, size, transform):
+    """Send a prepared buffer, then release its shared memory block."""
+    if shared_memory is None:
+        return send(BufferBody(view(name), transform))
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        buffer = block.buf[:size]
+        try:
+            return send(BufferBody(buffer, transform))
+        finally:
+            _close(buffer, block)
+    finally:
+        block.unlink()
+
+
+def _close(buffer, block):
+    """Release a view of a shared memory block and the block."""
+    try:
+        buffer.release()
+        block.close()
+    except BufferError:
+        # Still sent by an abandoned hedge, the mapping goes with it.
+        pass
+
+
+def _discard(item):
+    """Release the shared memory block of a prepared image never sent."""
+    if item is _DONE or item[1] is None or shared_memory is None:
+        return
+    try:
+        name = item[1].result()[0]
+    except Exception:  # pylint: disable=broad-except
+        return
+    block = shared_memory.SharedMemory(name=name)
+    block.close()
+    block.unlink()
+
+
+def _drain(items, discard=None):
+    """Empty a queue without blocking, passing the items to `discard`."""
+    try:
+        while True:
+            item = items.get_nowait()
+            if discard is not None:
+                discard(item)
+    except queue.Empty:
+        pass
@@ -0,0 +1,272 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: preprocess.py
+Description: Client-side preprocessing of the uploaded images for the Python
+    SDK of the Cognitive Face API: EXIF orientation and downscaling.
+"""
+import io
+
+from .upload import FileBody
+
+try:
+    from PIL import Image
+    from PIL import JpegImagePlugin
+except ImportError:
+    Image = None
+
+# Side in pixels of the smallest face the service detects.
+MIN_DETECTABLE_FACE = 36
+
+# Default longest side in pixels of the uploaded images.
+DEFAULT_MAX_SIDE = 1920
+
+# Default JPEG quality of the re-encoded images.
+DEFAULT_QUALITY = 85
+
+# EXIF tag of the orientation of an image.
+ORIENTATION_TAG = 0x0112
+
+# Transpositions turning an image of each EXIF orientation upright.
+_TRANSPOSITIONS = {
+    2: 'FLIP_LEFT_RIGHT',
+    3: 'ROTATE_180',
+    4: 'FLIP_TOP_BOTTOM',
+    5: 'TRANSPOSE',
+    6: 'ROTATE_270',
+    7: 'TRANSVERSE',
+    8: 'ROTATE_90',
+}
+
+
+def require():
+    """Raise an `ImportError` unless Pillow is installed."""
+    if Image is None:
+        raise ImportError(
+            'Preprocessing images requires Pillow, install it with '
+            '`pip install cognitive_face[image]`.')
+
+
+class Transform(object):
+    """Mapping between the pixels of an original image and those of the image
+    actually uploaded.
+
+    Coordinates are given and returned in the upright original image, that is
+    once its EXIF orientation is applied, as an image viewer shows it. Use
+    `to_stored` to locate them in the pixels as stored in the file.
+
+    Attributes:
+        scale_x: Uploaded pixels per original pixel, horizontally.
+        scale_y: Uploaded pixels per original pixel, vertically.
+        orientation: EXIF orientation applied before upload, 1 for none.
+        size: (width, height) of the upright original image.
+    """
+
+    def __init__(self, scale_x=1.0, scale_y=1.0, orientation=1, size=None):
+        self.scale_x = scale_x
+        self.scale_y = scale_y
+        self.orientation = orientation
+        self.size = size
+
+    def __repr__(self):
+        return '<Transform scale=({:.4f}, {:.4f}) orientation={}>'.format(
+            self.scale_x, self.scale_y, self.orientation)
+
+    def target_face(self, target_face):
+        """Map a "left,top,width,height" rectangle of the original image onto
+        the uploaded image."""
+        if not hasattr(target_face, 'split'):
+            target_face = ','.join(str(value) for value in target_face)
+        left, top, width, height = (float(value)
+                                    for value in target_face.split(','))
+        return '{},{},{},{}'.format(
+            int(round(left * self.scale_x)), int(round(top * self.scale_y)),
+            max(1, int(round(width * self.scale_x))),
+            max(1, int(round(height * self.scale_y))))
+
+    def restore(self, faces):
+        """Map the `faceRectangle`s and `faceLandmarks` of detected `faces`
+        back onto the original image, in place, and return `faces`."""
+        for face in faces:
+            rectangle = face.get('faceRectangle')
+            if rectangle:
+                for name, scale in (('left', self.scale_x),
+                                    ('top', self.scale_y),
+                                    ('width', self.scale_x),
+                                    ('height', self.scale_y)):
+                    rectangle[name] = int(round(rectangle[name] / scale))
+            for point in (face.get('faceLandmarks') or {}).values():
+                point['x'] = round(point['x'] / self.scale_x, 1)
+                point['y'] = round(point['y'] / self.scale_y, 1)
+        return Faces(faces, self)
+
+    def to_stored(self, x, y):
+        """Map a point of the upright original image to the pixels as stored
+        in the file, before the EXIF orientation."""
+        width, height = self.size or (0, 0)
+        return {
+            1: (x, y),
+            2: (width - x, y),
+            3: (width - x, height - y),
+            4: (x, height - y),
+            5: (y, x),
+            6: (y, width - x),
+            7: (height - y, width - x),
+            8: (height - y, x),
+        }[self.orientation]
+
+    def rectangle_to_stored(self, rectangle):
+        """Map a `faceRectangle` of the upright original image to the pixels
+        as stored in the file."""
+        corners = [
+            self.to_stored(rectangle['left'], rectangle['top']),
+            self.to_stored(rectangle['left'] + rectangle['width'],
+                           rectangle['top'] + rectangle['height'])
+        ]
+        left, right = sorted(corner[0] for corner in corners)
+        top, bottom = sorted(corner[1] for corner in corners)
+        return {
+            'left': left,
+            'top': top,
+            'width': right - left,
+            'height': bottom - top,
+        }
+
+
+class Faces(list):
+    """Faces detected on a preprocessed image, reporting the `transform`
+    applied to it before upload."""
+
+    def __init__(self, faces=(), transform=None):
+        super(Faces, self).__init__(faces)
+        self.transform = transform
+
+
+class PreparedImage(bytes):
+    """Content of a preprocessed image, remembering its `Transform`."""
+
+    transform = None
+
+
+class Downscaler(object):
+    """Downscale and re-encode to JPEG the images larger than needed.
+
+    An image whose longest side exceeds `max_side` is shrunk to it, but never
+    so much that a face of `min_face` pixels of the original image falls
+    below the detectable size, then re-encoded to JPEG at `quality`. Smaller
+    images are uploaded untouched. Requires Pillow.
+
+    Attributes:
+        max_side: Longest side in pixels of the uploaded images.
+        min_face: Optional side in pixels of the smallest face to detect in
+            the original images.
+        quality: JPEG quality of the re-encoded images, from 1 to 95.
+    """
+
+    def __init__(self,
+                 max_side=DEFAULT_MAX_SIDE,
+                 min_face=None,
+                 quality=DEFAULT_QUALITY):
+        require()
+        self.max_side = max_side
+        self.min_face = min_face
+        self.quality = quality
+
+    def scale_for(self, size):
+        """Return the scale to apply to an image of `size` (width, height)."""
+        scale = float(self.max_side) / max(size)
+        if self.min_face:
+            scale = max(scale, float(MIN_DETECTABLE_FACE) / self.min_face)
+        return min(scale, 1.0)
+
+    def prepare(self, data):
+        """Return a `PreparedImage` downscaled from the upload body `data`, or
+        `data` itself when it needs no downscaling."""
+        return prepare(data, self)
+
+
+def orientation_of(image):
+    """Return the EXIF orientation of an opened image, 1 when it has none.
+    Only its header is read."""
+    try:
+        orientation = image.getexif().get(ORIENTATION_TAG, 1)
+    except Exception:  # pylint: disable=broad-except
+        return 1
+    return orientation if orientation in _TRANSPOSITIONS else 1
+
+
+def prepare(data, downscaler=None, orient=False):
+    """Preprocess the image of the upload body `data` in a single decoding.
+
+    Args:
+        data: Upload body, see `parse_image`.
+        downscaler: Optional `Downscaler` of the large images.
+        orient: Whether to turn the image upright according to its EXIF
+            orientation.
+
+    Returns:
+        a `PreparedImage` remembering its `Transform`, or `data` itself when
+        the image needs no preprocessing. An image only turned upright keeps
+        its format and, for a JPEG, its quantization tables to limit the loss.
+
+    Raises:
+        InvalidImageError: The image cannot be decoded.
+    """
+    source = _open(data)
+    try:
+        image = Image.open(source)
+        orientation = orientation_of(image) if orient else 1
+        upright = image.size if orientation < 5 else image.size[::-1]
+        scale = downscaler.scale_for(upright) if downscaler else 1.0
+        if scale >= 1.0 and orientation == 1:
+            return data
+
+        original = image
+        output = io.BytesIO()
+        if scale < 1.0:
+            size = (max(1, int(round(upright[0] * scale))),
+                    max(1, int(round(upright[1] * scale))))
+            # Let the JPEG decoder skip the unneeded resolution.
+            image.draft('RGB', size if orientation < 5 else size[::-1])
+            image = image.convert('RGB')
+        else:
+            size = upright
+        if orientation != 1:
+            image = image.transpose(
+                getattr(Image, _TRANSPOSITIONS[orientation]))
+        if scale < 1.0:
+            image = image.resize(size, Image.LANCZOS)
+            image.save(output, 'JPEG', quality=downscaler.quality)
+        elif original.format == 'JPEG':
+            image.save(
+                output,
+                'JPEG',
+                qtables=original.quantization,
+                subsampling=JpegImagePlugin.get_sampling(original))
+        else:
+            image.save(output, original.format)
+    except Exception as error:  # pylint: disable=broad-except
+        # Pillow raises many types of errors for a corrupt image.
+        from .validate import InvalidImageError
+        raise InvalidImageError(
+            'InvalidImage', 'The image cannot be decoded: {}'.format(error))
+    finally:
+        if source is not getattr(data, 'fileobj', None):
+            source.close()
+        else:
+            source.seek(data.offset)
+    prepared = PreparedImage(output.getvalue())
+    prepared.transform = Transform(
+        float(size[0]) / upright[0],
+        float(size[1]) / upright[1], orientation, upright)
+    return prepared
+
+
+def _open(data):
+    """Return a file object reading the upload body `data`."""
+    if isinstance(data, FileBody):
+        if data.path is not None:
+            return open(data.path, 'rb')
+        data.fileobj.seek(data.offset)
+        return data.fileobj
+    return io.BytesIO(getattr(data, 'buffer', data))
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: ratelimit.py
+Description: Client-side rate limiting for the Python SDK of the Cognitive Face
+    API.
+"""
+import threading
+import time
+
+# `time.monotonic` is not available in Python 2.
+_clock = getattr(time, 'monotonic', time.time)
+
+
+class TokenBucket(object):
+    """Thread-safe token bucket refilled at `rate` tokens per second up to
+    `burst` tokens.
+
+    Tokens are reserved rather than polled: a caller taking a token from an
+    empty bucket is told how long to wait for it, so concurrent callers are
+    served in order without spinning.
+
+    Attributes:
+        rate: Tokens added per second.
+        burst: Maximum number of tokens the bucket holds.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst or max(1, rate))
+        self._tokens = self.burst
+        self._last = _clock()
+        self._lock = threading.Lock()
+
+    def available_in(self, tokens=1):
+        """Return the seconds until `tokens` could be taken without waiting."""
+        with self._lock:
+            tokens_now = min(self.burst, self._tokens +
+                             (_clock() - self._last) * self.rate)
+            return max(0.0, (tokens - tokens_now) / self.rate)
+
+    def try_reserve(self, tokens=1):
+        """Take `tokens` only if they are available now, return whether they
+        were taken."""
+        with self._lock:
+            now = _clock()
+            self._tokens = min(self.burst,
+                               self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            if self._tokens < tokens:
+                return False
+            self._tokens -= tokens
+            return True
+
+    def reserve(self, tokens=1):
+        """Take `tokens` and return the seconds to wait before using them."""
+        with self._lock:
+            now = _clock()
+            self._tokens = min(self.burst,
+                               self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+
+class RateLimiter(object):
+    """Thread-safe rate limiter keeping one `TokenBucket` per subscription key.
+
+    Attributes:
+        rate: Requests per second allowed for each subscription key.
+        burst: Requests allowed back to back for each subscription key.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._stats = {}
+
+    def reserve(self, key):
+        """Reserve a request for `key` and return the seconds to wait before
+        sending it. Use it to `await asyncio.sleep` instead of blocking."""
+        delay = self._bucket(key).reserve()
+        with self._lock:
+            stats = self._stats[key]
+            stats['calls'] += 1
+            if delay:
+                stats['waited_calls'] += 1
+                stats['total_wait'] += delay
+                stats['max_wait'] = max(stats['max_wait'], delay)
+        return delay
+
+    def try_acquire(self, key):
+        """Reserve a request for `key` only if it may be sent right now,
+        return whether it was reserved."""
+        if not self._bucket(key).try_reserve():
+            return False
+        with self._lock:
+            self._stats[key]['calls'] += 1
+        return True
+
+    def acquire(self, key):
+        """Block until a request for `key` may be sent, return the seconds
+        waited."""
+        delay = self.reserve(key)
+        if delay:
+            time.sleep(delay)
+        return delay
+
+    def _bucket(self, key):
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(
+                    self.rate, self.burst)
+                self._stats[key] = {
+                    'calls': 0,
+                    'waited_calls': 0,
+                    'total_wait': 0.0,
+                    'max_wait': 0.0,
+                }
+            return bucket
+
+    def stats(self):
+        """Return the wait-time metrics of every subscription key.
+
+        Returns:
+            A dict mapping each subscription key to a dict of `calls`,
+            `waited_calls`, `total_wait` and `max_wait` (in seconds).
+        """
+        with self._lock:
+            return {key: dict(value) for key, value in self._stats.items()}
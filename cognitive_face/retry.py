@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: retry.py
+Description: Retry policy for throttled and failed calls of the Python SDK of
+    the Cognitive Face API.
+"""
+import email.utils
+import random
+import threading
+import time
+
+# `time.monotonic` is not available in Python 2.
+_clock = getattr(time, 'monotonic', time.time)
+
+# Status codes worth another attempt: throttling and transient server errors.
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Methods which can be sent again after an unknown outcome.
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+# Read-only `POST` endpoints, safe to send again as well.
+IDEMPOTENT_ROUTES = ('detect', 'findsimilars', 'group', 'identify', 'verify')
+
+
+def parse_retry_after(value):
+    """Parse a `Retry-After` header, either in seconds or an HTTP date.
+
+    Returns:
+        The seconds to wait, `None` when absent or malformed.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    parsed = email.utils.parsedate_tz(value)
+    if parsed is None:
+        return None
+    return max(0.0, email.utils.mktime_tz(parsed) - time.time())
+
+
+class RetryPolicy(object):
+    """Retry policy with decorrelated jitter backoff honouring `Retry-After`.
+
+    A 429 is retried for every method as the service rejected the call before
+    processing it. Transient server and connection errors are only retried for
+    the `idempotent_methods` and `idempotent_routes`, as the first attempt may
+    have taken effect.
+
+    Attributes:
+        max_attempts: Maximum number of attempts of a call, 1 disables retry.
+        base_delay: Minimum backoff in seconds.
+        max_delay: Maximum backoff in seconds.
+        max_elapsed: Budget in seconds for all the attempts of a call, no
+            retry is scheduled past it.
+        retry_statuses: Status codes worth another attempt.
+        idempotent_methods: Methods retried after server or connection errors.
+        idempotent_routes: Last path segments of the endpoints retried after
+            server or connection errors whatever their method.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self,
+                 max_attempts=5,
+                 base_delay=0.5,
+                 max_delay=20.0,
+                 max_elapsed=60.0,
+                 retry_statuses=RETRY_STATUSES,
+                 idempotent_methods=IDEMPOTENT_METHODS,
+                 idempotent_routes=IDEMPOTENT_ROUTES):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_elapsed = max_elapsed
+        self.retry_statuses = retry_statuses
+        self.idempotent_methods = idempotent_methods
+        self.idempotent_routes = idempotent_routes
+        self._lock = threading.Lock()
+        self._attempts = {}
+
+    def start(self, method, url):
+        """Start tracking the attempts of a call."""
+        return Attempts(self, method, url)
+
+    def is_idempotent(self, method, url):
+        """Whether a call may be sent again after an unknown outcome."""
+        route = url.split('?', 1)[0].rstrip('/').rsplit('/', 1)[-1]
+        return method.upper() in self.idempotent_methods or \
+            route in self.idempotent_routes
+
+    def record(self, attempts):
+        """Count a call which took `attempts` attempts."""
+        with self._lock:
+            self._attempts[attempts] = self._attempts.get(attempts, 0) + 1
+
+    def stats(self):
+        """Return a dict mapping a number of attempts to the number of calls
+        which took that many."""
+        with self._lock:
+            return dict(self._attempts)
+
+
+class Attempts(object):
+    """The attempts of one call under a `RetryPolicy`."""
+
+    def __init__(self, policy, method, url):
+        self.policy = policy
+        self.idempotent = policy.is_idempotent(method, url)
+        self.count = 0
+        self._started = _clock()
+        self._delay = policy.base_delay
+
+    def backoff(self, status_code=None, retry_after=None, error=False):
+        """Account for a finished attempt and decide whether to retry it.
+
+        Args:
+            status_code: HTTP status code of the attempt.
+            retry_after: Raw `Retry-After` header of the response.
+            error: Whether the attempt failed without a response.
+
+        Returns:
+            The seconds to wait before the next attempt, or `None` to give up
+            (or succeed) with the current outcome.
+        """
+        policy = self.policy
+        self.count += 1
+        if error or status_code in policy.retry_statuses:
+            retry = status_code == 429 or self.idempotent
+        else:
+            retry = False
+        if not retry or self.count >= policy.max_attempts:
+            policy.record(self.count)
+            return None
+
+        self._delay = min(policy.max_delay,
+                          random.uniform(policy.base_delay, self._delay * 3))
+        delay = self._delay
+        wait = parse_retry_after(retry_after)
+        if wait is not None:
+            delay = max(delay, wait)
+        if _clock() - self._started + delay > policy.max_elapsed:
+            policy.record(self.count)
+            return None
+        return delay
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: session.py
+Description: Pooled keep-alive HTTP sessions for the Python SDK of the
+    Cognitive Face API.
+"""
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    from urllib.parse import urlsplit
+except ImportError:  # Python 2.
+    from urlparse import urlsplit
+
+# Maximum number of connections kept alive per endpoint.
+DEFAULT_POOL_SIZE = 10
+# Seconds an unused endpoint session is kept before it is evicted.
+DEFAULT_IDLE_TIMEOUT = 60
+
+_clock = getattr(time, 'monotonic', time.time)
+
+
+def endpoint_of(url):
+    """Return the `scheme://host[:port]` part of `url`."""
+    parts = urlsplit(url)
+    return '{}://{}'.format(parts.scheme, parts.netloc)
+
+
+class SessionPool(object):
+    """Thread-safe pool of keep-alive `requests.Session`s, one per endpoint.
+
+    Every endpoint (scheme, host and port) gets its own session holding up to
+    `pool_size` open connections, so consecutive calls reuse the TCP and TLS
+    connection instead of performing a new handshake. Sessions which have not
+    been used for `idle_timeout` seconds are closed on the next access.
+
+    Attributes:
+        pool_size: Maximum number of connections kept alive per endpoint.
+        idle_timeout: Seconds an unused endpoint session is kept open. `None`
+            disables the idle eviction.
+    """
+
+    def __init__(self,
+                 pool_size=DEFAULT_POOL_SIZE,
+                 idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        # endpoint -> [session, last used timestamp, number of active calls]
+        self._sessions = {}
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
+
+    def request(self, method, url, **kwargs):
+        """Send a request through the pooled session of the endpoint of `url`.
+
+        Accept the same keyword arguments as `requests.Session.request`.
+        """
+        endpoint = endpoint_of(url)
+        entry = self._acquire(endpoint)
+        try:
+            return entry[0].request(method, url, **kwargs)
+        finally:
+            with self._lock:
+                entry[1] = _clock()
+                entry[2] -= 1
+
+    def reset(self, url=None):
+        """Close the pooled connections of the endpoint of `url`, or of every
+        endpoint when `url` is not given. New connections are opened lazily by
+        the next request."""
+        with self._lock:
+            if url is None:
+                endpoints = list(self._sessions)
+            else:
+                endpoints = [endpoint_of(url)]
+            sessions = [
+                self._sessions.pop(endpoint)[0] for endpoint in endpoints
+                if endpoint in self._sessions
+            ]
+        for session in sessions:
+            session.close()
+
+    def close(self):
+        """Close every pooled connection. The pool stays usable afterwards."""
+        self.reset()
+
+    def _acquire(self, endpoint):
+        now = _clock()
+        with self._lock:
+            expired = self._evict(now)
+            entry = self._sessions.get(endpoint)
+            if entry is None:
+                entry = [self._new_session(), now, 0]
+                self._sessions[endpoint] = entry
+            entry[1] = now
+            entry[2] += 1
+        for session in expired:
+            session.close()
+        return entry
+
+    def _evict(self, now):
+        """Pop the idle sessions, must be called with the lock held."""
+        if self.idle_timeout is None:
+            return []
+        idle = [
+            endpoint for endpoint, (_, last_used, active) in
+            self._sessions.items()
+            if not active and now - last_used > self.idle_timeout
+        ]
+        return [self._sessions.pop(endpoint)[0] for endpoint in idle]
+
+    def _new_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=self.pool_size)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: singleflight.py
+Description: Coalescing of identical in-flight requests for the Python SDK of
+    the Cognitive Face API.
+"""
+import copy
+import sys
+import threading
+
+from .breaker import CircuitOpenError
+from .deadline import DeadlineExceeded
+
+# Errors which only concern the leader of a call, not its followers: the
+# expiry of its own deadline or the open breaker of its own endpoint.
+LEADER_ERRORS = (DeadlineExceeded, CircuitOpenError)
+
+
+def flight_key(method, url, params=None):
+    """Return the key identifying the identical requests, made of the method,
+    the URL and the query parameters."""
+    params = tuple(
+        sorted((name, value) for name, value in (params or {}).items()
+               if value is not None))
+    return method.upper(), url, params
+
+
+class _Flight(object):
+    """A call in progress, shared by its leader and followers."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+    """Thread-safe coalescing of identical concurrent calls.
+
+    The first caller of a key (the leader) runs the call; the callers of the
+    same key arriving before it finishes (the followers) wait for it and get
+    a copy of its result, or its exception, without a round trip of their
+    own. Followers stop waiting once the current `Deadline` expires, and
+    start a new call rather than share one of the `LEADER_ERRORS`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+        self._stats = {'calls': 0, 'shared': 0}
+
+    def do(self, key, call, deadline=None):
+        """Run `call()` once for the concurrent callers of `key`.
+
+        Args:
+            key: Hashable key of the call, see `flight_key`.
+            call: Function performing the call.
+            deadline: Optional `Deadline` bounding the wait of a follower.
+
+        Returns:
+            The result of the call, a private copy for the followers.
+        """
+        with self._lock:
+            self._stats['calls'] += 1
+        while True:
+            with self._lock:
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._flights[key] = _Flight()
+
+            if leader:
+                try:
+                    flight.result = call()
+                    return flight.result
+                except BaseException:
+                    flight.error = sys.exc_info()[1]
+                    raise
+                finally:
+                    with self._lock:
+                        del self._flights[key]
+                    flight.done.set()
+
+            timeout = deadline.remaining() if deadline is not None else None
+            if not flight.done.wait(timeout):
+                raise DeadlineExceeded()
+            if not isinstance(flight.error, LEADER_ERRORS):
+                break
+        with self._lock:
+            self._stats['shared'] += 1
+        if flight.error is not None:
+            raise flight.error
+        return copy.deepcopy(flight.result)
+
+    def stats(self):
+        """Return the number of calls and of calls served by another one."""
+        with self._lock:
+            return dict(self._stats)
@@ -0,0 +1,7 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: __init__.py
+Description: Offline unittests for Python SDK of the Cognitive Face API,
+    answered by a `FakeTransport` instead of the service.
+"""
@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: fake.py
+Description: Fake transport and clock for the offline unittests of Python SDK
+    of the Cognitive Face API.
+"""
+
+import asyncio
+import json as jsonlib
+import threading
+import time
+
+import cognitive_face as CF
+from cognitive_face.retry import RetryPolicy
+from cognitive_face.transport import Response
+from cognitive_face.transport import Transport
+from cognitive_face.upload import BUFFER_TYPES
+from cognitive_face.upload import BufferBody
+
+# Base URL of the fake endpoints.
+BASE_URL = 'https://fake.api.cognitive.microsoft.com/face/v1.0/'
+# Base URL of a second fake endpoint.
+OTHER_URL = 'https://other.api.cognitive.microsoft.com/face/v1.0/'
+
+
+class FakeError(IOError):
+    """Failure of a request without a response."""
+
+
+def response(result=None, status=200, headers=None):
+    """Return a `Response` whose body is `result` encoded as JSON."""
+    body = b'' if result is None else jsonlib.dumps(result).encode('utf-8')
+    return Response(status, headers or {}, body)
+
+
+def error(status, code='BadArgument', message='Fake error.', headers=None):
+    """Return an error `Response` of the service."""
+    return response({
+        'error': {
+            'code': code,
+            'message': message
+        }
+    }, status, headers)
+
+
+def slow(seconds, answer):
+    """Return an answer given after `seconds`, from the thread of the
+    request."""
+
+    def delayed(_):
+        time.sleep(seconds)
+        return answer
+
+    return delayed
+
+
+def aio_slow(seconds, answer):
+    """Return an answer given after `seconds`, without blocking the event
+    loop of the request."""
+
+    async def delayed(_):
+        await asyncio.sleep(seconds)
+        return answer
+
+    return delayed
+
+
+class Request(object):
+    """A request sent to a `FakeTransport`."""
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, method, url, headers, body, timeout):
+        self.method = method
+        self.url = url
+        self.headers = headers or {}
+        self.body = body
+        self.timeout = timeout
+
+    @property
+    def route(self):
+        """Path of the request relative to its base URL, e.g. 'detect'."""
+        for base_url in (BASE_URL, OTHER_URL):
+            if self.url.startswith(base_url):
+                return self.url[len(base_url):].split('?', 1)[0]
+        return self.url
+
+    def json(self):
+        """Return the decoded JSON body."""
+        return jsonlib.loads(self.body.decode('utf-8'))
+
+
+class Download(object):
+    """A streamed `requests` response of the origin of an image, as returned
+    by `SessionPool.request`."""
+
+    def __init__(self, content=b'', status=200, headers=None, reason='OK'):
+        self.content = content
+        self.status_code = status
+        self.headers = headers or {}
+        self.reason = reason
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        """Yield the content in chunks of `chunk_size` bytes."""
+        for offset in range(0, len(self.content), chunk_size):
+            yield self.content[offset:offset + chunk_size]
+
+    def close(self):
+        """Release the response."""
+        self.closed = True
+
+
+class FakeTransport(Transport):
+    """Transport answering from a script instead of the network.
+
+    Each request takes the next answer of `answers`: a `Response`, an
+    exception to raise, or a function of the `Request` returning either. The
+    `default` answer is used once the script is over.
+
+    Attributes:
+        requests: The `Request`s sent, in order.
+    """
+
+    errors = (FakeError, )
+
+    def __init__(self, answers=(), default=None):
+        self.answers = list(answers)
+        self.default = default if default is not None else response([])
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def send(self, method, url, headers=None, body=None, timeout=None):
+        # pylint: disable=too-many-arguments
+        if isinstance(body, BUFFER_TYPES):
+            body = bytes(body)
+        elif body is not None:
+            body = b''.join(bytes(chunk) for chunk in body)
+        request = Request(method, url, headers, body, timeout)
+        with self._lock:
+            self.requests.append(request)
+            answer = self.answers.pop(0) if self.answers else self.default
+        if callable(answer) and not isinstance(answer, Response):
+            answer = answer(request)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+
+class AsyncFakeTransport(FakeTransport):
+    """Coroutine counterpart of `FakeTransport` for the asyncio interface,
+    whose answers may also be coroutine functions of the `Request`."""
+
+    async def send(self, method, url, headers=None, body=None, timeout=None):
+        # pylint: disable=too-many-arguments,invalid-overridden-method
+        if isinstance(body, BufferBody):
+            body = body.buffer
+        answer = FakeTransport.send(self, method, url, headers, body, timeout)
+        if asyncio.iscoroutine(answer):
+            answer = await answer
+            if isinstance(answer, Exception):
+                raise answer
+        return answer
+
+    async def close(self):
+        """Nothing to close."""
+
+
+def client(answers=(), default=None, **kwargs):
+    """Return a `FaceClient` of the fake endpoint sending through a
+    `FakeTransport`, without any backoff between retries."""
+    kwargs.setdefault('retry', RetryPolicy(base_delay=0.0, max_delay=0.0))
+    return CF.FaceClient(
+        'fake-key',
+        BASE_URL,
+        transport=FakeTransport(answers, default),
+        **kwargs)
+
+
+def aio_client(answers=(), default=None, **kwargs):
+    """Return an asyncio `FaceClient` of the fake endpoint sending through an
+    `AsyncFakeTransport`, sharing the configuration of a `client` built from
+    `kwargs`."""
+    from cognitive_face import aio  # Requires aiohttp.
+    return aio.FaceClient(
+        client=client(**kwargs),
+        transport=AsyncFakeTransport(answers, default))
+
+
+class FakeClock(object):
+    """Clock advanced by hand, replacing `_clock` in the patched modules."""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        """Move the clock `seconds` forward."""
+        self.now += seconds
+
+
+def patch_clock(test, *modules):
+    """Replace the `_clock` of `modules` by a `FakeClock` for the duration of
+    `test` and return it."""
+    clock = FakeClock()
+    for module in modules:
+        test.addCleanup(setattr, module, '_clock', module._clock)
+        module._clock = clock
+    return clock
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: test_batch.py
+Description: Offline unittests for the micro-batching of the identify calls
+    of the Cognitive Face API.
+"""
+
+import asyncio
+import unittest
+
+import cognitive_face as CF
+
+from . import fake
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+def identify(request):
+    """Answer an identify request, rejecting the expired `face_id` 'bad'."""
+    face_ids = request.json()['faceIds']
+    if 'bad' in face_ids:
+        return fake.error(400, 'FaceNotFound')
+    return fake.response([{
+        'faceId': face_id,
+        'candidates': [{
+            'personId': 'p-' + face_id,
+            'confidence': 0.9
+        }]
+    } for face_id in face_ids])
+
+
+def sent(client):
+    """Return the `face_ids` of the identify requests sent by `client`."""
+    return [
+        request.json()['faceIds'] for request in client.transport.requests
+    ]
+
+
+class TestIdentifyBatcher(unittest.TestCase):
+    """Unittests for `batch.IdentifyBatcher`."""
+
+    def test_rejected(self):
+        """Unittest for a rejected shared request sent again face by face."""
+        client = fake.client(default=identify)
+        with CF.IdentifyBatcher(1.0, client.face.identify) as batcher:
+            futures = [
+                batcher.submit(face_id, 'group')
+                for face_id in ('f1', 'bad', 'f2')
+            ]
+        self.assertEqual(futures[0].result()['candidates'][0]['personId'],
+                         'p-f1')
+        self.assertEqual(futures[2].result()['candidates'][0]['personId'],
+                         'p-f2')
+        with self.assertRaises(CF.CognitiveFaceException) as context:
+            futures[1].result()
+        self.assertEqual(context.exception.code, 'FaceNotFound')
+        self.assertEqual(batcher.stats(), {'calls': 3, 'requests': 4})
+        self.assertEqual(sent(client),
+                         [['f1', 'bad', 'f2'], ['f1'], ['bad'], ['f2']])
+
+    def test_single_rejected(self):
+        """Unittest for a rejected request of a single face, not sent again.
+        """
+        client = fake.client(default=identify)
+        with CF.IdentifyBatcher(0.0, client.face.identify) as batcher:
+            future = batcher.submit('bad', 'group')
+        with self.assertRaises(CF.CognitiveFaceException):
+            future.result()
+        self.assertEqual(len(client.transport.requests), 1)
+
+    def test_deadline(self):
+        """Unittest for the request bounded by the deadline of its callers.
+        """
+        client = fake.client(default=identify, timeout=60)
+        with CF.IdentifyBatcher(1.0, client.face.identify) as batcher:
+            with CF.Deadline(5):
+                first = batcher.submit('f1', 'group')
+            with CF.Deadline(10):
+                second = batcher.submit('f2', 'group')
+        first.result()
+        second.result()
+        [request] = client.transport.requests
+        self.assertLessEqual(max(request.timeout), 10)
+        self.assertGreater(min(request.timeout), 5)
+
+    @unittest.skipIf(aiohttp is None, 'aiohttp is not installed.')
+    def test_rejected_aio(self):
+        """Unittest for a rejected shared request sent again face by face,
+        asyncio interface."""
+        from cognitive_face import aio
+        client = fake.aio_client(default=identify)
+
+        async def run():
+            batcher = aio.IdentifyBatcher(1.0, client.face.identify)
+            with CF.Deadline(10):
+                futures = [
+                    batcher.submit(face_id, 'group')
+                    for face_id in ('f1', 'bad')
+                ]
+            await batcher.close()
+            return await asyncio.gather(*futures, return_exceptions=True)
+
+        result, error = asyncio.run(run())
+        self.assertEqual(result['candidates'][0]['personId'], 'p-f1')
+        self.assertEqual(error.code, 'FaceNotFound')
+        self.assertEqual(sent(client), [['f1', 'bad'], ['f1'], ['bad']])
+        self.assertLessEqual(max(client.transport.requests[0].timeout), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: test_breaker.py
+Description: Offline unittests for the circuit breakers of the Cognitive Face
+    API.
+"""
+
+import unittest
+
+import cognitive_face as CF
+from cognitive_face import breaker
+from cognitive_face import ratelimit
+
+from . import fake
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Unittests for `breaker.CircuitBreaker`."""
+
+    def setUp(self):
+        self.clock = fake.patch_clock(self, breaker)
+        self.changes = []
+        self.breaker = breaker.CircuitBreaker(
+            fake.BASE_URL,
+            failure_threshold=2,
+            latency_threshold=5.0,
+            reset_timeout=30.0,
+            on_state_change=lambda *change: self.changes.append(change[1:]))
+
+    def trip(self):
+        """Open the breaker."""
+        self.breaker.record(True)
+        self.breaker.record(True)
+
+    def test_open(self):
+        """Unittest for the breaker opening after consecutive failures."""
+        self.breaker.record(True)
+        self.breaker.record(False)
+        self.breaker.record(True)
+        self.assertEqual(self.breaker.state, breaker.CLOSED)
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record(True)
+        self.assertEqual(self.breaker.state, breaker.OPEN)
+        self.assertFalse(self.breaker.allow())
+        self.assertEqual(self.changes, [(breaker.CLOSED, breaker.OPEN)])
+
+    def test_slow_calls(self):
+        """Unittest for the calls slower than the latency threshold."""
+        self.breaker.record(False, latency=6.0)
+        self.breaker.record(False, latency=6.0)
+        self.assertEqual(self.breaker.state, breaker.OPEN)
+
+    def test_probe_success(self):
+        """Unittest for a successful probe closing the breaker."""
+        self.trip()
+        self.clock.advance(29)
+        self.assertFalse(self.breaker.allow())
+        self.clock.advance(1)
+        self.assertTrue(self.breaker.allow())
+        self.assertEqual(self.breaker.state, breaker.HALF_OPEN)
+        self.assertFalse(self.breaker.allow())
+        self.breaker.record(False)
+        self.assertEqual(self.breaker.state, breaker.CLOSED)
+        self.assertTrue(self.breaker.allow())
+        self.assertEqual(self.changes, [
+            (breaker.CLOSED, breaker.OPEN),
+            (breaker.OPEN, breaker.HALF_OPEN),
+            (breaker.HALF_OPEN, breaker.CLOSED),
+        ])
+
+    def test_probe_failure(self):
+        """Unittest for a failed probe opening the breaker again."""
+        self.trip()
+        self.clock.advance(30)
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record(True)
+        self.assertEqual(self.breaker.state, breaker.OPEN)
+        self.clock.advance(29)
+        self.assertFalse(self.breaker.allow())
+
+    def test_probe_cancel(self):
+        """Unittest for a probe given back by a call which was not sent."""
+        self.trip()
+        self.clock.advance(30)
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())
+        self.breaker.cancel()
+        self.assertTrue(self.breaker.allow())
+        self.assertEqual(self.breaker.state, breaker.HALF_OPEN)
+
+    def test_breakers(self):
+        """Unittest for one breaker per endpoint."""
+        breakers = CF.CircuitBreakers(failure_threshold=1)
+        breakers.get(fake.BASE_URL).record(True)
+        self.assertIs(breakers.get(fake.BASE_URL), breakers.get(fake.BASE_URL))
+        self.assertEqual(breakers.states(), {fake.BASE_URL: breaker.OPEN})
+        self.assertTrue(breakers.get(fake.OTHER_URL).allow())
+
+
+class TestClientBreaker(unittest.TestCase):
+    """Unittests for the circuit breakers of `FaceClient`."""
+
+    def setUp(self):
+        self.clock = fake.patch_clock(self, breaker)
+
+    def test_fail_fast(self):
+        """Unittest for the calls failing fast while the breaker is open."""
+        client = fake.client(
+            default=fake.error(500, 'InternalServerError'),
+            retry=CF.retry.RetryPolicy(max_attempts=1),
+            breakers=CF.CircuitBreakers(failure_threshold=2))
+        for _ in range(2):
+            with self.assertRaises(CF.CognitiveFaceException):
+                client.person_group.get('group')
+        with self.assertRaises(CF.CircuitOpenError):
+            client.person_group.get('group')
+        self.assertEqual(len(client.transport.requests), 2)
+
+    def test_unexpected_error(self):
+        """Unittest for the outcome of a call ended by an unexpected error."""
+        pool = CF.KeyPool([('fake-key', fake.BASE_URL)])
+        client = fake.client([RuntimeError('Unexpected.')],
+                             breakers=CF.CircuitBreakers(failure_threshold=1),
+                             key_pool=pool)
+        with self.assertRaises(RuntimeError):
+            client.person_group.get('group')
+        self.assertEqual(client.breakers.states(),
+                         {fake.BASE_URL: breaker.OPEN})
+        self.assertEqual(pool.stats()[0]['in_flight'], 0)
+        self.assertEqual(pool.stats()[0]['errors'], 1)
+
+    def test_probe_not_sent(self):
+        """Unittest for the probe given back by a call past its deadline."""
+        ratelimit_clock = fake.patch_clock(self, ratelimit)
+        pool = CF.KeyPool([('fake-key', fake.BASE_URL)], rate=1, burst=1)
+        client = fake.client(
+            breakers=CF.CircuitBreakers(failure_threshold=1), key_pool=pool)
+        client.breakers.get(fake.BASE_URL).record(True)
+        self.clock.advance(30)
+        pool.members[0].reserve()
+        with CF.Deadline(0.5):
+            with self.assertRaises(CF.DeadlineExceeded):
+                client.person_group.get('group')
+        self.assertEqual(pool.stats()[0]['in_flight'], 0)
+        self.assertEqual(client.transport.requests, [])
+        ratelimit_clock.advance(1)
+        client.person_group.get('group')
+        self.assertEqual(client.breakers.states(),
+                         {fake.BASE_URL: breaker.CLOSED})
+
+    def test_failover(self):
+        """Unittest for the stateless calls sent to the failover endpoint."""
+        client = fake.client(
+            retry=CF.retry.RetryPolicy(max_attempts=1),
+            breakers=CF.CircuitBreakers(failure_threshold=1),
+            failover=(None, fake.OTHER_URL))
+        client.breakers.get(fake.BASE_URL).record(True)
+        client.face.detect('http://image', face_id=False)
+        self.assertTrue(
+            client.transport.requests[-1].url.startswith(fake.OTHER_URL))
+        with self.assertRaises(CF.CircuitOpenError):
+            client.face.detect('http://image')
+        with self.assertRaises(CF.CircuitOpenError):
+            client.person_group.get('group')
+
+
+if __name__ == '__main__':
+    unittest.main()
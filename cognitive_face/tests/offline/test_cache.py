@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: test_cache.py
+Description: Offline unittests for the detection cache of the Cognitive Face
+    API.
+"""
+
+import asyncio
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+import cognitive_face as CF
+from cognitive_face import cache
+
+from . import fake
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class RecordingCache(cache.DetectionCache):
+    """`DetectionCache` recording the threads it is used from."""
+
+    def __init__(self, **kwargs):
+        super(RecordingCache, self).__init__(**kwargs)
+        self.threads = []
+
+    def get(self, key):
+        self.threads.append(threading.current_thread())
+        return super(RecordingCache, self).get(key)
+
+    def put(self, key, result, detected_at=None):
+        self.threads.append(threading.current_thread())
+        super(RecordingCache, self).put(key, result, detected_at)
+
+
+class TestDetectionCache(unittest.TestCase):
+    """Unittests for `cache.DetectionCache`."""
+
+    def setUp(self):
+        self.clock = fake.patch_clock(self, cache)
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def files(self):
+        """Return the keys of the results cached on disk."""
+        return sorted(
+            name[:-len('.json')] for name in os.listdir(self.directory))
+
+    def test_face_id_margin(self):
+        """Unittest for the `faceId` results expiring before their
+        `faceId`s."""
+        detections = cache.DetectionCache(directory=self.directory)
+        detections.put('key', [{'faceId': 'f'}], self.clock())
+        detections.put('other', [{}], self.clock())
+        self.clock.advance(cache.FACE_ID_LIFETIME - cache.FACE_ID_MARGIN - 1)
+        self.assertEqual(detections.get('key'), [{'faceId': 'f'}])
+        self.clock.advance(1)
+        self.assertIsNone(detections.get('key'))
+        self.assertEqual(detections.get('other'), [{}])
+        self.assertEqual(detections.stats()['expired'], 2)
+        self.assertEqual(self.files(), ['other'])
+
+    def test_sweep(self):
+        """Unittest for the least recently used results swept from disk."""
+        detections = cache.DetectionCache(
+            max_entries=0, directory=self.directory, max_disk_entries=3)
+        for key in 'abc':
+            detections.put(key, [{}])
+            self.clock.advance(1)
+        self.assertEqual(detections.get('a'), [{}])
+        self.clock.advance(1)
+        detections.put('d', [{}])
+        self.assertEqual(self.files(), ['a', 'c', 'd'])
+        self.assertEqual(detections.stats()['swept'], 1)
+
+    def test_transform(self):
+        """Unittest for the `Transform` of a result kept on disk."""
+        transform = CF.Transform(0.5, 0.25, 6, (300, 200))
+        faces = CF.Faces([{'faceRectangle': {}}], transform)
+        cache.DetectionCache(directory=self.directory).put('key', faces)
+        for detections in (cache.DetectionCache(directory=self.directory),
+                           cache.DetectionCache(
+                               max_entries=0, directory=self.directory)):
+            for _ in range(2):
+                result = detections.get('key')
+                self.assertIsInstance(result, CF.Faces)
+                self.assertEqual(result, faces)
+                self.assertEqual(
+                    vars(result.transform), {
+                        'scale_x': 0.5,
+                        'scale_y': 0.25,
+                        'orientation': 6,
+                        'size': (300, 200)
+                    })
+
+
+    @unittest.skipIf(aiohttp is None, 'aiohttp is not installed.')
+    def test_off_event_loop(self):
+        """Unittest for the cache of the asyncio interface read and written
+        off the event loop."""
+        detections = RecordingCache(directory=self.directory)
+        client = fake.aio_client(
+            default=fake.response([{
+                'faceId': 'f'
+            }]), cache=detections)
+
+        async def detect():
+            return [await client.face.detect(b'image') for _ in range(2)]
+
+        self.assertEqual(asyncio.run(detect()), [[{'faceId': 'f'}]] * 2)
+        self.assertEqual(len(client.transport.requests), 1)
+        self.assertEqual(len(detections.threads), 3)
+        self.assertNotIn(threading.current_thread(), detections.threads)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: test_client.py
+Description: Offline unittests for the per-client configuration of the
+    Cognitive Face API.
+"""
+
+import asyncio
+import threading
+import unittest
+
+import cognitive_face as CF
+
+from . import fake
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class RecordingValidator(CF.Validator):
+    """`Validator` recording the threads it checks images from."""
+
+    def __init__(self, **kwargs):
+        super(RecordingValidator, self).__init__(**kwargs)
+        self.threads = []
+
+    def check(self, data, maximums=True):
+        self.threads.append(threading.current_thread())
+        return super(RecordingValidator, self).check(data, maximums)
+
+
+class TestUploadSettings(unittest.TestCase):
+    """Unittests for the upload settings held by each `FaceClient`."""
+
+    def test_per_client(self):
+        """Unittest for the settings of the client an endpoint is bound to.
+        """
+        strict = fake.client(validator=CF.Validator())
+        lenient = fake.client()
+        with self.assertRaises(CF.InvalidImageError):
+            strict.face.detect(b'not an image')
+        self.assertEqual(strict.transport.requests, [])
+        lenient.face.detect(b'not an image')
+        self.assertEqual(len(lenient.transport.requests), 1)
+        self.assertIsNone(CF.util.Validation.get())
+
+    def test_default_client(self):
+        """Unittest for the holders managing the default client."""
+        default = CF.client.default()
+        self.addCleanup(setattr, default, 'mmap_threshold',
+                        default.mmap_threshold)
+        CF.util.MemoryMap.set(1024)
+        self.assertEqual(default.mmap_threshold, 1024)
+        self.assertIs(CF.util.current_client(), default)
+
+    @unittest.skipIf(aiohttp is None, 'aiohttp is not installed.')
+    def test_off_event_loop(self):
+        """Unittest for the images of the asyncio interface read off the
+        event loop, with the settings of its client."""
+        validator = RecordingValidator()
+        client = fake.aio_client(validator=validator)
+
+        async def detect():
+            with self.assertRaises(CF.InvalidImageError):
+                await client.face.detect(b'not an image')
+            return await client.person_group.lists()
+
+        self.assertEqual(asyncio.run(detect()), [])
+        self.assertEqual(len(validator.threads), 1)
+        self.assertIsNot(validator.threads[0], threading.current_thread())
+        self.assertEqual(len(client.transport.requests), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: test_deadline.py
+Description: Offline unittests for the deadlines of the Cognitive Face API.
+"""
+
+import threading
+import unittest
+
+import cognitive_face as CF
+
+
+class TestScope(unittest.TestCase):
+    """Unittests for `deadline.scope`."""
+
+    def test_shared(self):
+        """Unittest for a deadline applied by several threads at once."""
+        deadline = CF.Deadline(60)
+        entered = threading.Barrier(2)
+        first_left = threading.Event()
+        errors = []
+
+        def apply(first):
+            try:
+                with CF.deadline.scope(deadline):
+                    entered.wait()
+                    if not first:
+                        first_left.wait()
+                    current = CF.deadline.current()
+                    self.assertEqual(current.expires_at, deadline.expires_at)
+            except Exception as exception:  # pylint: disable=broad-except
+                errors.append(exception)
+            finally:
+                if first:
+                    first_left.set()
+
+        threads = [
+            threading.Thread(target=apply, args=(first, ))
+            for first in (True, False)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertIsNone(CF.deadline.current())
+
+    def test_none(self):
+        """Unittest for a block without a deadline."""
+        with CF.deadline.scope(None):
+            self.assertIsNone(CF.deadline.current())
+        with CF.deadline.scope(5):
+            self.assertLessEqual(CF.deadline.current().remaining(), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: test_fetch.py
+Description: Offline unittests for the download of the URL images of the
+    Cognitive Face API.
+"""
+
+import unittest
+
+import requests
+
+import cognitive_face as CF
+from cognitive_face.session import SessionPool
+
+from . import fake
+
+# URLs of the test images.
+IMAGE_URL = 'http://origin/image.jpg'
+OTHER_URL = 'http://origin/other.jpg'
+
+
+class Origin(object):
+    """Origin server answering the requests of every `SessionPool` from a
+    script, replacing `SessionPool.request` for the duration of a test.
+
+    Attributes:
+        requests: The (url, headers) of the requests sent, in order.
+    """
+
+    def __init__(self, test, answers):
+        self.answers = list(answers)
+        self.requests = []
+        test.addCleanup(setattr, SessionPool, 'request', SessionPool.request)
+        SessionPool.request = self.request
+
+    def request(self, method, url, **kwargs):
+        """Answer a request with the next `fake.Download` or exception."""
+        assert method == 'GET' and kwargs['stream']
+        self.requests.append((url, kwargs.get('headers') or {}))
+        answer = self.answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+
+class TestURLFetcher(unittest.TestCase):
+    """Unittests for `fetch.URLFetcher`."""
+
+    def test_etag(self):
+        """Unittest for a cached image revalidated with its `ETag`."""
+        unchanged = fake.Download(status=304, reason='Not Modified')
+        origin = Origin(self, [
+            fake.Download(b'image', headers={'ETag': '"v1"'}),
+            unchanged,
+        ])
+        fetcher = CF.URLFetcher()
+        self.assertEqual(fetcher.fetch(IMAGE_URL), b'image')
+        self.assertEqual(fetcher.fetch(IMAGE_URL), b'image')
+        self.assertEqual(origin.requests, [(IMAGE_URL, {}), (IMAGE_URL, {
+            'If-None-Match': '"v1"'
+        })])
+        self.assertTrue(unchanged.closed)
+        self.assertEqual(fetcher.stats(), {
+            'fetches': 2,
+            'downloads': 1,
+            'revalidated': 1,
+            'entries': 1,
+            'size': 5
+        })
+
+    def test_last_modified(self):
+        """Unittest for a cached image revalidated with its `Last-Modified`
+        date, then downloaded again once changed."""
+        date = 'Wed, 21 Oct 2015 07:28:00 GMT'
+        origin = Origin(self, [
+            fake.Download(b'image', headers={'Last-Modified': date}),
+            fake.Download(b'changed'),
+        ])
+        fetcher = CF.URLFetcher()
+        fetcher.fetch(IMAGE_URL)
+        self.assertEqual(fetcher.fetch(IMAGE_URL), b'changed')
+        self.assertEqual(origin.requests[1][1], {'If-Modified-Since': date})
+        # Without a validator, the new content is not cached.
+        self.assertEqual(fetcher.stats()['entries'], 0)
+
+    def test_max_size(self):
+        """Unittest for the images over `max_size`."""
+        announced = fake.Download(b'image', headers={'Content-Length': '11'})
+        Origin(self, [announced, fake.Download(b'x' * 11)])
+        fetcher = CF.URLFetcher(max_size=10)
+        for _ in range(2):
+            with self.assertRaises(CF.FetchError) as context:
+                fetcher.fetch(IMAGE_URL)
+            self.assertEqual(context.exception.code, 'InvalidImageSize')
+        self.assertTrue(announced.closed)
+
+    def test_lru(self):
+        """Unittest for the least recently used images dropped past
+        `max_cache_bytes`."""
+        origin = Origin(self, [
+            fake.Download(b'x' * 6, headers={'ETag': 'a'}),
+            fake.Download(b'y' * 4, headers={'ETag': 'b'}),
+            fake.Download(status=304),
+            fake.Download(b'z' * 4, headers={'ETag': 'c'}),
+            fake.Download(b'y' * 4, headers={'ETag': 'b'}),
+            fake.Download(b'w' * 11, headers={'ETag': 'd'}),
+        ])
+        fetcher = CF.URLFetcher(max_cache_bytes=10)
+        for url in ('http://origin/a', 'http://origin/b', 'http://origin/a',
+                    'http://origin/c', 'http://origin/b', 'http://origin/d'):
+            fetcher.fetch(url)
+        # b was dropped for c, then a for b again, d never fits.
+        self.assertEqual(origin.requests[4], ('http://origin/b', {}))
+        self.assertEqual(fetcher.stats()['entries'], 2)
+        self.assertEqual(fetcher.stats()['size'], 8)
+
+    def test_errors(self):
+        """Unittest for the error codes of the failed downloads."""
+        Origin(self, [
+            fake.Download(status=404, reason='Not Found'),
+            requests.ConnectionError('Connection refused.'),
+            ValueError('Invalid URL.'),
+        ])
+        fetcher = CF.URLFetcher()
+        for _ in range(3):
+            with self.assertRaises(CF.FetchError) as context:
+                fetcher.fetch(IMAGE_URL)
+            self.assertEqual(context.exception.code, 'InvalidURL')
+            self.assertEqual(context.exception.url, IMAGE_URL)
+            self.assertIsNone(context.exception.status_code)
+
+    def test_client(self):
+        """Unittest for a URL image uploaded by the client."""
+        Origin(self, [fake.Download(b'image')])
+        client = fake.client(fetcher=CF.URLFetcher())
+        client.face.detect(OTHER_URL)
+        request = client.transport.requests[0]
+        self.assertEqual(request.body, b'image')
+        self.assertEqual(request.headers['Content-Type'],
+                         'application/octet-stream')
+
+
+if __name__ == '__main__':
+    unittest.main()
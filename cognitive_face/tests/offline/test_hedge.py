@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: test_hedge.py
+Description: Offline unittests for the hedged requests of the Cognitive Face
+    API.
+"""
+
+import asyncio
+import unittest
+
+import cognitive_face as CF
+from cognitive_face import ratelimit
+
+from . import fake
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# Answers of the first and of the duplicate request.
+SLOW = {'name': 'slow'}
+FAST = {'name': 'fast'}
+
+
+def policy():
+    """Return a `HedgingPolicy` hedging after 50 ms."""
+    return CF.HedgingPolicy(delay=0.05, min_samples=3)
+
+
+class TestHedgingPolicy(unittest.TestCase):
+    """Unittests for `hedge.HedgingPolicy`."""
+
+    def test_delay_for(self):
+        """Unittest for the percentile used once enough latencies are
+        observed."""
+        hedging = CF.HedgingPolicy(percentile=50, delay=1.0, min_samples=3)
+        hedging.observe('identify', 0.3, False, False)
+        hedging.observe('identify', 0.1, False, False)
+        self.assertEqual(hedging.delay_for('identify'), 1.0)
+        hedging.observe('identify', 0.2, True, True)
+        self.assertEqual(hedging.delay_for('identify'), 0.2)
+        self.assertEqual(hedging.delay_for('verify'), 1.0)
+        self.assertEqual(hedging.stats(), {
+            'calls': 3,
+            'hedged': 1,
+            'hedge_wins': 1
+        })
+
+    def test_applies(self):
+        """Unittest for the calls hedged."""
+        hedging = CF.HedgingPolicy()
+        self.assertTrue(hedging.applies('GET', 'persongroups/g'))
+        self.assertTrue(hedging.applies('POST', 'identify'))
+        self.assertFalse(hedging.applies('POST', 'detect'))
+
+
+class TestClientHedging(unittest.TestCase):
+    """Unittests for the hedged calls of `FaceClient`."""
+
+    def client(self, answers, **kwargs):
+        """Return a fake client hedging its calls, without retries."""
+        return fake.client(
+            answers,
+            hedging=policy(),
+            retry=CF.retry.RetryPolicy(max_attempts=1),
+            **kwargs)
+
+    def test_fast(self):
+        """Unittest for a call answering before the hedging delay."""
+        client = self.client([fake.response(FAST)])
+        self.assertEqual(client.person_group.get('g'), FAST)
+        self.assertEqual(len(client.transport.requests), 1)
+        self.assertEqual(client.hedging.stats(), {
+            'calls': 1,
+            'hedged': 0,
+            'hedge_wins': 0
+        })
+
+    def test_hedge_wins(self):
+        """Unittest for a slow call beaten by its duplicate."""
+        client = self.client(
+            [fake.slow(0.5, fake.response(SLOW)),
+             fake.response(FAST)])
+        self.assertEqual(client.person_group.get('g'), FAST)
+        self.assertEqual(len(client.transport.requests), 2)
+        self.assertEqual(client.hedging.stats(), {
+            'calls': 1,
+            'hedged': 1,
+            'hedge_wins': 1
+        })
+
+    def test_first_fails(self):
+        """Unittest for a duplicate winning once the first call failed."""
+        client = self.client([
+            fake.slow(0.1, fake.FakeError('Reset.')),
+            fake.slow(0.2, fake.response(FAST))
+        ])
+        self.assertEqual(client.person_group.get('g'), FAST)
+        self.assertEqual(client.hedging.stats()['hedge_wins'], 1)
+
+    def test_both_fail(self):
+        """Unittest for the error of the last failed call."""
+        client = self.client([
+            fake.slow(0.1, fake.FakeError('First.')),
+            fake.slow(0.2, fake.FakeError('Second.'))
+        ])
+        with self.assertRaises(fake.FakeError) as context:
+            client.person_group.get('g')
+        self.assertEqual(str(context.exception), 'Second.')
+
+    def test_not_admitted(self):
+        """Unittest for no duplicate without a token to spare."""
+        client = self.client(
+            [fake.slow(0.2, fake.response(SLOW))],
+            limiter=ratelimit.RateLimiter(1, burst=1))
+        self.assertEqual(client.person_group.get('g'), SLOW)
+        self.assertEqual(len(client.transport.requests), 1)
+        self.assertEqual(client.hedging.stats()['hedged'], 0)
+
+    def test_not_hedged(self):
+        """Unittest for the calls out of the hedged routes."""
+        client = self.client([fake.slow(0.2, fake.response([]))])
+        client.face.detect('http://image')
+        self.assertEqual(len(client.transport.requests), 1)
+        self.assertEqual(client.hedging.stats()['calls'], 0)
+
+
+@unittest.skipIf(aiohttp is None, 'aiohttp is not installed.')
+class TestAsyncHedging(unittest.TestCase):
+    """Unittests for the hedged calls of `aio.FaceClient`."""
+
+    def run_get(self, answers):
+        """Return the result of a hedged `person_group.get` and the client."""
+        client = fake.aio_client(
+            answers,
+            hedging=policy(),
+            retry=CF.retry.RetryPolicy(max_attempts=1))
+        return asyncio.run(client.person_group.get('g')), client
+
+    def test_hedge_wins(self):
+        """Unittest for a slow call beaten by its duplicate."""
+        result, client = self.run_get(
+            [fake.aio_slow(0.5, fake.response(SLOW)),
+             fake.response(FAST)])
+        self.assertEqual(result, FAST)
+        self.assertEqual(client.client.hedging.stats(), {
+            'calls': 1,
+            'hedged': 1,
+            'hedge_wins': 1
+        })
+
+    def test_first_fails(self):
+        """Unittest for a duplicate winning once the first call failed."""
+        result, client = self.run_get([
+            fake.aio_slow(0.1, fake.FakeError('Reset.')),
+            fake.aio_slow(0.2, fake.response(FAST))
+        ])
+        self.assertEqual(result, FAST)
+        self.assertEqual(client.client.hedging.stats()['hedge_wins'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: test_keypool.py
+Description: Offline unittests for the key pool of the Cognitive Face API.
+"""
+
+import unittest
+
+import cognitive_face as CF
+from cognitive_face import keypool
+
+from . import fake
+
+
+class TestKeyPool(unittest.TestCase):
+    """Unittests for `keypool.KeyPool`."""
+
+    def setUp(self):
+        self.clock = fake.patch_clock(self, keypool)
+        self.pool = CF.KeyPool([('home-key', fake.BASE_URL),
+                                ('other-key', fake.OTHER_URL)],
+                               max_failures=2,
+                               cooldown=30.0)
+        self.home, self.other = self.pool.members
+
+    def test_pinned(self):
+        """Unittest for the calls on persisted data or `faceId`s pinned to
+        home."""
+        for route in ('persongroups/g', 'identify', 'verify', 'group',
+                      'findsimilars'):
+            member = self.pool.pick(route)
+            self.assertIs(member, self.home)
+            self.pool.release(member, 200)
+
+    def test_detect(self):
+        """Unittest for the detections spread unless they issue `faceId`s."""
+        busy = self.pool.pick('persongroups')
+        spread = self.pool.pick('detect', {'returnFaceId': 'false'})
+        self.assertIs(spread, self.other)
+        pinned = self.pool.pick('detect', {'returnFaceId': 'true'})
+        self.assertIs(pinned, self.home)
+        self.assertIs(self.pool.pick('detect'), self.home)
+        self.assertEqual(busy.in_flight, 3)
+
+    def test_release(self):
+        """Unittest for the members put aside after failures or throttling.
+        """
+        for _ in range(2):
+            self.pool.release(self.pool.pick('persongroups'), error=True)
+        self.pool.release(self.pool.pick('persongroups'), 429, '10')
+        stats = self.pool.stats()
+        self.assertEqual(stats[0]['calls'], 3)
+        self.assertEqual(stats[0]['errors'], 3)
+        self.assertEqual(stats[0]['in_flight'], 0)
+        self.assertFalse(stats[0]['available'])
+        self.clock.advance(30)
+        self.assertTrue(self.pool.stats()[0]['available'])
+
+    def test_client(self):
+        """Unittest for the key and endpoint of the member picked."""
+        client = fake.client(key_pool=self.pool)
+        client.person_group.get('g')
+        request = client.transport.requests[-1]
+        self.assertTrue(request.url.startswith(fake.BASE_URL))
+        self.assertEqual(request.headers['Ocp-Apim-Subscription-Key'],
+                         'home-key')
+        self.assertEqual(self.pool.stats()[0]['in_flight'], 0)
+
+    def test_detect_identify(self):
+        """Unittest for the `faceId`s identified where they were detected."""
+        client = fake.client(
+            [fake.response([{
+                'faceId': 'f'
+            }]), fake.response([])],
+            key_pool=self.pool)
+        self.pool.pick('persongroups')  # Keep home the most loaded.
+        faces = client.face.detect('http://image')
+        client.face.identify([faces[0]['faceId']], 'group')
+        self.assertEqual(
+            [request.url[:len(fake.BASE_URL)]
+             for request in client.transport.requests],
+            [fake.BASE_URL, fake.BASE_URL])
+
+
+if __name__ == '__main__':
+    unittest.main()
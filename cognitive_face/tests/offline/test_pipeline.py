@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: test_pipeline.py
+Description: Offline unittests for the upload pipeline of the Cognitive Face
+    API.
+"""
+
+import io
+import unittest
+
+import cognitive_face as CF
+from cognitive_face import preprocess
+
+from . import fake
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+def detect(request):
+    """Answer a detection with a face in the middle of the uploaded image."""
+    width, height = Image.open(io.BytesIO(request.body)).size
+    return fake.response([{
+        'faceRectangle': {
+            'left': width // 4,
+            'top': height // 4,
+            'width': width // 2,
+            'height': height // 2
+        }
+    }])
+
+
+@unittest.skipIf(Image is None, 'Pillow is not installed.')
+class TestPipeline(unittest.TestCase):
+    """Unittests for `pipeline.Pipeline`."""
+
+    def setUp(self):
+        self.downscaler = preprocess.Downscaler(1000, min_face=100)
+        output = io.BytesIO()
+        Image.new('RGB', (4000, 3000), (128, 128, 128)).save(output, 'JPEG')
+        self.image = output.getvalue()
+
+    def uploaded(self, client):
+        """Return the size of the last image uploaded by `client`."""
+        body = client.transport.requests[-1].body
+        return Image.open(io.BytesIO(body)).size
+
+    def test_prepared_once(self):
+        """Unittest for a prepared image uploaded without preprocessing it
+        again."""
+        client = fake.client(default=detect, downscaler=self.downscaler)
+        expected = client.face.detect(self.image)
+        self.assertEqual(self.uploaded(client), (1440, 1080))
+
+        pipeline = CF.Pipeline(
+            processes=1, threads=1, downscaler=self.downscaler)
+        [(_, faces)] = list(pipeline.run(client.face.detect, [self.image]))
+        self.assertEqual(self.uploaded(client), (1440, 1080))
+        self.assertEqual(faces, expected)
+        self.assertEqual(faces[0]['faceRectangle'], {
+            'left': 1000,
+            'top': 750,
+            'width': 2000,
+            'height': 1500
+        })
+
+    def test_client_settings(self):
+        """Unittest for the preparation set on the client of `send`."""
+        client = fake.client(default=detect, downscaler=self.downscaler)
+        pipeline = CF.Pipeline(processes=1, threads=1)
+        [(_, faces)] = list(pipeline.run(client.face.detect, [self.image]))
+        self.assertEqual(self.uploaded(client), (1440, 1080))
+        self.assertEqual(faces[0]['faceRectangle']['width'], 2000)
+
+    def test_deadline(self):
+        """Unittest for the calls made within the deadline of the
+        caller."""
+        pipeline = CF.Pipeline(processes=1, threads=2)
+        with CF.Deadline(30) as deadline:
+            outcomes = list(
+                pipeline.run(lambda image: CF.deadline.current(),
+                             ['http://image/1', 'http://image/2']))
+        for _, current in outcomes:
+            self.assertEqual(current.expires_at, deadline.expires_at)
+
+    def test_prepared_image(self):
+        """Unittest for a `PreparedImage` keeping its `Transform`."""
+        prepared = preprocess.prepare(self.image, self.downscaler)
+        client = fake.client(default=detect, downscaler=self.downscaler)
+        faces = client.face.detect(prepared)
+        self.assertEqual(self.uploaded(client), (1440, 1080))
+        self.assertIs(faces.transform, prepared.transform)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: test_preprocess.py
+Description: Offline unittests for the preprocessing of the images uploaded
+    to the Cognitive Face API.
+"""
+
+import io
+import unittest
+
+import cognitive_face as CF
+from cognitive_face import preprocess
+
+from . import fake
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+def jpeg(width, height, orientation=1):
+    """Return the content of a JPEG image with an EXIF orientation."""
+    image = Image.new('RGB', (width, height), (128, 128, 128))
+    exif = image.getexif()
+    exif[preprocess.ORIENTATION_TAG] = orientation
+    output = io.BytesIO()
+    image.save(output, 'JPEG', exif=exif.tobytes())
+    return output.getvalue()
+
+
+class TestTransform(unittest.TestCase):
+    """Unittests for `preprocess.Transform`."""
+
+    def test_target_face(self):
+        """Unittest for a target face mapped onto the uploaded image."""
+        transform = CF.Transform(0.5, 0.25)
+        self.assertEqual(transform.target_face('100,200,40,80'), '50,50,20,20')
+        self.assertEqual(transform.target_face((10, 10, 1, 1)), '5,2,1,1')
+
+    def test_restore(self):
+        """Unittest for the faces mapped back onto the original image."""
+        transform = CF.Transform(0.5, 0.25)
+        faces = transform.restore([{
+            'faceRectangle': {
+                'left': 50,
+                'top': 50,
+                'width': 20,
+                'height': 20
+            },
+            'faceLandmarks': {
+                'noseTip': {
+                    'x': 10.5,
+                    'y': 3.0
+                }
+            }
+        }, {}])
+        self.assertIsInstance(faces, CF.Faces)
+        self.assertIs(faces.transform, transform)
+        self.assertEqual(faces[0]['faceRectangle'], {
+            'left': 100,
+            'top': 200,
+            'width': 40,
+            'height': 80
+        })
+        self.assertEqual(faces[0]['faceLandmarks']['noseTip'], {
+            'x': 21.0,
+            'y': 12.0
+        })
+
+    def test_round_trip(self):
+        """Unittest for a target face going up and back unchanged."""
+        transform = CF.Transform(1440.0 / 4000, 1080.0 / 3000)
+        mapped = [
+            int(value)
+            for value in transform.target_face('1000,500,400,400').split(',')
+        ]
+        rectangle = dict(zip(('left', 'top', 'width', 'height'), mapped))
+        restored = transform.restore([{'faceRectangle': rectangle}])
+        self.assertEqual(restored[0]['faceRectangle'], {
+            'left': 1000,
+            'top': 500,
+            'width': 400,
+            'height': 400
+        })
+
+    def test_to_stored(self):
+        """Unittest for the points mapped back to the stored pixels."""
+        # Upright 300x200 image stored as 200x300 with orientation 6.
+        expected = {
+            1: (10, 20),
+            2: (290, 20),
+            3: (290, 180),
+            4: (10, 180),
+            5: (20, 10),
+            6: (20, 290),
+            7: (180, 290),
+            8: (180, 10),
+        }
+        for orientation, point in expected.items():
+            transform = CF.Transform(orientation=orientation, size=(300, 200))
+            self.assertEqual(transform.to_stored(10, 20), point)
+
+    def test_rectangle_to_stored(self):
+        """Unittest for a rectangle mapped back to the stored pixels."""
+        transform = CF.Transform(orientation=6, size=(300, 200))
+        self.assertEqual(
+            transform.rectangle_to_stored({
+                'left': 10,
+                'top': 20,
+                'width': 30,
+                'height': 40
+            }), {
+                'left': 20,
+                'top': 260,
+                'width': 40,
+                'height': 30
+            })
+
+
+@unittest.skipIf(Image is None, 'Pillow is not installed.')
+class TestPrepare(unittest.TestCase):
+    """Unittests for `preprocess.prepare`."""
+
+    def test_untouched(self):
+        """Unittest for an image needing no preprocessing."""
+        content = jpeg(400, 300)
+        downscaler = preprocess.Downscaler(1000)
+        self.assertIs(preprocess.prepare(content, downscaler, True), content)
+
+    def test_downscale(self):
+        """Unittest for a large image downscaled within `min_face`."""
+        prepared = preprocess.prepare(
+            jpeg(4000, 3000), preprocess.Downscaler(1000, min_face=100))
+        self.assertEqual(Image.open(io.BytesIO(prepared)).size, (1440, 1080))
+        self.assertAlmostEqual(prepared.transform.scale_x, 0.36)
+        self.assertEqual(prepared.transform.size, (4000, 3000))
+
+    def test_orient(self):
+        """Unittest for an image turned upright and downscaled."""
+        prepared = preprocess.prepare(
+            jpeg(300, 200, orientation=6), preprocess.Downscaler(150), True)
+        self.assertEqual(Image.open(io.BytesIO(prepared)).size, (100, 150))
+        self.assertEqual(prepared.transform.orientation, 6)
+        self.assertEqual(prepared.transform.size, (200, 300))
+
+    def test_corrupt(self):
+        """Unittest for a corrupt or truncated image, validation being
+        off."""
+        content = jpeg(4000, 3000)
+        client = fake.client(downscaler=preprocess.Downscaler(1000))
+        for corrupt in (b'\xff\xd8garbage' * 200, content[:len(content) // 2]):
+            with self.assertRaises(CF.InvalidImageError) as context:
+                client.face.detect(corrupt)
+            self.assertEqual(context.exception.code, 'InvalidImage')
+        self.assertEqual(client.transport.requests, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: test_ratelimit.py
+Description: Offline unittests for the rate limiting of the Cognitive Face
+    API.
+"""
+
+import unittest
+
+from cognitive_face import ratelimit
+
+from . import fake
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Unittests for `ratelimit.TokenBucket`."""
+
+    def setUp(self):
+        self.clock = fake.patch_clock(self, ratelimit)
+        self.bucket = ratelimit.TokenBucket(2, burst=2)
+
+    def test_reserve(self):
+        """Unittest for the waits of the reservations past the burst."""
+        self.assertEqual(self.bucket.reserve(), 0.0)
+        self.assertEqual(self.bucket.reserve(), 0.0)
+        self.assertEqual(self.bucket.reserve(), 0.5)
+        self.assertEqual(self.bucket.reserve(), 1.0)
+        self.clock.advance(1.0)
+        self.assertEqual(self.bucket.reserve(), 0.5)
+
+    def test_refill(self):
+        """Unittest for the refill capped to the burst."""
+        self.bucket.reserve()
+        self.bucket.reserve()
+        self.assertEqual(self.bucket.available_in(), 0.5)
+        self.clock.advance(0.25)
+        self.assertEqual(self.bucket.available_in(), 0.25)
+        self.clock.advance(60)
+        self.assertEqual(self.bucket.available_in(2), 0.0)
+        self.assertEqual(self.bucket.available_in(3), 0.5)
+
+    def test_try_reserve(self):
+        """Unittest for the reservations taken only without waiting."""
+        self.assertTrue(self.bucket.try_reserve())
+        self.assertTrue(self.bucket.try_reserve())
+        self.assertFalse(self.bucket.try_reserve())
+        self.clock.advance(0.5)
+        self.assertTrue(self.bucket.try_reserve())
+
+    def test_default_burst(self):
+        """Unittest for the burst defaulting to one second of requests."""
+        self.assertEqual(ratelimit.TokenBucket(5).burst, 5)
+        self.assertEqual(ratelimit.TokenBucket(0.2).burst, 1)
+
+
+class TestRateLimiter(unittest.TestCase):
+    """Unittests for `ratelimit.RateLimiter`."""
+
+    def setUp(self):
+        self.clock = fake.patch_clock(self, ratelimit)
+
+    def test_keys(self):
+        """Unittest for one bucket per subscription key, with its stats."""
+        limiter = ratelimit.RateLimiter(1, burst=1)
+        self.assertEqual(limiter.reserve('a'), 0.0)
+        self.assertEqual(limiter.reserve('a'), 1.0)
+        self.assertEqual(limiter.reserve('b'), 0.0)
+        self.assertFalse(limiter.try_acquire('a'))
+        self.assertEqual(limiter.stats(), {
+            'a': {
+                'calls': 2,
+                'waited_calls': 1,
+                'total_wait': 1.0,
+                'max_wait': 1.0,
+            },
+            'b': {
+                'calls': 1,
+                'waited_calls': 0,
+                'total_wait': 0.0,
+                'max_wait': 0.0,
+            },
+        })
+
+    def test_client_paced(self):
+        """Unittest for the calls of a client reserved on its limiter."""
+        limiter = ratelimit.RateLimiter(10, burst=2)
+        client = fake.client(limiter=limiter)
+        client.person_group.lists()
+        client.person_group.lists()
+        self.assertEqual(limiter.stats()['fake-key']['calls'], 2)
+        self.assertEqual(limiter.stats()['fake-key']['waited_calls'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
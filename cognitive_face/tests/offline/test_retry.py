@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: test_retry.py
+Description: Offline unittests for the retry policy of the Cognitive Face API.
+"""
+
+import email.utils
+import time
+import unittest
+
+import requests
+
+import cognitive_face as CF
+from cognitive_face import retry
+
+from . import fake
+
+
+class FakeRandom(object):
+    """Random source always drawing the upper bound."""
+
+    @staticmethod
+    def uniform(_, upper):
+        """Return `upper`."""
+        return upper
+
+
+class TestRetryAfter(unittest.TestCase):
+    """Unittests for `retry.parse_retry_after`."""
+
+    def test_seconds(self):
+        """Unittest for a `Retry-After` in seconds."""
+        self.assertEqual(retry.parse_retry_after('7'), 7.0)
+        self.assertEqual(retry.parse_retry_after('1.5'), 1.5)
+        self.assertEqual(retry.parse_retry_after('-3'), 0.0)
+
+    def test_http_date(self):
+        """Unittest for a `Retry-After` as an HTTP date."""
+        value = email.utils.formatdate(time.time() + 30, usegmt=True)
+        self.assertAlmostEqual(retry.parse_retry_after(value), 30, delta=2)
+        value = email.utils.formatdate(time.time() - 30, usegmt=True)
+        self.assertEqual(retry.parse_retry_after(value), 0.0)
+
+    def test_invalid(self):
+        """Unittest for a missing or malformed `Retry-After`."""
+        self.assertIsNone(retry.parse_retry_after(None))
+        self.assertIsNone(retry.parse_retry_after(''))
+        self.assertIsNone(retry.parse_retry_after('soon'))
+
+
+class TestBackoff(unittest.TestCase):
+    """Unittests for `retry.Attempts.backoff`."""
+
+    def setUp(self):
+        self.clock = fake.patch_clock(self, retry)
+        self.addCleanup(setattr, retry, 'random', retry.random)
+        retry.random = FakeRandom()
+        self.policy = retry.RetryPolicy(
+            max_attempts=4, base_delay=1.0, max_delay=5.0, max_elapsed=60.0)
+
+    def test_decorrelated_jitter(self):
+        """Unittest for delays growing threefold up to `max_delay`."""
+        attempts = self.policy.start('GET', 'persongroups')
+        self.assertEqual(attempts.backoff(503), 3.0)
+        self.assertEqual(attempts.backoff(503), 5.0)
+        self.assertEqual(attempts.backoff(503), 5.0)
+        self.assertIsNone(attempts.backoff(503))
+        self.assertEqual(self.policy.stats(), {4: 1})
+
+    def test_retry_after(self):
+        """Unittest for a `Retry-After` longer than the backoff."""
+        attempts = self.policy.start('POST', 'persongroups/g/persons')
+        self.assertEqual(attempts.backoff(429, '12'), 12.0)
+        self.assertEqual(attempts.backoff(429, '1'), 5.0)
+
+    def test_success(self):
+        """Unittest for an attempt which needs no retry."""
+        attempts = self.policy.start('GET', 'persongroups')
+        self.assertIsNone(attempts.backoff(200))
+        self.assertIsNone(self.policy.start('GET', 'x').backoff(404))
+        self.assertEqual(self.policy.stats(), {1: 2})
+
+    def test_idempotency(self):
+        """Unittest for server errors retried on idempotent calls only."""
+        attempts = self.policy.start('POST', 'persongroups/g/persons')
+        self.assertIsNone(attempts.backoff(503))
+        attempts = self.policy.start('POST', 'persongroups/g/persons')
+        self.assertIsNone(attempts.backoff(error=True))
+        attempts = self.policy.start('POST', 'detect?returnFaceId=true')
+        self.assertEqual(attempts.backoff(503), 3.0)
+        attempts = self.policy.start('DELETE', 'persongroups/g')
+        self.assertEqual(attempts.backoff(error=True), 3.0)
+
+    def test_max_elapsed(self):
+        """Unittest for no retry scheduled past `max_elapsed`."""
+        attempts = self.policy.start('GET', 'persongroups')
+        self.clock.advance(56)
+        self.assertEqual(attempts.backoff(503), 3.0)
+        self.clock.advance(3)
+        self.assertIsNone(attempts.backoff(503))
+
+
+class TestClientRetry(unittest.TestCase):
+    """Unittests for the retries of `FaceClient`."""
+
+    def test_retried(self):
+        """Unittest for a throttled call sent again."""
+        client = fake.client([fake.error(429, 'RateLimitExceeded'),
+                              fake.response({'name': 'group'})])
+        res = client.person_group.get('group')
+        self.assertEqual(res, {'name': 'group'})
+        self.assertEqual(len(client.transport.requests), 2)
+        self.assertEqual(client.retry.stats(), {2: 1})
+
+    def test_exhausted(self):
+        """Unittest for the last error raised once the attempts are over."""
+        client = fake.client(default=fake.error(503, 'ServiceUnavailable'))
+        with self.assertRaises(CF.CognitiveFaceException) as context:
+            client.person_group.get('group')
+        self.assertEqual(context.exception.status_code, 503)
+        self.assertEqual(len(client.transport.requests), 5)
+
+    def test_connection_error(self):
+        """Unittest for a failure without a response sent again, or raised
+        for a non-idempotent call."""
+        client = fake.client([fake.FakeError(), fake.response([])])
+        self.assertEqual(client.face.detect('http://image'), [])
+        client = fake.client([fake.FakeError(), fake.response({})])
+        with self.assertRaises(fake.FakeError):
+            client.person_group.train('group')
+        self.assertEqual(len(client.transport.requests), 1)
+
+    def test_requests_errors(self):
+        """Unittest for any failure of `requests` sent again, such as a
+        response cut short."""
+        client = fake.client([
+            requests.exceptions.ChunkedEncodingError(),
+            requests.exceptions.ContentDecodingError(),
+            fake.response([])
+        ])
+        client.transport.errors = CF.RequestsTransport.errors
+        self.assertEqual(client.face.detect('http://image'), [])
+        self.assertEqual(len(client.transport.requests), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
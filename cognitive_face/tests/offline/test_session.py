@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: test_session.py
+Description: Offline unittests for the pooled keep-alive sessions of the
+    Cognitive Face API.
+"""
+
+import unittest
+
+from cognitive_face import session
+
+from . import fake
+
+# URLs of two endpoints.
+FIRST_URL = 'https://first.example.com/face/v1.0/detect'
+SECOND_URL = 'https://second.example.com:8443/face/v1.0/detect'
+
+
+class FakeSession(object):
+    """Session answering every request with `on_request()`."""
+
+    def __init__(self):
+        self.urls = []
+        self.closed = False
+        self.on_request = lambda: None
+
+    def request(self, _, url, **__):
+        """Record `url` and return the outcome of `on_request`."""
+        self.urls.append(url)
+        return self.on_request()
+
+    def close(self):
+        """Mark the session as closed."""
+        self.closed = True
+
+
+class FakeSessionPool(session.SessionPool):
+    """`SessionPool` of `FakeSession`s, kept in `created`."""
+
+    def __init__(self, *args, **kwargs):
+        super(FakeSessionPool, self).__init__(*args, **kwargs)
+        self.created = []
+
+    def _new_session(self):
+        self.created.append(FakeSession())
+        return self.created[-1]
+
+
+class TestSessionPool(unittest.TestCase):
+    """Unittests for `session.SessionPool`."""
+
+    def setUp(self):
+        self.clock = fake.patch_clock(self, session)
+        self.pool = FakeSessionPool(idle_timeout=60)
+
+    def test_endpoint_of(self):
+        """Unittest for the endpoint keeping the port."""
+        self.assertEqual(
+            session.endpoint_of(SECOND_URL),
+            'https://second.example.com:8443')
+
+    def test_reuse(self):
+        """Unittest for a session per endpoint."""
+        self.pool.request('GET', FIRST_URL)
+        self.pool.request('GET', FIRST_URL + '?returnFaceId=true')
+        self.pool.request('GET', SECOND_URL)
+        self.assertEqual(len(self.pool), 2)
+        first, second = self.pool.created
+        self.assertEqual(len(first.urls), 2)
+        self.assertEqual(second.urls, [SECOND_URL])
+
+    def test_idle(self):
+        """Unittest for a session evicted after `idle_timeout`."""
+        self.pool.request('GET', FIRST_URL)
+        self.clock.advance(60)
+        self.pool.request('GET', SECOND_URL)
+        self.assertFalse(self.pool.created[0].closed)
+        self.clock.advance(1)
+        self.pool.request('GET', SECOND_URL)
+        self.assertTrue(self.pool.created[0].closed)
+        self.assertFalse(self.pool.created[1].closed)
+        self.pool.request('GET', FIRST_URL)
+        self.assertEqual(len(self.pool.created), 3)
+
+    def test_active(self):
+        """Unittest for a session in use kept past `idle_timeout`, its idle
+        time counted from the end of the call."""
+
+        def elsewhere():
+            self.clock.advance(120)
+            self.pool.request('GET', SECOND_URL)
+
+        self.pool.request('GET', FIRST_URL)
+        first = self.pool.created[0]
+        first.on_request = elsewhere
+        self.pool.request('GET', FIRST_URL)
+        self.assertFalse(first.closed)
+        self.assertEqual(len(self.pool), 2)
+        self.clock.advance(60)
+        self.pool.request('GET', SECOND_URL)
+        self.assertFalse(first.closed)
+
+    def test_no_idle_timeout(self):
+        """Unittest for the idle eviction disabled."""
+        pool = FakeSessionPool(idle_timeout=None)
+        pool.request('GET', FIRST_URL)
+        self.clock.advance(3600)
+        pool.request('GET', SECOND_URL)
+        self.assertFalse(pool.created[0].closed)
+
+    def test_reset(self):
+        """Unittest for the sessions closed by endpoint, then all."""
+        self.pool.request('GET', FIRST_URL)
+        self.pool.request('GET', SECOND_URL)
+        first, second = self.pool.created
+        self.pool.reset('https://first.example.com/other')
+        self.assertTrue(first.closed)
+        self.assertFalse(second.closed)
+        self.pool.reset('https://unknown.example.com/')
+        self.assertEqual(len(self.pool), 1)
+        self.pool.request('GET', FIRST_URL)
+        self.assertEqual(len(self.pool.created), 3)
+        self.pool.close()
+        self.assertTrue(second.closed)
+        self.assertTrue(self.pool.created[2].closed)
+        self.assertEqual(len(self.pool), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
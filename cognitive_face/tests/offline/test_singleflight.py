@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: test_singleflight.py
+Description: Offline unittests for the coalescing of identical in-flight
+    requests of the Cognitive Face API.
+"""
+
+import asyncio
+import threading
+import time
+import unittest
+
+import requests
+
+import cognitive_face as CF
+from cognitive_face import deadline
+from cognitive_face import singleflight
+
+from . import fake
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+def wait_calls(flights, calls):
+    """Wait until `flights` has seen `calls` calls."""
+    for _ in range(500):
+        if flights.stats()['calls'] >= calls:
+            return
+        time.sleep(0.01)
+    raise AssertionError('The calls did not arrive.')
+
+
+class Call(threading.Thread):
+    """Thread calling `func(*args)` and keeping its outcome."""
+
+    def __init__(self, func, *args):
+        super(Call, self).__init__()
+        self.daemon = True
+        self.func = func
+        self.args = args
+        self.outcome = None
+        self.start()
+
+    def run(self):
+        try:
+            self.outcome = self.func(*self.args)
+        except Exception as exception:  # pylint: disable=broad-except
+            self.outcome = exception
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Unittests for `singleflight.SingleFlight`."""
+
+    def setUp(self):
+        self.flights = singleflight.SingleFlight()
+        self.release = threading.Event()
+
+    def lead(self, outcome):
+        """Start a leader whose call waits for `release`, then returns or
+        raises `outcome`, and return its thread."""
+
+        def call():
+            self.release.wait(5)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        leader = Call(self.flights.do, 'key', call)
+        wait_calls(self.flights, 1)
+        return leader
+
+    def follow(self, deadline_=None):
+        """Start a follower of the flight in progress, whose own call returns
+        'own', and return its thread."""
+        calls = self.flights.stats()['calls']
+        follower = Call(self.flights.do, 'key', lambda: 'own', deadline_)
+        wait_calls(self.flights, calls + 1)
+        return follower
+
+    def test_shared_result(self):
+        """Unittest for a result shared as a private copy."""
+        leader = self.lead({'status': 'running'})
+        follower = self.follow()
+        self.release.set()
+        leader.join()
+        follower.join()
+        self.assertEqual(follower.outcome, {'status': 'running'})
+        self.assertIsNot(follower.outcome, leader.outcome)
+        self.assertEqual(self.flights.stats(), {'calls': 2, 'shared': 1})
+
+    def test_shared_error(self):
+        """Unittest for an error of the service shared with the
+        followers."""
+        error = CF.CognitiveFaceException(404, 'NotFound', 'Not found.')
+        leader = self.lead(error)
+        follower = self.follow()
+        self.release.set()
+        follower.join()
+        self.assertIs(follower.outcome, error)
+        leader.join()
+
+    def test_leader_errors(self):
+        """Unittest for the errors of the leader alone, the followers making
+        a call of their own."""
+        for error in (CF.DeadlineExceeded(),
+                      CF.CircuitOpenError(fake.BASE_URL)):
+            self.release.clear()
+            leader = self.lead(error)
+            follower = self.follow()
+            self.release.set()
+            follower.join()
+            leader.join()
+            self.assertIs(leader.outcome, error)
+            self.assertEqual(follower.outcome, 'own')
+
+    def test_follower_deadline(self):
+        """Unittest for a follower giving up at its own deadline."""
+        leader = self.lead('result')
+        follower = self.follow(deadline_=CF.Deadline(0.05))
+        follower.join()
+        self.assertIsInstance(follower.outcome, CF.DeadlineExceeded)
+        self.release.set()
+        leader.join()
+        self.assertEqual(leader.outcome, 'result')
+
+
+@unittest.skipIf(aiohttp is None, 'aiohttp is not installed.')
+class TestAsyncSingleFlight(unittest.TestCase):
+    """Unittests for `aio.singleflight.SingleFlight`."""
+
+    def test_leader_deadline(self):
+        """Unittest for the deadline of the leader not shared with the
+        followers."""
+        from cognitive_face.aio.singleflight import SingleFlight
+        flights = SingleFlight()
+
+        async def expire():
+            await asyncio.sleep(0.01)
+            raise CF.DeadlineExceeded()
+
+        async def own():
+            return {'status': 'succeeded'}
+
+        async def run():
+            leader = asyncio.ensure_future(flights.do('key', expire))
+            await asyncio.sleep(0)
+            follower = asyncio.ensure_future(flights.do('key', own))
+            return await asyncio.gather(
+                leader, follower, return_exceptions=True)
+
+        leader, follower = asyncio.run(run())
+        self.assertIsInstance(leader, CF.DeadlineExceeded)
+        self.assertEqual(follower, {'status': 'succeeded'})
+        self.assertEqual(flights.stats(), {'calls': 2, 'shared': 0})
+
+    def test_shared_result(self):
+        """Unittest for a result shared as a private copy."""
+        from cognitive_face.aio.singleflight import SingleFlight
+        flights = SingleFlight()
+        result = {'status': 'running'}
+
+        async def call():
+            await asyncio.sleep(0.01)
+            return result
+
+        async def run():
+            return await asyncio.gather(
+                flights.do('key', call), flights.do('key', call))
+
+        leader, follower = asyncio.run(run())
+        self.assertIs(leader, result)
+        self.assertEqual(follower, result)
+        self.assertIsNot(follower, result)
+        self.assertEqual(flights.stats(), {'calls': 2, 'shared': 1})
+
+
+class TestFetchFlight(unittest.TestCase):
+    """Unittests for the downloads shared by `fetch.URLFetcher`."""
+
+    def test_leader_deadline(self):
+        """Unittest for a download cut short by the deadline of its leader,
+        not shared with a follower without a deadline."""
+        clock = fake.patch_clock(self, deadline)
+        fetcher = CF.URLFetcher()
+        release = threading.Event()
+        answers = []
+
+        def request(method, url, **kwargs):
+            answers.append(kwargs['timeout'])
+            if len(answers) == 1:
+                release.wait(5)
+                clock.advance(10)
+                raise requests.Timeout('Read timed out.')
+            return fake.Download(b'image')
+
+        fetcher.pool.request = request
+
+        def lead():
+            with CF.Deadline(1):
+                return fetcher.fetch('http://image')
+
+        leader = Call(lead)
+        wait_calls(fetcher.flights, 1)
+        follower = Call(fetcher.fetch, 'http://image')
+        wait_calls(fetcher.flights, 2)
+        release.set()
+        follower.join()
+        leader.join()
+        self.assertIsInstance(leader.outcome, CF.DeadlineExceeded)
+        self.assertEqual(follower.outcome, b'image')
+        self.assertEqual(answers[1], fetcher.timeout)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: test_transport.py
+Description: Offline unittests for the HTTP transports of the Cognitive Face
+    API.
+"""
+
+import collections
+import unittest
+
+import requests
+import urllib3
+
+import cognitive_face as CF
+from cognitive_face import transport
+
+from . import fake
+
+# Response of a `urllib3.PoolManager`.
+HTTPResponse = collections.namedtuple('HTTPResponse',
+                                      ('status', 'headers', 'data'))
+
+
+class FakeManager(object):
+    """`urllib3.PoolManager` answering from a list of responses or
+    exceptions.
+
+    Attributes:
+        requests: The (method, url, kwargs) of the requests sent, in order.
+        cleared: Whether the pools were cleared.
+    """
+
+    def __init__(self, answers=()):
+        self.answers = list(answers)
+        self.requests = []
+        self.cleared = False
+
+    def request(self, method, url, **kwargs):
+        """Record the request and return or raise the next answer."""
+        self.requests.append((method, url, kwargs))
+        answer = self.answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    def clear(self):
+        """Mark the pools as cleared."""
+        self.cleared = True
+
+
+class TestUrllib3Transport(unittest.TestCase):
+    """Unittests for `transport.Urllib3Transport`."""
+
+    def setUp(self):
+        self.transport = transport.Urllib3Transport()
+        self.manager = FakeManager([HTTPResponse(200, {}, b'[]')] * 2)
+        self.transport.manager = self.manager
+
+    def test_send(self):
+        """Unittest for a request sent once, without following
+        redirects."""
+        answer = self.transport.send(
+            'POST', fake.BASE_URL + 'detect', body=b'image')
+        self.assertEqual(answer, transport.Response(200, {}, b'[]'))
+        method, url, kwargs = self.manager.requests[0]
+        self.assertEqual((method, url), ('POST', fake.BASE_URL + 'detect'))
+        self.assertEqual(kwargs['body'], b'image')
+        self.assertIs(kwargs['retries'], False)
+        self.assertIs(kwargs['redirect'], False)
+
+    def test_timeout(self):
+        """Unittest for the (connect, read) timeouts converted to a
+        `urllib3.Timeout`."""
+        self.transport.send('GET', fake.BASE_URL, timeout=(3.05, 27))
+        self.transport.send('GET', fake.BASE_URL)
+        timeout = self.manager.requests[0][2]['timeout']
+        self.assertIsInstance(timeout, urllib3.Timeout)
+        self.assertEqual((timeout.connect_timeout, timeout.read_timeout),
+                         (3.05, 27))
+        self.assertIsNone(self.manager.requests[1][2]['timeout'])
+
+    def test_errors(self):
+        """Unittest for the failures of urllib3 retried by the client."""
+        for error in (urllib3.exceptions.ProtocolError,
+                      urllib3.exceptions.NewConnectionError,
+                      urllib3.exceptions.ReadTimeoutError,
+                      urllib3.exceptions.SSLError):
+            self.assertTrue(issubclass(error, self.transport.errors))
+        self.manager.answers.insert(
+            0, urllib3.exceptions.ProtocolError('Connection aborted.'))
+        client = CF.FaceClient(
+            'fake-key',
+            fake.BASE_URL,
+            transport=self.transport,
+            retry=CF.retry.RetryPolicy(base_delay=0.0, max_delay=0.0))
+        self.assertEqual(client.face.detect('http://image'), [])
+        self.assertEqual(len(self.manager.requests), 2)
+
+    def test_reset(self):
+        """Unittest for the pools started over by `reset`."""
+        self.transport.reset(fake.BASE_URL)
+        self.assertTrue(self.manager.cleared)
+        self.assertIsInstance(self.transport.manager, urllib3.PoolManager)
+        self.assertIsNot(self.transport.manager, self.manager)
+
+
+class TestRequestsTransport(unittest.TestCase):
+    """Unittests for `transport.RequestsTransport`."""
+
+    def test_errors(self):
+        """Unittest for every failure of requests as a transport error."""
+        for error in (requests.ConnectionError, requests.Timeout,
+                      requests.exceptions.ChunkedEncodingError,
+                      requests.exceptions.InvalidURL):
+            self.assertTrue(
+                issubclass(error, transport.RequestsTransport.errors))
+
+
+if __name__ == '__main__':
+    unittest.main()
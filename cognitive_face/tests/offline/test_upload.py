@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: test_upload.py
+Description: Offline unittests for the streamed and in-place image uploads of
+    the Cognitive Face API.
+"""
+
+import array
+import io
+import mmap
+import os
+import shutil
+import tempfile
+import unittest
+
+import cognitive_face as CF
+from cognitive_face import upload
+
+from . import fake
+
+# Content of the test images, over several chunks.
+CONTENT = bytes(bytearray(range(256))) * 40
+
+
+class NonSeekable(object):
+    """File-like object which can only be read once, such as a socket."""
+
+    def __init__(self, content):
+        self.content = content
+
+    def read(self):
+        """Return the whole content."""
+        content, self.content = self.content, b''
+        return content
+
+    @staticmethod
+    def seekable():
+        """The object cannot seek."""
+        return False
+
+
+class UploadTestCase(unittest.TestCase):
+    """Base of the upload tests, with a temporary directory."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def write(self, content=CONTENT, name='image.jpg'):
+        """Write `content` to a temporary file and return its path."""
+        path = os.path.join(self.directory, name)
+        with open(path, 'wb') as image:
+            image.write(content)
+        return path
+
+
+class TestFileBody(UploadTestCase):
+    """Unittests for `upload.FileBody`."""
+
+    def test_path(self):
+        """Unittest for a file path read again by each iteration."""
+        body = upload.FileBody(path=self.write(), chunk_size=1000)
+        self.assertEqual(len(body), len(CONTENT))
+        chunks = list(body)
+        self.assertEqual(max(len(chunk) for chunk in chunks), 1000)
+        self.assertEqual(b''.join(chunks), CONTENT)
+        self.assertEqual(b''.join(body), CONTENT)
+
+    def test_fileobj_offset(self):
+        """Unittest for a file-like object read from its position."""
+        fileobj = io.BytesIO(b'header' + CONTENT)
+        fileobj.seek(len(b'header'))
+        body = upload.FileBody(fileobj=fileobj, chunk_size=1000)
+        self.assertEqual(body.offset, len(b'header'))
+        self.assertEqual(len(body), len(CONTENT))
+        self.assertEqual(fileobj.tell(), len(b'header'))
+        self.assertEqual(b''.join(body), CONTENT)
+        self.assertEqual(b''.join(body), CONTENT)
+
+    def test_concurrent(self):
+        """Unittest for interleaved iterations of a file-like object, as by a
+        hedge."""
+        body = upload.FileBody(fileobj=io.BytesIO(CONTENT), chunk_size=1000)
+        # `zip` reads a chunk of each iteration in turn.
+        first, second = zip(*zip(body, body))
+        self.assertEqual(b''.join(first), CONTENT)
+        self.assertEqual(b''.join(second), CONTENT)
+
+
+class TestView(unittest.TestCase):
+    """Unittests for `upload.view`."""
+
+    def test_flat(self):
+        """Unittest for the buffers viewed in place."""
+        self.assertIs(upload.view(CONTENT), CONTENT)
+        data = bytearray(CONTENT)
+        view = upload.view(data)
+        self.assertIsInstance(view, memoryview)
+        data[0] = 255
+        self.assertEqual(view[0], 255)
+
+    def test_multi_byte(self):
+        """Unittest for a buffer of multi-byte items cast to bytes."""
+        data = array.array('H', [1, 2, 3])
+        view = upload.view(data)
+        self.assertEqual((view.itemsize, len(view)), (1, 6))
+        self.assertEqual(view.tobytes(), data.tobytes())
+
+    def test_strided(self):
+        """Unittest for a strided view gathered into bytes."""
+        view = upload.view(memoryview(CONTENT)[::2])
+        self.assertEqual(view, CONTENT[::2])
+
+
+class TestStream(UploadTestCase):
+    """Unittests for `upload.stream` and `upload.map_file`."""
+
+    def test_bytes_io(self):
+        """Unittest for the rest of an `io.BytesIO` sent in place."""
+        fileobj = io.BytesIO(b'header' + CONTENT)
+        fileobj.seek(len(b'header'))
+        body = upload.stream(fileobj)
+        self.assertIsInstance(body, memoryview)
+        self.assertEqual(body, CONTENT)
+        body.release()
+
+    def test_non_seekable(self):
+        """Unittest for a file-like object read at once."""
+        self.assertEqual(upload.stream(NonSeekable(CONTENT)), CONTENT)
+
+    def test_path(self):
+        """Unittest for a file streamed or memory-mapped by size."""
+        path = self.write()
+        self.assertIsInstance(upload.stream(path), upload.FileBody)
+        self.assertIsInstance(
+            upload.stream(path, len(CONTENT) + 1), upload.FileBody)
+        mapped = upload.stream(path, len(CONTENT))
+        self.assertIsInstance(mapped, memoryview)
+        self.assertEqual(mapped, CONTENT)
+
+    def test_map_file(self):
+        """Unittest for a memory-mapped file, none for an empty one."""
+        self.assertEqual(upload.map_file(self.write()), CONTENT)
+        self.assertIsNone(upload.map_file(self.write(b'', 'empty.jpg')))
+        self.assertIsInstance(
+            upload.stream(self.write(b'', 'empty.jpg'), 0), upload.FileBody)
+
+
+class TestRetriedUpload(UploadTestCase):
+    """Unittests for each form of image sent again after a 503."""
+
+    def assert_sent_twice(self, image, client=None):
+        """Assert that `image` is sent whole by both attempts."""
+        client = client or fake.client(
+            [fake.error(503, 'ServiceUnavailable'),
+             fake.response([])])
+        self.assertEqual(client.face.detect(image), [])
+        self.assertEqual(len(client.transport.requests), 2)
+        for request in client.transport.requests:
+            self.assertEqual(request.body, CONTENT)
+            self.assertEqual(request.headers['Content-Length'],
+                             str(len(CONTENT)))
+
+    def test_path(self):
+        """Unittest for a streamed file path."""
+        self.assert_sent_twice(self.write())
+
+    def test_memory_mapped(self):
+        """Unittest for a memory-mapped file path."""
+        self.assert_sent_twice(
+            self.write(),
+            fake.client(
+                [fake.error(503, 'ServiceUnavailable'),
+                 fake.response([])],
+                mmap_threshold=0))
+
+    def test_fileobj(self):
+        """Unittest for a file object read from its position."""
+        with open(self.write(b'header' + CONTENT), 'rb') as image:
+            image.seek(len(b'header'))
+            self.assert_sent_twice(image)
+
+    def test_buffers(self):
+        """Unittest for the in-memory buffers."""
+        doubled = bytes(bytearray(byte for byte in CONTENT for _ in range(2)))
+        for image in (CONTENT, bytearray(CONTENT), memoryview(CONTENT),
+                      memoryview(doubled)[::2], io.BytesIO(CONTENT)):
+            self.assert_sent_twice(image)
+
+    def test_mmap(self):
+        """Unittest for an `mmap.mmap`."""
+        with open(self.write(), 'rb') as image:
+            mapped = mmap.mmap(image.fileno(), 0, access=mmap.ACCESS_READ)
+            self.assert_sent_twice(mapped)
+            mapped.close()
+
+    def test_hedged(self):
+        """Unittest for a file object sent by a call and its hedge."""
+        client = fake.client(
+            [fake.slow(0.3, fake.response([])),
+             fake.response([])],
+            hedging=CF.HedgingPolicy(delay=0.05, routes=('detect', )))
+        with open(self.write(), 'rb') as image:
+            self.assert_sent_twice(image, client)
+        self.assertEqual(client.hedging.stats()['hedged'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
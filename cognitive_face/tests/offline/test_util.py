@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: test_util.py
+Description: Offline unittests for the composite calls of the Cognitive Face
+    API.
+"""
+
+import asyncio
+import io
+import unittest
+
+import cognitive_face as CF
+from cognitive_face import dedup
+from cognitive_face import preprocess
+
+from . import fake
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+def jpeg(picture, quality=90):
+    """Return `picture` encoded as a JPEG."""
+    output = io.BytesIO()
+    picture.save(output, 'JPEG', quality=quality)
+    return output.getvalue()
+
+
+class TestAddUniqueFaces(unittest.TestCase):
+    """Unittests for `util.add_unique_faces`."""
+
+    def test_paced_by_client(self):
+        """Unittest for the adds left to the pacing of the client."""
+        sleeps = []
+        self.addCleanup(setattr, CF.util.time, 'sleep', CF.util.time.sleep)
+        CF.util.time.sleep = sleeps.append
+        client = fake.client(default=fake.response({'persistedFaceId': 'f'}))
+        images = ['http://image/{}'.format(idx) for idx in range(3)]
+        results, report = CF.util.add_unique_faces(
+            client.large_person_group_person_face.add, images, 'group',
+            'person')
+        self.assertEqual(results, [{'persistedFaceId': 'f'}] * 3)
+        self.assertEqual(report.kept, images)
+        self.assertEqual(sleeps, [])
+
+    @unittest.skipIf(Image is None, 'Pillow is not installed.')
+    def test_near_duplicates(self):
+        """Unittest for the re-encoded and resized copies of a photo."""
+        from PIL import ImageDraw
+        photo = Image.new('RGB', (400, 300))
+        draw = ImageDraw.Draw(photo)
+        for left in range(0, 400, 50):
+            draw.rectangle((left, 0, left + 25, 300),
+                           fill=(left // 2, 100, 200 - left // 2))
+        draw.ellipse((120, 60, 280, 240), fill=(250, 220, 180))
+        other = photo.transpose(Image.ROTATE_90).resize((400, 300))
+        images = [
+            jpeg(photo),
+            jpeg(photo, quality=30),
+            jpeg(photo.resize((200, 150))),
+            jpeg(other),
+        ]
+        client = fake.client(default=fake.response({'persistedFaceId': 'f'}))
+        results, report = CF.util.add_unique_faces(
+            client.large_person_group_person_face.add, images, 'group',
+            'person', deduplicator=CF.Deduplicator(max_workers=2))
+        self.assertEqual(len(results), 2)
+        self.assertEqual(report.kept, [images[0], images[3]])
+        self.assertEqual(
+            [request.body for request in client.transport.requests],
+            report.kept)
+        self.assertEqual(report.clusters, [[0, 1, 2], [3]])
+        self.assertEqual([entry['image'] for entry in report.skipped],
+                         images[1:3])
+        for entry in report.skipped:
+            self.assertIs(entry['duplicate_of'], images[0])
+            self.assertLessEqual(entry['distance'],
+                                 dedup.DEFAULT_THRESHOLD)
+        self.assertEqual(report.unhashed, [])
+
+
+@unittest.skipIf(Image is None, 'Pillow is not installed.')
+class TestAddGroupPhoto(unittest.TestCase):
+    """Unittests for `util.add_group_photo`."""
+
+    def setUp(self):
+        self.downscaler = preprocess.Downscaler(1000, min_face=100)
+        output = io.BytesIO()
+        Image.new('RGB', (4000, 3000), (128, 128, 128)).save(output, 'JPEG')
+        self.image = output.getvalue()
+        self.faces = [('1000,500,400,400', 'p1'), ({
+            'faceRectangle': {
+                'left': 2500,
+                'top': 1000,
+                'width': 500,
+                'height': 500
+            }
+        }, 'p2')]
+
+    def check(self, client, results):
+        """Check the target faces mapped once onto the downscaled photo."""
+        self.assertEqual(results, [{
+            'persistedFaceId': 'f'
+        }, {
+            'persistedFaceId': 'f'
+        }])
+        target_faces = sorted(
+            request.url.split('targetFace=', 1)[1]
+            for request in client.transport.requests)
+        self.assertEqual(target_faces,
+                         ['360%2C180%2C144%2C144', '900%2C360%2C180%2C180'])
+        for request in client.transport.requests:
+            self.assertEqual(
+                Image.open(io.BytesIO(request.body)).size, (1440, 1080))
+
+    def test_target_faces(self):
+        """Unittest for the faces of a downscaled group photo."""
+        client = fake.client(
+            default=fake.response({
+                'persistedFaceId': 'f'
+            }),
+            downscaler=self.downscaler)
+        results = CF.util.add_group_photo(
+            self.image,
+            'group',
+            self.faces,
+            add=client.large_person_group_person_face.add)
+        self.check(client, results)
+
+    @unittest.skipIf(aiohttp is None, 'aiohttp is not installed.')
+    def test_target_faces_aio(self):
+        """Unittest for the faces of a downscaled group photo, asyncio
+        interface."""
+        from cognitive_face import aio
+        client = fake.aio_client(
+            default=fake.response({
+                'persistedFaceId': 'f'
+            }),
+            downscaler=self.downscaler)
+        results = asyncio.run(
+            aio.util.add_group_photo(
+                self.image,
+                'group',
+                self.faces,
+                add=client.large_person_group_person_face.add))
+        self.check(client, results)
+
+
+if __name__ == '__main__':
+    unittest.main()
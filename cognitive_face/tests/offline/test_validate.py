@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: test_validate.py
+Description: Offline unittests for the pre-flight validation of the images
+    uploaded to the Cognitive Face API.
+"""
+
+import io
+import struct
+import unittest
+
+import cognitive_face as CF
+from cognitive_face import preprocess
+from cognitive_face import validate
+
+from . import fake
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+def jpeg(width, height):
+    """Return a JPEG header with an APP0 segment and a baseline frame."""
+    app0 = b'\xff\xe0' + struct.pack('>H', 16) + b'JFIF\x00' + b'\x00' * 9
+    frame = b'\xff\xc0' + struct.pack('>HBHHB', 11, 8, height, width, 1) + \
+        b'\x01\x11\x00'
+    return b'\xff\xd8' + app0 + b'\xff\xff' + frame
+
+
+def png(width, height):
+    """Return a PNG header."""
+    return b'\x89PNG\r\n\x1a\n' + struct.pack('>I', 13) + b'IHDR' + \
+        struct.pack('>II', width, height) + b'\x08\x02\x00\x00\x00'
+
+
+def gif(width, height):
+    """Return a GIF header."""
+    return b'GIF89a' + struct.pack('<HH', width, height) + b'\x00' * 3
+
+
+def bmp(width, height):
+    """Return a BMP header with a top-down BITMAPINFOHEADER."""
+    return b'BM' + b'\x00' * 12 + struct.pack('<Iii', 40, width, -height) + \
+        b'\x00' * 8
+
+
+def pad(header, size=2048):
+    """Return `header` padded to `size` bytes."""
+    return header + b'\x00' * (size - len(header))
+
+
+class TestImageInfo(unittest.TestCase):
+    """Unittests for `validate.image_info`."""
+
+    def info(self, content):
+        """Return the image info of `content`."""
+        return validate.image_info(
+            lambda offset, size: content[offset:offset + size])
+
+    def test_formats(self):
+        """Unittest for the header of every supported format."""
+        self.assertEqual(self.info(jpeg(640, 480)), ('JPEG', 640, 480))
+        self.assertEqual(self.info(png(800, 600)), ('PNG', 800, 600))
+        self.assertEqual(self.info(gif(320, 200)), ('GIF', 320, 200))
+        self.assertEqual(self.info(bmp(100, 50)), ('BMP', 100, 50))
+
+    def test_corrupt(self):
+        """Unittest for unsupported and truncated headers."""
+        for content in (b'', b'garbage' * 10, jpeg(640, 480)[:20],
+                        b'\xff\xd8\xff\xd9', png(1, 1)[:20]):
+            with self.assertRaises(CF.InvalidImageError) as context:
+                self.info(content)
+            self.assertEqual(context.exception.code, 'InvalidImage')
+
+
+class TestValidator(unittest.TestCase):
+    """Unittests for `validate.Validator`."""
+
+    def setUp(self):
+        self.validator = CF.Validator()
+
+    def assert_rejected(self, content, code):
+        """Assert that `content` is rejected with `code`."""
+        with self.assertRaises(CF.InvalidImageError) as context:
+            self.validator.check(content)
+        self.assertEqual(context.exception.code, code)
+        self.assertIsNone(context.exception.status_code)
+
+    def test_valid(self):
+        """Unittest for images within the limits."""
+        self.validator.check(pad(jpeg(640, 480)))
+        self.validator.check(bytearray(pad(png(36, 4096))))
+        self.assertEqual(self.validator.stats(), {
+            'checked': 2,
+            'rejected': 0
+        })
+
+    def test_limits(self):
+        """Unittest for images out of the limits of the service."""
+        self.assert_rejected(jpeg(640, 480), 'InvalidImageSize')
+        self.assert_rejected(pad(jpeg(640, 480), validate.MAX_BYTES + 1),
+                             'InvalidImageSize')
+        self.assert_rejected(pad(jpeg(35, 480)), 'InvalidImageSize')
+        self.assert_rejected(pad(png(4097, 480)), 'InvalidImageSize')
+        self.assert_rejected(pad(b'garbage'), 'InvalidImage')
+        self.assertEqual(self.validator.stats(), {
+            'checked': 5,
+            'rejected': 5
+        })
+
+    def test_formats(self):
+        """Unittest for the accepted formats."""
+        validator = CF.Validator(formats=('JPEG', ))
+        validator.check(pad(jpeg(640, 480)))
+        with self.assertRaises(CF.InvalidImageError):
+            validator.check(pad(gif(640, 480)))
+
+    def test_early(self):
+        """Unittest for the check of an image about to be preprocessed."""
+        self.validator.check(pad(png(4097, 480)), maximums=False)
+        self.validator.check(
+            pad(jpeg(640, 480), validate.MAX_BYTES + 1), maximums=False)
+        self.assert_rejected(pad(png(35, 480)), 'InvalidImageSize')
+        with self.assertRaises(CF.InvalidImageError):
+            self.validator.check(pad(b'garbage'), maximums=False)
+        self.assertEqual(self.validator.stats(), {
+            'checked': 2,
+            'rejected': 2
+        })
+
+
+class TestPreflight(unittest.TestCase):
+    """Unittests for the validation of the images preprocessed before
+    upload."""
+
+    def test_corrupt(self):
+        """Unittest for a corrupt image rejected before preprocessing."""
+        client = fake.client(
+            downscaler=preprocess.Downscaler(1000),
+            orient=True,
+            validator=CF.Validator())
+        with self.assertRaises(CF.InvalidImageError) as context:
+            client.face.detect(b'\xff\xd8garbage' * 200)
+        self.assertEqual(context.exception.code, 'InvalidImage')
+        self.assertEqual(client.transport.requests, [])
+
+    @unittest.skipIf(Image is None, 'Pillow is not installed.')
+    def test_downscaled(self):
+        """Unittest for a large image brought within the limits."""
+        output = io.BytesIO()
+        Image.new('RGB', (4000, 3000), (128, 128, 128)).save(output, 'JPEG')
+        client = fake.client(
+            default=fake.response([]),
+            downscaler=preprocess.Downscaler(1000),
+            validator=CF.Validator(max_side=2000))
+        self.assertEqual(client.face.detect(output.getvalue()), [])
+        self.assertEqual(client.validator.stats(), {
+            'checked': 1,
+            'rejected': 0
+        })
+
+
+if __name__ == '__main__':
+    unittest.main()
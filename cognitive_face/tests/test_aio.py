@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: test_aio.py
+Description: Unittests for the asyncio interface of the Cognitive Face API.
+"""
+
+import asyncio
+import unittest
+
+import cognitive_face as CF
+from cognitive_face import aio
+
+from . import util
+
+
+def run(coroutine):
+    """Run `coroutine` in a fresh event loop and close its session."""
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.run_until_complete(aio.ConnectionPool.close())
+        loop.close()
+
+
+class TestAio(unittest.TestCase):
+    """Unittests for the asyncio interface."""
+
+    def test_detect(self):
+        """Unittest for `aio.face.detect`."""
+        image = '{}detection1.jpg'.format(util.BASE_URL_IMAGE)
+        res = run(aio.face.detect(image))
+        print(res)
+        self.assertIsInstance(res, list)
+        util.wait()
+
+    def test_verify_face_ids(self):
+        """Unittest for `aio.face.verify` with face ids."""
+        res = run(
+            aio.face.verify(
+                util.DataStore.face_id,
+                another_face_id=util.DataStore.another_face_id))
+        print(res)
+        self.assertIsInstance(res, dict)
+        util.wait()
+
+    def test_get_large_person_group(self):
+        """Unittest for `aio.large_person_group.get`."""
+        res = run(
+            aio.large_person_group.get(util.DataStore.large_person_group_id))
+        print(res)
+        self.assertIsInstance(res, dict)
+        util.wait()
+
+    def test_exception(self):
+        """Unittest for the exception mapping of the asyncio interface."""
+        with self.assertRaises(CF.CognitiveFaceException):
+            run(aio.person_group.get('not-exist-person-group'))
+        util.wait()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: test_client.py
+Description: Unittests for the client of the Cognitive Face API.
+"""
+
+import unittest
+
+import cognitive_face as CF
+
+from . import util
+from .util import config
+
+
+class TestClient(unittest.TestCase):
+    """Unittests for `FaceClient`."""
+
+    @classmethod
+    def setUpClass(cls):
+        # Share the limiter `util.wait` relies on to skip its sleeps.
+        cls.client = CF.FaceClient(
+            config.KEY, config.BASE_URL, limiter=CF.RateLimit.get())
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client.close()
+
+    def test_detect(self):
+        """Unittest for `FaceClient.face.detect`."""
+        image = '{}detection1.jpg'.format(util.BASE_URL_IMAGE)
+        res = self.client.face.detect(image)
+        print(res)
+        self.assertIsInstance(res, list)
+        util.wait()
+
+    def test_get_status_large_person_group(self):
+        """Unittest for `FaceClient.large_person_group.get_status`."""
+        res = self.client.large_person_group.get_status(
+            util.DataStore.large_person_group_id)
+        print(res)
+        self.assertIsInstance(res, dict)
+        util.wait()
+
+    def test_wrong_key(self):
+        """Unittest for a client with its own invalid Subscription Key."""
+        client = CF.FaceClient(
+            'invalid-key', config.BASE_URL, limiter=CF.RateLimit.get())
+        with self.assertRaises(CF.CognitiveFaceException):
+            client.large_person_group.get(
+                util.DataStore.large_person_group_id)
+        client.close()
+        util.wait()
+
+
+if __name__ == '__main__':
+    unittest.main()
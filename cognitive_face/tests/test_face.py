@@ -6,6 +6,7 @@ Description: Unittests for Face section of the Cognitive Face API.
 """
 
 import unittest
+import uuid
 
 import cognitive_face as CF
 
@@ -23,6 +24,21 @@ class TestFace(unittest.TestCase):
         self.assertIsInstance(res, list)
         util.wait()
 
+    def test_detect_many(self):
+        """Unittest for `face.detect_many` with a bad image."""
+        images = [
+            '{}detection1.jpg'.format(util.BASE_URL_IMAGE),
+            '{}does-not-exist.jpg'.format(util.BASE_URL_IMAGE),
+            '{}detection2.jpg'.format(util.BASE_URL_IMAGE),
+        ]
+        res = list(CF.face.detect_many(images, ordered=True))
+        print(res)
+        self.assertEqual([image for image, _ in res], images)
+        self.assertIsInstance(res[0][1], list)
+        self.assertIsInstance(res[1][1], CF.CognitiveFaceException)
+        self.assertIsInstance(res[2][1], list)
+        util.wait()
+
     def test_find_similars_face_ids(self):
         """Unittest for `face.find_similars` with face ids."""
         res = CF.face.find_similars(
@@ -84,6 +100,24 @@ class TestFace(unittest.TestCase):
         self.assertIsInstance(res, list)
         util.wait()
 
+    def test_identify_all(self):
+        """Unittest for `face.identify_all` with more than 10 face ids."""
+        CF.util.wait_for_person_group_training(util.DataStore.person_group_id)
+
+        # The first chunk of 10 fails on unknown face ids, not the second.
+        unknown_face_ids = [str(uuid.uuid4()) for _ in range(10)]
+        face_ids = unknown_face_ids + util.DataStore.face_ids
+        res = CF.face.identify_all(
+            face_ids, person_group_id=util.DataStore.person_group_id)
+        print(res)
+        self.assertEqual(len(res), len(face_ids))
+        for entry in res[:10]:
+            self.assertIsInstance(entry, CF.CognitiveFaceException)
+            self.assertIs(entry, res[0])
+        self.assertEqual([entry['faceId'] for entry in res[10:]],
+                         util.DataStore.face_ids)
+        util.wait()
+
     def test_verify_face_ids(self):
         """Unittest for `face.verify` with face ids."""
         res = CF.face.verify(
@@ -11,7 +11,12 @@ import uuid
 
 import cognitive_face as CF
 
-from . import config
+try:
+    from . import config
+except ImportError:
+    raise Exception(
+        'Please setup unittest configuration `config.py` properly by '
+        'referring to `config.sample.py` so as to perform the unittests.')
 
 # Base URL of online images.
 BASE_URL_IMAGE = ('https://raw.githubusercontent.com/'
@@ -21,7 +26,10 @@ MSG_WAIT = 'Wait for {} seconds so as to avoid exceeding free quote.'
 
 
 def wait():
-    """Wait for some interval to avoid exceeding quote."""
+    """Wait for some interval to avoid exceeding quote, unless the calls are
+    already paced by the `RateLimit`."""
+    if CF.RateLimit.get() is not None:
+        return
     print(MSG_WAIT.format(config.TIME_SLEEP))
     time.sleep(config.TIME_SLEEP)
 
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: transport.py
+Description: Pluggable HTTP transports of the Python SDK of the Cognitive Face
+    API.
+"""
+import collections
+
+import requests
+import urllib3
+
+from .session import DEFAULT_IDLE_TIMEOUT
+from .session import DEFAULT_POOL_SIZE
+from .session import SessionPool
+
+try:
+    import certifi
+except ImportError:
+    certifi = None
+
+# The outcome of a request sent by a `Transport`: the status code, a
+# case-insensitive mapping of the headers and the body as bytes.
+Response = collections.namedtuple('Response', ('status', 'headers', 'body'))
+
+
+class Transport(object):
+    """Interface of the HTTP layer under a `FaceClient`.
+
+    A transport sends a fully prepared request and returns a `Response`. It
+    must be safe to call from several threads at once.
+
+    Attributes:
+        errors: The exception classes raised when a request fails without a
+            response, e.g. on connection errors or timeouts.
+    """
+
+    errors = ()
+
+    def send(self, method, url, headers=None, body=None, timeout=None):
+        """Send a request and return its `Response`.
+
+        Args:
+            method: HTTP method.
+            url: Full URL, including the query string.
+            headers: HTTP headers.
+            body: Optional body as bytes, or as an iterable of bytes chunks
+                which yields the whole body on each iteration, such as a
+                `FileBody`, to be streamed with the given `Content-Length`.
+            timeout: Optional (connect, read) timeouts in seconds.
+        """
+        raise NotImplementedError
+
+    def reset(self, url=None):
+        """Drop the pooled connections of the endpoint of `url`, or of every
+        endpoint when `url` is not given."""
+
+    def close(self):
+        """Close every pooled connection."""
+        self.reset()
+
+
+class RequestsTransport(Transport):
+    """Transport on top of `requests`, keeping a keep-alive session per
+    endpoint in a `SessionPool`.
+
+    Attributes:
+        pool: The `SessionPool` of the sessions.
+    """
+
+    errors = (requests.RequestException, )
+
+    def __init__(self,
+                 pool_size=DEFAULT_POOL_SIZE,
+                 idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        self.pool = SessionPool(pool_size, idle_timeout)
+
+    def send(self, method, url, headers=None, body=None, timeout=None):
+        response = self.pool.request(
+            method,
+            url,
+            headers=headers,
+            data=body,
+            timeout=timeout,
+            allow_redirects=False)
+        return Response(response.status_code, response.headers,
+                        response.content)
+
+    def reset(self, url=None):
+        self.pool.reset(url)
+
+
+class Urllib3Transport(Transport):
+    """Transport on top of a bare `urllib3.PoolManager`, skipping the
+    per-request overhead of `requests`.
+
+    Attributes:
+        manager: The `urllib3.PoolManager` of the connection pools.
+    """
+
+    errors = (urllib3.exceptions.HTTPError, )
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, num_pools=10):
+        kwargs = {}
+        if certifi is not None:
+            kwargs.update(cert_reqs='CERT_REQUIRED', ca_certs=certifi.where())
+        self.pool_size = pool_size
+        self.num_pools = num_pools
+        self._kwargs = kwargs
+        self.manager = self._new_manager()
+
+    def send(self, method, url, headers=None, body=None, timeout=None):
+        if timeout is not None:
+            connect, read = timeout
+            timeout = urllib3.Timeout(connect=connect, read=read)
+        response = self.manager.request(
+            method,
+            url,
+            body=body,
+            headers=headers,
+            timeout=timeout,
+            retries=False,
+            redirect=False,
+            preload_content=True)
+        return Response(response.status, response.headers, response.data)
+
+    def reset(self, url=None):
+        # A `PoolManager` cannot drop a single pool, start over instead.
+        previous, self.manager = self.manager, self._new_manager()
+        previous.clear()
+
+    def _new_manager(self):
+        return urllib3.PoolManager(
+            num_pools=self.num_pools, maxsize=self.pool_size, **self._kwargs)
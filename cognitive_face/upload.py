@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: upload.py
+Description: Streamed image uploads of the Python SDK of the Cognitive Face
+    API.
+"""
+import io
+import mmap
+import os
+import threading
+
+# Bytes read from an image and written to the socket at a time.
+CHUNK_SIZE = 64 * 1024
+
+# In-memory images sent as they are. `bytes` is `str` in Python 2, where it is
+# taken for a URL or a file path instead.
+BUFFER_TYPES = (bytearray, memoryview, mmap.mmap)
+if bytes is not str:
+    BUFFER_TYPES += (bytes, )
+
+# Size from which image files are memory-mapped when enabled, in bytes.
+DEFAULT_MMAP_THRESHOLD = 4 * 1024 * 1024
+
+
+class FileBody(object):
+    """Request body streaming an image file to the socket in chunks.
+
+    Every iteration yields the image from the start, so the body can be sent
+    again by a retry or a hedge, and holds at most one chunk in memory. A file
+    path is opened for each iteration and closed as soon as it is exhausted or
+    abandoned; a file-like object is read from its position at creation time
+    and left open for its owner. Its length is known up front, so it is sent
+    with a `Content-Length` instead of chunked transfer encoding.
+
+    Attributes:
+        path: Path of the image file, if any.
+        fileobj: Seekable file-like object of the image, if any.
+        offset: Position of the image in `fileobj`.
+    """
+
+    def __init__(self, path=None, fileobj=None, chunk_size=CHUNK_SIZE):
+        self.path = path
+        self.fileobj = fileobj
+        self.chunk_size = chunk_size
+        if path is not None:
+            self.offset = 0
+            self._length = os.path.getsize(path)
+        else:
+            self.offset = fileobj.tell()
+            fileobj.seek(0, io.SEEK_END)
+            self._length = fileobj.tell() - self.offset
+            fileobj.seek(self.offset)
+        # Concurrent iterations of a file-like object, e.g. a hedge, must not
+        # interleave their seeks and reads.
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        if self.path is not None:
+            return self._iter_path()
+        return self._iter_fileobj()
+
+    def _iter_path(self):
+        with open(self.path, 'rb') as image:
+            while True:
+                chunk = image.read(self.chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+    def _iter_fileobj(self):
+        position = self.offset
+        while True:
+            with self._lock:
+                self.fileobj.seek(position)
+                chunk = self.fileobj.read(self.chunk_size)
+            if not chunk:
+                return
+            position += len(chunk)
+            yield chunk
+
+
+class BufferBody(object):
+    """Request body sending a buffer in place, such as a view of shared
+    memory, along with the `transform` of a preprocessed image.
+
+    Attributes:
+        buffer: Flat byte buffer of the image.
+        transform: Optional `Transform` of the preprocessed image.
+    """
+
+    def __init__(self, buffer, transform=None):
+        self.buffer = buffer
+        self.transform = transform
+
+    def __len__(self):
+        return len(self.buffer)
+
+    def __iter__(self):
+        yield self.buffer
+
+    def __getitem__(self, index):
+        return self.buffer[index]
+
+
+def view(image):
+    """Return a flat byte view of the buffer `image` without copying it, or
+    `image` itself when it is already bytes."""
+    if isinstance(image, bytes):
+        return image
+    buf = memoryview(image)
+    if buf.ndim == 1 and buf.itemsize == 1:
+        return buf
+    if buf.c_contiguous:
+        return buf.cast('B')
+    # A strided view cannot be sent without gathering it first.
+    return buf.tobytes()
+
+
+def map_file(path):
+    """Return a read-only view of the memory-mapped file `path`, `None` for an
+    empty file. The mapping is released with the last reference to it."""
+    with open(path, 'rb') as image:
+        if not os.fstat(image.fileno()).st_size:
+            return None
+        return memoryview(
+            mmap.mmap(image.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+def stream(image, mmap_threshold=None):
+    """Return the body of an upload of the file path or file-like object
+    `image`.
+
+    Args:
+        image: A file path or a file-like object.
+        mmap_threshold: Optional size from which a file path is memory-mapped
+            and sent as a view of the mapping rather than streamed.
+
+    Returns:
+        a view of the content of an `io.BytesIO` or of a memory-mapped file, a
+        `FileBody` streaming other files, or the content of a file-like
+        object which cannot be read twice.
+    """
+    if isinstance(image, io.BytesIO) and hasattr(image, 'getbuffer'):
+        # Send the remaining content in place, the object cannot be resized
+        # until the upload is over.
+        return image.getbuffer()[image.tell():]
+    if not hasattr(image, 'read'):
+        if mmap_threshold is not None and \
+                os.path.getsize(image) >= mmap_threshold:
+            mapped = map_file(image)
+            if mapped is not None:
+                return mapped
+        return FileBody(path=image)
+    try:
+        seekable = image.seekable()
+    except AttributeError:  # Python 2 files.
+        seekable = hasattr(image, 'seek') and hasattr(image, 'tell')
+    if seekable:
+        return FileBody(fileobj=image)
+    return image.read()
+
+
+def load(data):
+    """Return the upload body `data` as a buffer which can be sent several
+    times at once, reading a streamed body only once."""
+    if isinstance(data, FileBody):
+        return b''.join(data)
+    return data
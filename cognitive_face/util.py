@@ -4,17 +4,57 @@
 File: util.py
 Description: Shared utilities for the Python SDK of the Cognitive Face API.
 """
+import collections
+import functools
+import inspect
+import json as jsonlib
 import os.path
+import threading
 import time
 
-import requests
+import concurrent.futures
 
 import cognitive_face as CF
+from .cache import DEFAULT_MAX_DISK_ENTRIES
+from .cache import DEFAULT_MAX_ENTRIES
+from .cache import DetectionCache
+from .dedup import Deduplicator
+from .preprocess import DEFAULT_QUALITY
+from .preprocess import Downscaler
+from .preprocess import PreparedImage
+from .preprocess import prepare
+from .preprocess import require
+from .ratelimit import RateLimiter
+from .retry import RetryPolicy
+from .session import DEFAULT_IDLE_TIMEOUT
+from .session import DEFAULT_POOL_SIZE
+from .transport import RequestsTransport
+from .upload import BUFFER_TYPES
+from .upload import BufferBody
+from .upload import DEFAULT_MMAP_THRESHOLD
+from .upload import load
+from .upload import stream
+from .upload import view
+
+# Decode the JSON responses with the fastest installed backend. All of them
+# parse the raw UTF-8 body directly, without decoding it into a string first.
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    try:
+        from ujson import loads as json_loads
+    except ImportError:
+        json_loads = jsonlib.loads
 
 DEFAULT_BASE_URL = 'https://westus.api.cognitive.microsoft.com/face/v1.0/'
 
 TIME_SLEEP = 1
 
+# Maximum number of calls in flight of the concurrent helpers.
+DEFAULT_CONCURRENCY = 8
+
+_LOCAL = threading.local()
+
 
 class CognitiveFaceException(Exception):
     """Custom Exception for the python SDK of the Cognitive Face API.
@@ -40,189 +80,708 @@ class CognitiveFaceException(Exception):
 
 
 class Key(object):
-    """Manage Subscription Key."""
+    """Manage Subscription Key of the default `FaceClient`."""
 
     @classmethod
     def set(cls, key):
         """Set the Subscription Key."""
-        cls.key = key
+        CF.client.default().key = key
 
     @classmethod
     def get(cls):
         """Get the Subscription Key."""
-        if not hasattr(cls, 'key'):
-            cls.key = None
-        return cls.key
+        return CF.client.default().key
 
 
 class BaseUrl(object):
+    """Manage Base URL of the default `FaceClient`."""
+
     @classmethod
     def set(cls, base_url):
-        if not base_url.endswith('/'):
-            base_url += '/'
-        cls.base_url = base_url
+        """Set the Base URL."""
+        CF.client.default().base_url = base_url
+
+    @classmethod
+    def get(cls):
+        """Get the Base URL."""
+        return CF.client.default().base_url
+
+
+class ConnectionPool(object):
+    """Manage the pooled keep-alive connections of the default `FaceClient`.
+    """
+
+    @classmethod
+    def set(cls, pool_size=DEFAULT_POOL_SIZE,
+            idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        """Replace the transport with a `RequestsTransport` of the given pool
+        size and idle timeout."""
+        client = CF.client.default()
+        previous, client.transport = client.transport, RequestsTransport(
+            pool_size, idle_timeout)
+        previous.close()
+
+    @classmethod
+    def get(cls):
+        """Get the `Transport` in use."""
+        return CF.client.default().transport
+
+    @classmethod
+    def reset(cls, url=None):
+        """Drop the pooled connections of one endpoint or of all of them."""
+        cls.get().reset(url)
+
+    @classmethod
+    def close(cls):
+        """Close every pooled connection."""
+        cls.get().close()
+
+
+class RateLimit(object):
+    """Manage the client-side rate limiter of the default `FaceClient`."""
+
+    @classmethod
+    def set(cls, rate, burst=None):
+        """Limit the requests of each subscription key to `rate` per second
+        with bursts of up to `burst` requests. `None` disables the limit."""
+        CF.client.default().limiter = RateLimiter(rate,
+                                                  burst) if rate else None
+
+    @classmethod
+    def get(cls):
+        """Get the `RateLimiter` in use, `None` when disabled."""
+        return CF.client.default().limiter
+
+
+class Retry(object):
+    """Manage the retry policy of the default `FaceClient`."""
+
+    @classmethod
+    def set(cls, **kwargs):
+        """Replace the policy with a `RetryPolicy` built from `kwargs`, e.g.
+        `max_attempts=1` disables retry."""
+        CF.client.default().retry = RetryPolicy(**kwargs)
+
+    @classmethod
+    def get(cls):
+        """Get the `RetryPolicy` in use."""
+        return CF.client.default().retry
+
+
+class Cache(object):
+    """Manage the detection cache of the default `FaceClient`."""
+
+    @classmethod
+    def set(cls,
+            max_entries=DEFAULT_MAX_ENTRIES,
+            directory=None,
+            max_disk_entries=DEFAULT_MAX_DISK_ENTRIES):
+        """Cache the `face.detect` results, up to `max_entries` in memory and
+        up to `max_disk_entries` in `directory` on disk if given. `None`
+        disables the cache."""
+        CF.client.default().cache = DetectionCache(
+            max_entries, directory,
+            max_disk_entries) if max_entries is not None else None
+
+    @classmethod
+    def get(cls):
+        """Get the `DetectionCache` in use, `None` when disabled."""
+        return CF.client.default().cache
+
+
+class MemoryMap(object):
+    """Manage the memory-mapping of large image files of the default
+    `FaceClient`."""
+
+    @classmethod
+    def set(cls, threshold=DEFAULT_MMAP_THRESHOLD):
+        """Memory-map the image files of at least `threshold` bytes instead of
+        streaming them, `None` to disable it."""
+        CF.client.default().mmap_threshold = threshold
 
     @classmethod
     def get(cls):
-        if not hasattr(cls, 'base_url') or not cls.base_url:
-            cls.base_url = DEFAULT_BASE_URL
-        return cls.base_url
+        """Get the size from which image files are memory-mapped."""
+        return CF.client.default().mmap_threshold
+
+
+class Downscale(object):
+    """Manage the client-side downscaling of the images uploaded by the
+    default `FaceClient`."""
+
+    @classmethod
+    def set(cls, max_side, min_face=None, quality=DEFAULT_QUALITY):
+        """Downscale the uploaded images to `max_side` pixels at most, keeping
+        faces of `min_face` pixels detectable, and re-encode them to JPEG at
+        `quality`, see `Downscaler`. `None` disables it."""
+        CF.client.default().downscaler = Downscaler(
+            max_side, min_face, quality) if max_side else None
+
+    @classmethod
+    def get(cls):
+        """Get the `Downscaler` in use, `None` when disabled."""
+        return CF.client.default().downscaler
+
+
+class Orientation(object):
+    """Manage the EXIF orientation normalization of the images uploaded by
+    the default `FaceClient`."""
+
+    @classmethod
+    def set(cls, enabled=True):
+        """Turn the uploaded images upright according to their EXIF
+        orientation, within the downscaling when it runs. Requires Pillow."""
+        if enabled:
+            require()
+        CF.client.default().orient = enabled
+
+    @classmethod
+    def get(cls):
+        """Get whether the uploaded images are turned upright."""
+        return CF.client.default().orient
+
+
+class Validation(object):
+    """Manage the local pre-flight validation of the images uploaded by the
+    default `FaceClient`."""
+
+    @classmethod
+    def set(cls, enabled=True, **kwargs):
+        """Check the format, size and dimensions of the uploaded images from
+        their header before any network I/O, against the limits of the
+        service or those in `kwargs`, see `Validator`. `enabled=False`
+        disables it."""
+        CF.client.default().validator = CF.validate.Validator(
+            **kwargs) if enabled else None
+
+    @classmethod
+    def get(cls):
+        """Get the `Validator` in use, `None` when disabled."""
+        return CF.client.default().validator
+
+
+class Fetch(object):
+    """Manage the client-side download of the URL images of the default
+    `FaceClient`."""
+
+    @classmethod
+    def set(cls, enabled=True, **kwargs):
+        """Download the URL images through a pooled and cached `URLFetcher`
+        configured by `kwargs` and upload their content, instead of letting
+        the service fetch them. `enabled=False` disables it."""
+        CF.client.default().fetcher = CF.fetch.URLFetcher(
+            **kwargs) if enabled else None
+
+    @classmethod
+    def get(cls):
+        """Get the `URLFetcher` in use, `None` when disabled."""
+        return CF.client.default().fetcher
 
 
 def request(method, url, data=None, json=None, headers=None, params=None):
     # pylint: disable=too-many-arguments
-    """Universal interface for request."""
-
-    # Make it possible to call only with short name (without BaseUrl).
-    if not url.startswith('https://'):
-        url = BaseUrl.get() + url
-
-    # Setup the headers with default Content-Type and Subscription Key.
-    headers = headers or {}
-    if 'Content-Type' not in headers:
-        headers['Content-Type'] = 'application/json'
-    headers['Ocp-Apim-Subscription-Key'] = Key.get()
-
-    response = requests.request(
-        method,
-        url,
-        params=params,
-        data=data,
-        json=json,
-        headers=headers)
-
-    # Handle result and raise custom exception when something wrong.
-    result = None
+    """Universal interface for request.
+
+    The request is sent by the `FaceClient` the endpoint is bound to, see
+    `bind`, or by the default client.
+    """
+    requester = getattr(_LOCAL, 'requester', None) or \
+        CF.client.default().request
+    return requester(
+        method, url, data=data, json=json, headers=headers, params=params)
+
+
+def current_client(func=None):
+    """Return the `FaceClient` the endpoint `func`, or else the running
+    endpoint, is bound to, see `bind`, or the default client. An asyncio
+    client gives the `FaceClient` holding its configuration."""
+    requester = getattr(func, 'requester', None) or \
+        getattr(_LOCAL, 'requester', None)
+    client = getattr(requester, '__self__', None)
+    client = getattr(client, 'client', client)
+    if isinstance(client, CF.client.FaceClient):
+        return client
+    return CF.client.default()
+
+
+def handle_response(status_code, content):
+    """Handle result and raise custom exception when something wrong.
+
+    Args:
+        status_code: HTTP response status code.
+        content: HTTP response body as raw bytes (or a string), decoded and
+            parsed in a single pass.
+
+    Returns:
+        The decoded JSON result, an empty dict for an empty body.
+    """
     # `person_group.train` return 202 status code for success.
-    if response.status_code not in (200, 202):
+    if status_code not in (200, 202):
         try:
-            error_msg = response.json()['error']
+            error_msg = json_loads(content)['error']
         except:
-            raise CognitiveFaceException(response.status_code,
-                                         response.status_code, response.text)
-        raise CognitiveFaceException(response.status_code,
+            if isinstance(content, bytes):
+                content = content.decode('utf-8', 'replace')
+            raise CognitiveFaceException(status_code, status_code, content)
+        raise CognitiveFaceException(status_code,
                                      error_msg.get('code'),
                                      error_msg.get('message'))
 
-    # Prevent `response.json()` complains about empty response.
-    if response.text:
-        result = response.json()
-    else:
-        result = {}
+    # Prevent decoding complains about empty response.
+    if content:
+        return json_loads(content)
+    return {}
 
-    return result
 
+def bind(func, requester):
+    """Return a wrapper of the endpoint `func` whose `request` calls are sent
+    through `requester` instead of the default client, see `request`."""
 
-def parse_image(image):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        """Call the endpoint with the bound requester."""
+        previous = getattr(_LOCAL, 'requester', None)
+        _LOCAL.requester = requester
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _LOCAL.requester = previous
+
+    wrapper.requester = requester
+    return wrapper
+
+
+class Namespace(object):
+    """Expose every endpoint of a section module wrapped by `wrap`.
+
+    Attributes:
+        module: The wrapped section module, e.g. `cognitive_face.face`.
+    """
+
+    def __init__(self, module, wrap):
+        self.module = module
+        for name, func in vars(module).items():
+            if (inspect.isfunction(func) and not name.startswith('_')
+                    and func.__module__ == module.__name__):
+                setattr(self, name, wrap(func))
+
+    def __repr__(self):
+        return '<Namespace of {}>'.format(self.module.__name__)
+
+
+def parse_image(image, client=None):
     """Parse the image smartly and return metadata for request.
 
-    First check whether the image is a URL or a file path or a file-like object
-    and return corresponding metadata.
+    First check whether the image is an in-memory buffer or a file path or a
+    file-like object or a URL and return corresponding metadata.
 
     Args:
-        image: A URL or a file path or a file-like object represents an image.
+        image: A URL or a file path or a file-like object or an in-memory
+            buffer (`bytes`, `bytearray`, `memoryview` or `mmap.mmap`) or a
+            `BufferBody` prepared by a `Pipeline` represents an image.
+        client: The `FaceClient` whose settings apply, `current_client()` by
+            default.
 
     Returns:
         a three-item tuple consist of HTTP headers, binary data and json data
-        for POST.
-    """
-    if hasattr(image, 'read'):  # When image is a file-like object.
-        headers = {'Content-Type': 'application/octet-stream'}
-        data = image.read()
-        return headers, data, None
-    elif os.path.isfile(image):  # When image is a file path.
-        headers = {'Content-Type': 'application/octet-stream'}
-        data = open(image, 'rb').read()
-        return headers, data, None
+        for POST. Buffers are sent in place, files and seekable file-like
+        objects are streamed in chunks by a `FileBody` of known length or
+        memory-mapped, see `MemoryMap`. Images are turned upright and large
+        ones downscaled first when enabled, see `Orientation` and
+        `Downscale`. URLs are left to the service, or downloaded by the
+        client when enabled, see `Fetch`.
+
+    Raises:
+        InvalidImageError: The pre-flight validation is enabled, see
+            `Validation`, and the service would reject the image.
+    """
+    client = client or current_client()
+    if isinstance(image, BufferBody):  # When image is prepared already.
+        data = image
+    elif isinstance(image, BUFFER_TYPES):  # When image is in memory.
+        data = view(image)
+    elif hasattr(image, 'read') or os.path.isfile(image):
+        # When image is a file-like object or a file path.
+        data = stream(image, client.mmap_threshold)
     else:  # Default treat it as a URL (string).
         headers = {'Content-Type': 'application/json'}
         json = {'url': image}
         return headers, None, json
+    return prepare_upload(data, client)
+
+
+def prepare_upload(data, client=None):
+    """Return the metadata of the upload of an image, see `parse_image`.
+
+    A `BufferBody` or a `PreparedImage` is preprocessed already and keeps
+    its `Transform`: it is only validated.
+
+    Args:
+        data: The image content, as a buffer, a `FileBody` or a
+            `BufferBody`.
+        client: The `FaceClient` whose settings apply, `current_client()` by
+            default.
+
+    Raises:
+        InvalidImageError: The pre-flight validation is enabled and the
+            service would reject the image.
+    """
+    client = client or current_client()
+    prepared = isinstance(data, (BufferBody, PreparedImage))
+    if not prepared and (client.downscaler is not None or client.orient):
+        # Reject a corrupt image before decoding it, but not a large one
+        # which the downscaler may bring within the limits.
+        if client.validator is not None:
+            client.validator.check(data, maximums=False)
+        data = prepare(data, client.downscaler, client.orient)
+    if client.validator is not None:
+        client.validator.check(data)
+    headers = {
+        'Content-Type': 'application/octet-stream',
+        'Content-Length': str(len(data)),
+    }
+    return headers, data, None
+
+
+def fetch_image(client, url, deadline=None):
+    """Download the image at `url` with the `fetcher` of the `FaceClient`
+    `client` and return the metadata of its upload, see `parse_image`.
+
+    Args:
+        client: The `FaceClient` downloading and uploading the image.
+        url: URL of the image.
+        deadline: Optional `Deadline` bounding the download, for the calls
+            made from another thread than the caller.
+
+    Raises:
+        FetchError: The image cannot be downloaded.
+    """
+    with CF.deadline.scope(deadline):
+        return prepare_upload(client.fetcher.fetch(url), client)
+
+
+def wait_for_person_group_training(person_group_id, deadline=None):
+    """Wait for the finish of person group training.
+
+    Args:
+        person_group_id: `person_group_id` of the target person group.
+        deadline: Optional `Deadline` or seconds bounding the whole wait, the
+            polling calls get the remaining budget only.
+    """
+    with CF.deadline.scope(deadline):
+        idx = 1
+        while True:
+            res = CF.person_group.get_status(person_group_id)
+            if res['status'] in ('succeeded', 'failed'):
+                break
+            print('The training of Person Group {} is onging: #{}'.format(
+                person_group_id, idx))
+            time.sleep(CF.deadline.bounded(2**idx))
+            idx += 1
+
+
+def wait_for_large_face_list_training(large_face_list_id, deadline=None):
+    """Wait for the finish of large face list training.
+
+    Args:
+        large_face_list_id: `large_face_list_id` of the target large face list.
+        deadline: Optional `Deadline` or seconds bounding the whole wait, the
+            polling calls get the remaining budget only.
+    """
+    with CF.deadline.scope(deadline):
+        idx = 1
+        while True:
+            res = CF.large_face_list.get_status(large_face_list_id)
+            if res['status'] in ('succeeded', 'failed'):
+                break
+            print('The training of Large Face List {} is onging: #{}'.format(
+                large_face_list_id, idx))
+            time.sleep(CF.deadline.bounded(2**idx))
+            idx += 1
+
+
+def wait_for_large_person_group_training(large_person_group_id, deadline=None):
+    """Wait for the finish of large person group training.
+
+    Args:
+        large_person_group_id: `large_person_group_id` of the target large
+            person group.
+        deadline: Optional `Deadline` or seconds bounding the whole wait, the
+            polling calls get the remaining budget only.
+    """
+    with CF.deadline.scope(deadline):
+        idx = 1
+        while True:
+            res = CF.large_person_group.get_status(large_person_group_id)
+            if res['status'] in ('succeeded', 'failed'):
+                break
+            print('The training of Large Person Group {} is onging: #{}'.
+                  format(large_person_group_id, idx))
+            time.sleep(CF.deadline.bounded(2**idx))
+            idx += 1
+
+
+def pause():
+    """Pause `TIME_SLEEP` seconds between calls to avoid exceeding quota,
+    unless the `RateLimit` already paces them."""
+    if RateLimit.get() is None:
+        time.sleep(CF.deadline.bounded(TIME_SLEEP))
+
+
+def add_unique_faces(add, images, *args, **kwargs):
+    """Add the faces of `images` through the `add` endpoint, skipping the
+    near-duplicate photos such as bursts or re-exports.
+
+    E.g. `add_unique_faces(CF.large_person_group_person_face.add, paths,
+    large_person_group_id, person_id)`.
+
+    Args:
+        add: `large_person_group_person_face.add`, `large_face_list_face.add`
+            or `person.add_face`, possibly of a `FaceClient`.
+        images: Images to enroll, as accepted by `parse_image`.
+        *args: Extra positional arguments of `add`, after the image.
+        **kwargs: Extra keyword arguments of `add`, plus an optional
+            `deduplicator`, a `Deduplicator` with the default settings
+            otherwise.
+
+    Returns:
+        a two-item tuple consist of the results of `add` for the uploaded
+        images and the `DedupReport` listing the skipped ones. The calls are
+        paced by the rate limiter of the client, if any.
+    """
+    deduplicator = kwargs.pop('deduplicator', None) or Deduplicator()
+    report = deduplicator.partition(images)
+    results = [add(image, *args, **kwargs) for image in report.kept]
+    return results, report
+
+
+def run_concurrently(call, items, concurrency=DEFAULT_CONCURRENCY,
+                     ordered=False):
+    """Call `call(item)` for every item of `items` from a pool of threads,
+    with at most `concurrency` calls in flight.
+
+    The items are consumed lazily and at most `concurrency` outcomes are held
+    at once, so the memory use does not grow with the number of items. The
+    calls go through the `FaceClient` the caller is bound to and within the
+    current `Deadline`, if any.
+
+    Args:
+        call: Function called with each item.
+        items: Any iterable, possibly endless.
+        concurrency: Maximum number of calls in flight.
+        ordered: Yield in the order of `items` rather than in completion
+            order, at the cost of waiting for a slow call before the next
+            ones.
+
+    Returns:
+        An iterator of (item, result) pairs, the result being the exception
+        raised by the call for the item, if any.
+    """
+    requester = getattr(_LOCAL, 'requester', None)
+    if requester is not None:
+        call = bind(call, requester)
+    return _run_concurrently(call, iter(items), concurrency, ordered,
+                             CF.deadline.current())
+
+
+def _run_concurrently(call, items, concurrency, ordered, deadline):
+    # pylint: disable=too-many-arguments
+
+    def attempt(item):
+        """Call `call` within the caller deadline, returning any error."""
+        try:
+            with CF.deadline.scope(deadline):
+                return call(item)
+        except Exception as exception:  # pylint: disable=broad-except
+            return exception
+
+    executor = concurrent.futures.ThreadPoolExecutor(concurrency)
+    # (item, future) pairs in submission order.
+    pending = collections.deque()
+    try:
+        while True:
+            for item in items:
+                pending.append((item, executor.submit(attempt, item)))
+                if len(pending) >= concurrency:
+                    break
+            if not pending:
+                return
+            if ordered:
+                item, future = pending.popleft()
+                yield item, future.result()
+                continue
+            done, _ = concurrent.futures.wait(
+                [future for _, future in pending],
+                return_when=concurrent.futures.FIRST_COMPLETED)
+            for entry in [entry for entry in pending if entry[1] in done]:
+                pending.remove(entry)
+                yield entry[0], entry[1].result()
+    finally:
+        # The caller may stop early, the calls not started are dropped.
+        for _, future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+def chunks(items, size):
+    """Split `items` into lists of at most `size` items."""
+    items = list(items)
+    return [items[idx:idx + size] for idx in range(0, len(items), size)]
+
+
+def merge_identified(outcomes):
+    """Merge the (face_ids, result) pairs of identify calls into one result
+    per face, in the order of the pairs.
+
+    Returns:
+        The identify result of each face, or the exception raised by the call
+        of its chunk.
+    """
+    merged = []
+    for face_ids, result in outcomes:
+        if isinstance(result, Exception):
+            merged.extend([result] * len(face_ids))
+            continue
+        identified = dict((entry.get('faceId'), entry) for entry in result)
+        merged.extend(identified.get(face_id) for face_id in face_ids)
+    return merged
+
+
+def target_face(face):
+    """Return the "left,top,width,height" `target_face` string of a detected
+    face, of its `faceRectangle` or of a (left, top, width, height) sequence.
+    """
+    if hasattr(face, 'split'):
+        return face
+    if hasattr(face, 'get'):
+        rectangle = face.get('faceRectangle', face)
+        face = [rectangle[name] for name in ('left', 'top', 'width', 'height')]
+    return ','.join(str(value) for value in face)
 
 
-def wait_for_person_group_training(person_group_id):
-    """Wait for the finish of person group training."""
-    idx = 1
-    while True:
-        res = CF.person_group.get_status(person_group_id)
-        if res['status'] in ('succeeded', 'failed'):
-            break
-        print('The training of Person Group {} is onging: #{}'.format(
-            person_group_id, idx))
-        time.sleep(2**idx)
-        idx += 1
-
-
-def wait_for_large_face_list_training(large_face_list_id):
-    """Wait for the finish of large face list training."""
-    idx = 1
-    while True:
-        res = CF.large_face_list.get_status(large_face_list_id)
-        if res['status'] in ('succeeded', 'failed'):
-            break
-        print('The training of Large Face List {} is onging: #{}'.format(
-            large_face_list_id, idx))
-        time.sleep(2**idx)
-        idx += 1
-
-
-def wait_for_large_person_group_training(large_person_group_id):
-    """Wait for the finish of large person group training."""
-    idx = 1
-    while True:
-        res = CF.large_person_group.get_status(large_person_group_id)
-        if res['status'] in ('succeeded', 'failed'):
-            break
-        print('The training of Large Person Group {} is onging: #{}'.format(
-            large_person_group_id, idx))
-        time.sleep(2**idx)
-        idx += 1
-
-
-def clear_face_lists():
-    """[Dangerous] Clear all the face lists and all related persisted data."""
-    face_lists = CF.face_list.lists()
-    time.sleep(TIME_SLEEP)
-    for face_list in face_lists:
-        face_list_id = face_list['faceListId']
-        CF.face_list.delete(face_list_id)
-        print('Deleting Face List {}'.format(face_list_id))
-        time.sleep(TIME_SLEEP)
-
-
-def clear_person_groups():
+def assignments_of(faces):
+    """Return the (face, person_id) pairs of a mapping or of an iterable of
+    pairs."""
+    return list(faces.items() if hasattr(faces, 'items') else faces)
+
+
+def add_group_photo(image, group_id, faces, user_data=None, add=None,
+                    max_workers=8):
+    """Enroll several people from a single group photo, uploading its bytes
+    once per face but reading and preprocessing it only once.
+
+    E.g. `add_group_photo(path, large_person_group_id, zip(CF.face.detect(
+    path), person_ids))`.
+
+    Args:
+        image: The group photo, as accepted by `parse_image`.
+        group_id: Id of the (large) person group of the people.
+        faces: Mapping of the faces to the `person_id`s to add them to, or
+            iterable of (face, person_id) pairs. A face is a detect result, a
+            `faceRectangle` or a "left,top,width,height" string.
+        user_data: Optional user data of every added face.
+        add: `large_person_group_person_face.add` by default, or
+            `person.add_face`, possibly of a `FaceClient` whose settings
+            then apply to the photo.
+        max_workers: Maximum number of concurrent add calls.
+
+    Returns:
+        The result of each add call, in the order of `faces`, or the
+        `CognitiveFaceException` it raised.
+    """
+    # pylint: disable=too-many-arguments
+    add = add or CF.large_person_group_person_face.add
+    assignments = assignments_of(faces)
+    _, data, json = parse_image(image, current_client(add))
+    if data is None:
+        shared = json['url']
+    else:
+        # Uploaded as prepared, its target faces mapped by its transform.
+        shared = BufferBody(load(data), getattr(data, 'transform', None))
+    deadline = CF.deadline.current()
+
+    def enroll(face, person_id):
+        """Add one face of the shared image, within the caller deadline."""
+        with CF.deadline.scope(deadline):
+            try:
+                return add(shared, group_id, person_id, user_data,
+                           target_face(face))
+            except CognitiveFaceException as exception:
+                return exception
+
+    if not assignments:
+        return []
+    with concurrent.futures.ThreadPoolExecutor(
+            min(max_workers, len(assignments))) as executor:
+        futures = [
+            executor.submit(enroll, face, person_id)
+            for face, person_id in assignments
+        ]
+    return [future.result() for future in futures]
+
+
+def clear_face_lists(deadline=None):
+    """[Dangerous] Clear all the face lists and all related persisted data.
+
+    Args:
+        deadline: Optional `Deadline` or seconds bounding the whole clearing.
+    """
+    with CF.deadline.scope(deadline):
+        face_lists = CF.face_list.lists()
+        pause()
+        for face_list in face_lists:
+            face_list_id = face_list['faceListId']
+            CF.face_list.delete(face_list_id)
+            print('Deleting Face List {}'.format(face_list_id))
+            pause()
+
+
+def clear_person_groups(deadline=None):
     """[Dangerous] Clear all the person groups and all related persisted data.
+
+    Args:
+        deadline: Optional `Deadline` or seconds bounding the whole clearing.
     """
-    person_groups = CF.person_group.lists()
-    time.sleep(TIME_SLEEP)
-    for person_group in person_groups:
-        person_group_id = person_group['personGroupId']
-        CF.person_group.delete(person_group_id)
-        print('Deleting Person Group {}'.format(person_group_id))
-        time.sleep(TIME_SLEEP)
+    with CF.deadline.scope(deadline):
+        person_groups = CF.person_group.lists()
+        pause()
+        for person_group in person_groups:
+            person_group_id = person_group['personGroupId']
+            CF.person_group.delete(person_group_id)
+            print('Deleting Person Group {}'.format(person_group_id))
+            pause()
 
 
-def clear_large_face_lists():
+def clear_large_face_lists(deadline=None):
     """[Dangerous] Clear all the large face lists and all related persisted
     data.
+
+    Args:
+        deadline: Optional `Deadline` or seconds bounding the whole clearing.
     """
-    large_face_lists = CF.large_face_list.list()
-    time.sleep(TIME_SLEEP)
-    for large_face_list in large_face_lists:
-        large_face_list_id = large_face_list['largeFaceListId']
-        CF.large_face_list.delete(large_face_list_id)
-        print('Deleting Large Face List {}'.format(large_face_list_id))
-        time.sleep(TIME_SLEEP)
+    with CF.deadline.scope(deadline):
+        large_face_lists = CF.large_face_list.list()
+        pause()
+        for large_face_list in large_face_lists:
+            large_face_list_id = large_face_list['largeFaceListId']
+            CF.large_face_list.delete(large_face_list_id)
+            print('Deleting Large Face List {}'.format(large_face_list_id))
+            pause()
 
 
-def clear_large_person_groups():
+def clear_large_person_groups(deadline=None):
     """[Dangerous] Clear all the large person groups and all related persisted
     data.
+
+    Args:
+        deadline: Optional `Deadline` or seconds bounding the whole clearing.
     """
-    large_person_groups = CF.large_person_group.list()
-    time.sleep(TIME_SLEEP)
-    for large_person_group in large_person_groups:
-        large_person_group_id = large_person_group['largePersonGroupId']
-        CF.large_person_group.delete(large_person_group_id)
-        print('Deleting Large Person Group {}'.format(large_person_group_id))
-        time.sleep(TIME_SLEEP)
+    with CF.deadline.scope(deadline):
+        large_person_groups = CF.large_person_group.list()
+        pause()
+        for large_person_group in large_person_groups:
+            large_person_group_id = large_person_group['largePersonGroupId']
+            CF.large_person_group.delete(large_person_group_id)
+            print('Deleting Large Person Group {}'.format(
+                large_person_group_id))
+            pause()
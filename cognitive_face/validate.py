@@ -0,0 +1,201 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+File: validate.py
+Description: Local pre-flight validation of the uploaded images for the Python
+    SDK of the Cognitive Face API.
+"""
+import struct
+import threading
+
+from .upload import FileBody
+from .util import CognitiveFaceException
+
+# Image formats accepted by the service.
+FORMATS = ('JPEG', 'PNG', 'GIF', 'BMP')
+
+# Limits of the service on the uploaded images, in bytes and in pixels.
+MIN_BYTES = 1024
+MAX_BYTES = 6 * 1024 * 1024
+MIN_SIDE = 36
+MAX_SIDE = 4096
+
+# JPEG start of frame markers, holding the dimensions.
+_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - frozenset((0xC4, 0xC8, 0xCC))
+# JPEG markers without a length.
+_STANDALONE_MARKERS = frozenset(range(0xD0, 0xD8)) | frozenset((0x01, ))
+
+
+class InvalidImageError(CognitiveFaceException):
+    """Raised without any network I/O for an image the service would reject,
+    with the error code the service would return: `InvalidImage` for an
+    unsupported or corrupt image, `InvalidImageSize` for an image out of the
+    size limits."""
+
+    def __init__(self, code, msg):
+        super(InvalidImageError, self).__init__(None, code, msg)
+
+
+class _Reader(object):
+    """Random access to the first bytes of an upload body."""
+
+    def __init__(self, data):
+        self.data = data
+        self.file = None
+        if isinstance(data, FileBody):
+            if data.path is not None:
+                self.file = open(data.path, 'rb')
+            else:
+                self.file = data.fileobj
+
+    def read(self, offset, size):
+        """Return up to `size` bytes from `offset` of the body."""
+        if self.file is None:
+            return bytes(self.data[offset:offset + size])
+        self.file.seek(self.data.offset + offset)
+        return self.file.read(size)
+
+    def close(self):
+        """Close the file opened by the reader, if any."""
+        if self.file is not None and self.file is not self.data.fileobj:
+            self.file.close()
+
+
+def image_info(read):
+    """Return the format, the width and the height of an image from its
+    header, without decoding it.
+
+    Args:
+        read: Function returning `size` bytes from `offset` of the image.
+
+    Raises:
+        InvalidImageError: The image is not in a supported format or its
+            header is corrupt.
+    """
+    head = read(0, 32)
+    try:
+        if head.startswith(b'\xff\xd8'):
+            return ('JPEG', ) + _jpeg_size(read)
+        if head.startswith(b'\x89PNG\r\n\x1a\n') and head[12:16] == b'IHDR':
+            return ('PNG', ) + struct.unpack('>II', head[16:24])
+        if head[:6] in (b'GIF87a', b'GIF89a'):
+            return ('GIF', ) + struct.unpack('<HH', head[6:10])
+        if head.startswith(b'BM'):
+            if struct.unpack('<I', head[14:18])[0] == 12:
+                return ('BMP', ) + struct.unpack('<HH', head[18:22])
+            width, height = struct.unpack('<ii', head[18:26])
+            return 'BMP', width, abs(height)
+    except struct.error:
+        pass
+    raise InvalidImageError('InvalidImage',
+                            'The image format is not supported or corrupt.')
+
+
+def _jpeg_size(read):
+    """Return the width and the height of a JPEG image from its frame header.
+    """
+    offset = 2
+    while True:
+        marker = read(offset, 2)
+        if len(marker) < 2 or marker[0:1] != b'\xff':
+            raise struct.error('Not a JPEG marker.')
+        code = ord(marker[1:2])
+        if code == 0xFF:  # Fill byte.
+            offset += 1
+            continue
+        if code in _STANDALONE_MARKERS:
+            offset += 2
+            continue
+        if code in (0xD9, 0xDA):  # End of image or scan before any frame.
+            raise struct.error('No JPEG frame header.')
+        length = struct.unpack('>H', read(offset + 2, 2))[0]
+        if code in _SOF_MARKERS:
+            height, width = struct.unpack('>HH', read(offset + 5, 4))
+            return width, height
+        offset += 2 + length
+
+
+class Validator(object):
+    """Thread-safe header-only validation of the uploaded images against the
+    limits of the service: format, size in bytes and dimensions.
+
+    Attributes:
+        formats: Accepted image formats.
+        min_bytes: Minimum size of an image in bytes.
+        max_bytes: Maximum size of an image in bytes.
+        min_side: Minimum width and height of an image in pixels.
+        max_side: Maximum width and height of an image in pixels.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self,
+                 formats=FORMATS,
+                 min_bytes=MIN_BYTES,
+                 max_bytes=MAX_BYTES,
+                 min_side=MIN_SIDE,
+                 max_side=MAX_SIDE):
+        self.formats = formats
+        self.min_bytes = min_bytes
+        self.max_bytes = max_bytes
+        self.min_side = min_side
+        self.max_side = max_side
+        self._lock = threading.Lock()
+        self._stats = {'checked': 0, 'rejected': 0}
+
+    def check(self, data, maximums=True):
+        """Validate the upload body `data`.
+
+        Args:
+            data: The upload body.
+            maximums: Whether to check the maximum size in bytes and pixels
+                too, false for an image about to be preprocessed, which is
+                checked in full afterwards. Such an early check is not
+                counted in the stats unless it rejects the image.
+
+        Raises:
+            InvalidImageError: The service would reject the image.
+        """
+        try:
+            self._check(data, maximums)
+        except InvalidImageError:
+            self._count(rejected=True)
+            raise
+        if maximums:
+            self._count()
+
+    def _check(self, data, maximums):
+        size = len(data)
+        max_bytes = self.max_bytes if maximums else size
+        if not self.min_bytes <= size <= max_bytes:
+            raise InvalidImageError(
+                'InvalidImageSize',
+                'The image is {} bytes, out of [{}, {}].'.format(
+                    size, self.min_bytes, self.max_bytes))
+        reader = _Reader(data)
+        try:
+            image_format, width, height = image_info(reader.read)
+        finally:
+            reader.close()
+        if image_format not in self.formats:
+            raise InvalidImageError(
+                'InvalidImage',
+                'The {} format is not supported.'.format(image_format))
+        max_side = self.max_side if maximums else max(width, height)
+        if not (self.min_side <= width <= max_side and
+                self.min_side <= height <= max_side):
+            raise InvalidImageError(
+                'InvalidImageSize',
+                'The image is {}x{} pixels, out of [{}, {}].'.format(
+                    width, height, self.min_side, self.max_side))
+
+    def _count(self, rejected=False):
+        with self._lock:
+            self._stats['checked'] += 1
+            if rejected:
+                self._stats['rejected'] += 1
+
+    def stats(self):
+        """Return the number of images checked and of images rejected, that
+        is of requests saved."""
+        with self._lock:
+            return dict(self._stats)
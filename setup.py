@@ -22,7 +22,12 @@ setup(
     name='cognitive_face',
     version='1.4.2',
     packages=find_packages(exclude=['tests']),
-    install_requires=['requests'],
+    install_requires=['futures; python_version < "3"', 'requests'],
+    extras_require={
+        'aio': ['aiohttp'],
+        'json': ['orjson; python_version >= "3"'],
+        'image': ['Pillow'],
+    },
     author='Microsoft',
     description='Python SDK for the Cognitive Face API',
     long_description=readme(),